@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Security
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Security
+from fastapi.responses import StreamingResponse
 from app.schemas.article import ArticleFilterParams, ArticleListResponse
 from app.services.article_service import article_service
 from app.schemas.article import ArticleSchema
@@ -8,24 +9,33 @@ from typing import Optional
 router = APIRouter(prefix="/articles", tags=["articles"])
 
 @router.get("/", response_model=ArticleListResponse)
-def list_articles(
+async def list_articles(
     params: ArticleFilterParams = Depends()
 ):
     try:
-        return article_service.get_article_list(params)
+        return await article_service.get_article_list(params)
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/{article_id}", response_model=ArticleSchema)
-def get_article(article_id: int, current_user = Security(get_current_user_optional)):
+async def get_article(article_id: int, current_user = Security(get_current_user_optional)):
     try:
         user_id = current_user.id if current_user else None
-        return article_service.get_article_detail(article_id, user_id)
+        return await article_service.get_article_detail(article_id, user_id)
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/{article_id}/translation")
+async def stream_article_translation(article_id: int, request: Request):
+    # full-text translation as server-sent events (generated on first request, then stored)
+    client = request.client.host if request.client else None
+    return StreamingResponse(
+        await article_service.stream_full_translation(article_id, client),
+        media_type="text/event-stream"
+    )
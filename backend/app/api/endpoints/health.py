@@ -2,6 +2,7 @@
 Health check endpoint
 """
 from fastapi import APIRouter
+from app.core.adaptive_limiter import limiters
 
 
 router = APIRouter()
@@ -12,4 +13,7 @@ async def health_check():
     """Simple health check endpoint"""
     return {"status": "healthy"}
 
-
+@router.get("/health/limiters")
+async def limiter_metrics():
+    """Current adaptive concurrency limit and counters per external API (this process)."""
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -3,6 +3,7 @@ from app.services.hn_service import hn_service
 from app.services.extraction_service import extraction_service
 from app.services.translate_service import translate_service
 from app.core.news_ingestor import news_ingestor
+from app.core.distributed_lock import single_flight
 
 router = APIRouter(prefix="/news", tags=["news"])
 
@@ -12,15 +13,21 @@ async def trigger_ingestion_task():
     手动触发新闻抓取与分析流程 (Task 1 测试用)
     """
     try:
-        await news_ingestor.run()
+        # shares the scheduled job's lock, so a manual run never overlaps a scheduled one
+        results = await single_flight("news_ingestor_task")(news_ingestor.run)()
+        if results is None:
+            raise HTTPException(status_code=409, detail="Ingestion is already running")
         return {"message": "Ingestion task triggered successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
 
 @router.get("/hn/demo")
 async def get_hn_demo():
     try:
-        stories = await hn_service.fetch_all_stories()
+        # nothing is stored here: leave the ingest cursor alone
+        stories = await hn_service.fetch_all_stories(advance_cursor=False)
         urls = [story.original_url for story in stories]
         contents = await extraction_service.extract_batch(urls)
         
@@ -33,7 +40,8 @@ async def get_hn_demo():
                 "scraped_content": contents.get(story.original_url)
             }
 
-        summaries = await translate_service.translate_and_summarize_batch(translation_inputs)
+        results = await translate_service.translate_and_summarize_batch(translation_inputs)
+        summaries = {hn_id: summary[0] if summary else None for hn_id, summary in results.items()}
         return {"stories": stories, "contents": contents, "summaries": summaries}
 
     except Exception as exc:
@@ -0,0 +1,213 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+import aiohttp
+import httpx
+import openai
+from app.core.config import settings
+from app.core.logger import logger
+
+T = TypeVar("T")
+
+class RetryableError(Exception):
+    """Raised by callers for responses that signal an overloaded upstream (429 / 5xx)."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delay-seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def classify_error(exc: BaseException) -> Tuple[bool, Optional[float]]:
+    """Return (is_overload, retry_after_seconds) for an exception raised by an upstream call."""
+    if isinstance(exc, RetryableError):
+        return True, exc.retry_after
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TimeoutException, aiohttp.ServerTimeoutError, openai.APITimeoutError)):
+        return True, None
+    if isinstance(exc, openai.APIConnectionError):
+        return True, None
+
+    # openai.APIStatusError / httpx.HTTPStatusError expose status_code, aiohttp.ClientResponseError exposes status
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None) or getattr(exc, "headers", None) or {}
+        return True, parse_retry_after(headers.get("Retry-After"))
+    return False, None
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one upstream API (replaces a fixed asyncio.Semaphore).
+
+    - additive increase: every healthy call (latency within `latency_tolerance` x the best
+      observed latency) grows the limit by 1/limit, i.e. about +1 per window of calls
+    - multiplicative decrease: 429 / 5xx / timeouts cut the limit by `backoff_ratio`,
+      at most once per `decrease_cooldown` so one burst of failures counts once
+    - Retry-After pauses all new calls until the given time
+    - overloaded calls are retried with full-jitter exponential backoff, within `retry_budget`
+      seconds from the first attempt if given (no retry starts after it runs out)
+    """
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        adaptive: Optional[bool] = None,
+        retry_budget: Optional[float] = None,
+    ):
+        self.name = name
+        self.adaptive = settings.adaptive_limiter_enabled if adaptive is None else adaptive
+        self.min_limit = min_limit or settings.adaptive_limiter_min_limit
+        self.max_limit = max_limit or initial_limit * settings.adaptive_limiter_max_multiplier
+        self.limit = float(initial_limit)
+        self.max_retries = settings.adaptive_limiter_max_retries if self.adaptive else 0
+        self.retry_budget = retry_budget
+        self.backoff_ratio = settings.adaptive_limiter_backoff_ratio
+        self.latency_tolerance = settings.adaptive_limiter_latency_tolerance
+        self.decrease_cooldown = settings.adaptive_limiter_decrease_cooldown_seconds
+
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._min_latency: Optional[float] = None
+
+        self.successes = 0
+        self.overloads = 0
+        self.retries = 0
+
+        limiters[name] = self
+
+    async def _acquire(self) -> None:
+        async with self._cond:
+            while True:
+                wait = self._blocked_until - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self._in_flight < int(self.limit):
+                    break
+                await self._cond.wait()
+            self._in_flight += 1
+
+    async def _release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _on_success(self, latency: Optional[float]) -> None:
+        # latency None: the call succeeded but its duration is unknown (a held slot)
+        self.successes += 1
+        if not self.adaptive or latency is None:
+            return
+        self._min_latency = latency if self._min_latency is None else min(self._min_latency, latency)
+        # slower than usual means the upstream is queueing: hold the limit
+        if latency <= self._min_latency * self.latency_tolerance and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_overload(self, retry_after: Optional[float]) -> None:
+        self.overloads += 1
+        now = time.monotonic()
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+        if not self.adaptive or now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        if int(self.limit) != int(previous):
+            logger.warning(f"[AdaptiveLimiter:{self.name}] Upstream overloaded, limit {int(previous)} -> {int(self.limit)}")
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        cap = min(settings.adaptive_limiter_backoff_max_seconds, settings.adaptive_limiter_backoff_base_seconds * 2 ** attempt)
+        return max(retry_after or 0.0, random.uniform(0, cap))
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Run `func(*args, **kwargs)` within the concurrency limit, retrying overloaded calls.
+        Non-overload errors, and the last overload error once retries are used up, are re-raised.
+        """
+        result, _ = await self._run(func, args, kwargs, hold=False)
+        return result
+
+    async def call_held(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> Tuple[T, Callable[[], Awaitable[None]]]:
+        """
+        Like `call`, but the slot stays taken after `func` returns, for results still being read
+        (streamed responses): returns (result, release), and `release()` must be awaited when done.
+        Such calls are no latency sample, only the time to the first byte is known.
+        """
+        return await self._run(func, args, kwargs, hold=True)
+
+    async def _run(self, func: Callable[..., Awaitable[T]], args: Tuple[Any, ...], kwargs: Dict[str, Any], hold: bool) -> Tuple[T, Optional[Callable[[], Awaitable[None]]]]:
+        attempt = 0
+        first_attempt: Optional[float] = None
+        while True:
+            await self._acquire()
+            start = time.monotonic()
+            if first_attempt is None:
+                first_attempt = start
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                await self._release()
+                overloaded, retry_after = classify_error(e)
+                if not overloaded:
+                    raise
+                self._on_overload(retry_after)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, retry_after)
+                if self.retry_budget is not None and time.monotonic() + delay - first_attempt >= self.retry_budget:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # cancelled (e.g. the losing side of a hedged request): free the slot
+                await self._release()
+                raise
+
+            if not hold:
+                await self._release()
+                self._on_success(time.monotonic() - start)
+                return result, None
+
+            self._on_success(None)
+            released = False
+            async def release() -> None:
+                nonlocal released
+                if not released:
+                    released = True
+                    await self._release()
+            return result, release
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self._in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "retries": self.retries,
+        }
+
+# every limiter by name, for the metrics endpoint
+limiters: Dict[str, AdaptiveLimiter] = {}
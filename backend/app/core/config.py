@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -7,11 +8,70 @@ class Settings(BaseSettings):
     # Scheduler Configuration
     scheduler_news_ingestor_interval_hours: int
     scheduler_back_fill_embedding_interval_minutes: int
+    # re-summarization of stored articles whose analysis_version is outdated (prompt or model change)
+    resummarize_enabled: bool = False
+    scheduler_resummarize_interval_hours: int = 6
+    resummarize_page_size: int = 50
+    resummarize_max_articles_per_run: int = 500
+    resummarize_page_delay_seconds: float = 5.0
+
+    # Shared HTTP clients (keep-alive pools reused across pipeline runs).
+    # Disable pooling to fall back to one client per request, e.g. for providers that drop idle connections.
+    http_client_pooling_enabled: bool = True
+    http_client_http2: bool = False
+    http_max_connections: int = 100
+    http_max_connections_per_host: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_dns_cache_ttl_seconds: int = 300
+
+    # Adaptive (AIMD) concurrency for external APIs. The *_concurrent_limit settings are the starting
+    # limits; each may grow up to max_multiplier x its start and is cut on 429/5xx/timeouts.
+    adaptive_limiter_enabled: bool = True
+    adaptive_limiter_min_limit: int = 1
+    adaptive_limiter_max_multiplier: int = 4
+    adaptive_limiter_backoff_ratio: float = 0.5
+    adaptive_limiter_latency_tolerance: float = 2.0
+    adaptive_limiter_decrease_cooldown_seconds: float = 2.0
+    adaptive_limiter_max_retries: int = 3
+    adaptive_limiter_backoff_base_seconds: float = 0.5
+    adaptive_limiter_backoff_max_seconds: float = 30.0
+
+    # Local disk caches (relative to the working directory, like logs/)
+    cache_dir: str = "cache"
+
+    # Streaming ingestion pipeline (bounded queues between stages instead of batch barriers)
+    pipeline_streaming_enabled: bool = False
+    pipeline_queue_size: int = 20
+    pipeline_triage_workers: int = 10
+    pipeline_extract_workers: int = 10
+    pipeline_translate_workers: int = 10
+    pipeline_save_workers: int = 2
+    pipeline_embed_workers: int = 4
+    # per-story checkpoints (Redis) used to resume unfinished stories after a restart
+    pipeline_state_ttl_seconds: int = 2 * 24 * 3600
+    # how long an abandoned story (dead-lettered job) is kept from being picked up again
+    pipeline_abandoned_ttl_seconds: int = 7 * 24 * 3600
+    # a story whose translation failed this many times is abandoned instead of retried (and paid for) every run
+    pipeline_max_translation_attempts: int = 3
+
+    # Ingestion worker (app.worker) consuming story jobs from a Redis queue
+    ingestion_worker_enabled: bool = False
+    ingestion_worker_concurrency: int = 10
+    job_queue_lease_seconds: int = 300
+    job_queue_max_attempts: int = 3
+    job_queue_poll_interval_seconds: float = 1.0
+    # TTL of the cluster-wide single-flight lock of scheduled jobs (renewed while the job runs)
+    job_lock_ttl_seconds: int = 600
 
     # Supabase Configuration
     supabase_url: str
     supabase_api_key: str
 
+    # rows per bulk insert/update request
+    db_bulk_batch_size: int = 50
+    # threads reserved for blocking supabase calls (bounds concurrent DB round-trips)
+    db_executor_max_workers: int = 16
+
     # redis
     redis_url: str
     redis_cache_expire_seconds: int
@@ -21,16 +81,62 @@ class Settings(BaseSettings):
     hn_new_url: str = "https://hacker-news.firebaseio.com/v0/newstories.json"
     hn_best_url: str = "https://hacker-news.firebaseio.com/v0/beststories.json"
     hn_item_url: str = "https://hacker-news.firebaseio.com/v0/item/{id}.json"
+    hn_max_item_url: str = "https://hacker-news.firebaseio.com/v0/maxitem.json"
+    hn_updates_url: str = "https://hacker-news.firebaseio.com/v0/updates.json"
     hn_poll_interval_seconds: int
     hn_story_limit: int
     hn_fetch_concurrent_limit: int
+    # number of hn_ids per bulk existence query against the articles table
+    hn_exists_batch_size: int = 200
+    # incremental polling via maxitem/updates cursors instead of re-deriving the full lists
+    hn_incremental_enabled: bool = False
+    hn_incremental_max_items: int = 100
 
     # OpenAI Configuration
     openai_api_key: str
     openai_embedding_concurrent_limit: int
+    # embedding requests pack chunks from many articles, up to these per-request limits
+    embedding_request_max_chunks: int = 1000
+    embedding_request_max_tokens: int = 250000
+    # cache of chunk embeddings keyed by model, dimensions and chunk text hash
+    embedding_cache_enabled: bool = True
+    embedding_cache_ttl_seconds: int = 90 * 24 * 3600
+    embedding_cache_max_bytes: int = 1024 * 1024 * 1024
 
     # Embedding
     embedding_match_threshold: float
+    embedding_model: str = "text-embedding-3-small"
+    # shortened embeddings (text-embedding-3 supports any width up to 1536); None keeps the model default.
+    # Must match the width of document_chunks.embedding (checked at startup)
+    embedding_dimensions: Optional[int] = None
+    # "vector" (float32) or "halfvec" (float16, db/document_chunk.sql); selects the match_documents variant
+    embedding_storage: Literal["vector", "halfvec"] = "vector"
+    # in-process copy of document_chunks for search_similar (API process only), with database fallback.
+    # Memory: ~dims bytes per chunk with int8 quantization (4x that without) plus the chunk text
+    vector_index_enabled: bool = False
+    vector_index_quantize: bool = True
+    # IVF partitioning once the index has this many chunks; nlist 0 means sqrt(chunks)
+    vector_index_ivf_min_size: int = 50000
+    vector_index_nlist: int = 0
+    vector_index_nprobe: int = 16
+    vector_index_page_size: int = 1000
+    # chunks stored by other processes (e.g. the ingestion worker) are picked up this often
+    vector_index_refresh_seconds: int = 60
+    # chunks deleted by any process are announced in Redis and dropped from every index on its next refresh;
+    # an index that was down for longer than this reloads from the database anyway
+    vector_index_tombstone_retention_seconds: int = 24 * 3600
+    # removed rows are compacted out of the arrays once they are this share of the index
+    vector_index_compact_dead_fraction: float = 0.2
+    # hybrid retrieval: vector matches fused with full-text matches on document_chunks.lexemes
+    # (English words/identifiers + Chinese character bigrams, db/document_chunk.sql) by reciprocal rank fusion
+    hybrid_search_enabled: bool = False
+    hybrid_rrf_k: int = 60
+    # candidates taken from each ranking before fusion
+    hybrid_candidates: int = 30
+    # vector candidates only need to be loosely related; the fused ranking orders them
+    hybrid_vector_threshold: float = 0.2
+    # chunks stored before the lexemes column existed are tokenized this many per request
+    hybrid_backfill_page_size: int = 500
 
     # Gemini Configuration
     gemini_base_url: str
@@ -38,6 +144,49 @@ class Settings(BaseSettings):
     gemini_model: str
     gemini_temperature: float
     gemini_concurrent_limit: int
+    # summarization providers (comma-separated: gemini, deepseek), routed by observed latency/error rate
+    llm_providers: str = "gemini"
+    # hedging: after the chosen provider's p95 latency, send the same request to the next one as well
+    llm_hedging_enabled: bool = False
+    llm_hedge_min_delay_seconds: float = 5.0
+    llm_hedge_default_delay_seconds: float = 30.0
+    llm_router_min_samples: int = 10
+    llm_router_latency_window: int = 100
+    # triage: a cheap ai_score estimate on title + HN text decides whether a story is extracted and
+    # fully summarized; stories below the threshold are stored with the triage result only
+    triage_enabled: bool = False
+    triage_min_score: int = 30
+    triage_max_input_tokens: int = 1000
+    # full-text translation is generated on the first request for it, not at ingestion; new
+    # generations are limited per client IP and in total per hour
+    full_translation_max_input_tokens: int = 32000
+    full_translation_wait_timeout_seconds: int = 300
+    full_translation_starts_per_client_per_hour: int = 20
+    full_translation_starts_per_hour: int = 200
+    # long articles are split at heading/paragraph boundaries and the sections translated concurrently;
+    # a failed section is retried on its own
+    full_translation_sectioned_enabled: bool = True
+    full_translation_section_tokens: int = 2000
+    full_translation_section_max_retries: int = 2
+    # batch-API mode: runs of at least LLM_BATCH_MIN_SIZE stories are summarized as one provider
+    # batch job (or through the router with LLM_BATCH_PROVIDER=local), trading latency for throughput and cost
+    llm_batch_enabled: bool = False
+    llm_batch_provider: str = "gemini"
+    llm_batch_min_size: int = 50
+    llm_batch_poll_interval_seconds: int = 30
+    llm_batch_timeout_seconds: int = 3600
+    # invalid summarize JSON is repaired locally (lenient parse, clamping) and only the fields
+    # still missing are requested again, instead of dropping the story
+    llm_salvage_enabled: bool = True
+    llm_salvage_followup_enabled: bool = True
+    # cache of validated translate/summarize results keyed by model, prompt version and input hash
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 30 * 24 * 3600
+    llm_cache_max_bytes: int = 256 * 1024 * 1024
+    # scraped content is stripped of boilerplate and fitted into this many input tokens
+    llm_compaction_enabled: bool = True
+    llm_input_token_budget: int = 16000
+    llm_input_encoding: str = "o200k_base"
 
     # DeepSeek Configuration
     deepseek_base_url: str
@@ -50,6 +199,13 @@ class Settings(BaseSettings):
     jina_reader_base: str
     jina_api_key: str
     jina_fetch_concurrent_limit: int
+    # per-attempt timeout, and the time after the first attempt in which retries may start
+    jina_request_timeout_seconds: float = 20.0
+    jina_retry_budget_seconds: float = 60.0
+    # cache of extracted markdown keyed by normalized URL
+    extraction_cache_enabled: bool = True
+    extraction_cache_ttl_seconds: int = 7 * 24 * 3600
+    extraction_cache_max_bytes: int = 512 * 1024 * 1024
 
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
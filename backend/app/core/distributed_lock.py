@@ -0,0 +1,132 @@
+import asyncio
+import functools
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.redis import get_redis
+
+# delete / extend the lock only while it still holds our token
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_EXTEND_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# write KEYS[1] only if the caller's fencing token is not older than the last writer's
+_FENCED_SET_SCRIPT = """
+local last = tonumber(redis.call('GET', KEYS[2]) or '0')
+if tonumber(ARGV[2]) < last then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1])
+redis.call('SET', KEYS[2], ARGV[2])
+return 1
+"""
+
+@dataclass
+class LockLease:
+    name: str
+    token: str
+    # strictly increasing per lock name; a stale holder always has a smaller one
+    fencing_token: int
+    lost: bool = False
+
+# lease held by the job running in the current task (set by `single_flight`)
+current_lease: ContextVar[Optional[LockLease]] = ContextVar("current_lease", default=None)
+
+def lease_lost() -> bool:
+    """
+    Whether the current job's lock expired under it (another process may be running the job now).
+    Long jobs check this between batches and stop; outside a single-flight job it is always False.
+    """
+    lease = current_lease.get()
+    return lease is not None and lease.lost
+
+def _lock_key(name: str) -> str:
+    return f"lock:{name}"
+
+async def acquire_lock(name: str, ttl_seconds: int) -> Optional[LockLease]:
+    redis = await get_redis()
+    token = uuid.uuid4().hex
+    if not await redis.set(_lock_key(name), token, nx=True, px=ttl_seconds * 1000):
+        return None
+    fencing_token = await redis.incr(f"{_lock_key(name)}:fence")
+    return LockLease(name=name, token=token, fencing_token=fencing_token)
+
+async def extend_lock(lease: LockLease, ttl_seconds: int) -> bool:
+    redis = await get_redis()
+    return bool(await redis.eval(_EXTEND_SCRIPT, 1, _lock_key(lease.name), lease.token, ttl_seconds * 1000))
+
+async def release_lock(lease: LockLease) -> None:
+    redis = await get_redis()
+    await redis.eval(_RELEASE_SCRIPT, 1, _lock_key(lease.name), lease.token)
+
+async def fenced_set(key: str, value: Any) -> bool:
+    """
+    SET guarded by the current job's fencing token, so a holder whose lock expired
+    (GC pause, network partition) cannot overwrite state written by the new holder.
+    Outside a single-flight job this is a plain SET.
+    """
+    redis = await get_redis()
+    lease = current_lease.get()
+    if lease is None:
+        await redis.set(key, value)
+        return True
+
+    written = bool(await redis.eval(_FENCED_SET_SCRIPT, 2, key, f"{key}:fence", value, lease.fencing_token))
+    if not written:
+        logger.warning(f"[DistributedLock] Rejected stale write to {key} from {lease.name} (fencing token {lease.fencing_token})")
+    return written
+
+async def _keep_alive(lease: LockLease, ttl_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(ttl_seconds / 3)
+        try:
+            extended = await extend_lock(lease, ttl_seconds)
+        except Exception as e:
+            logger.error(f"[DistributedLock] Error extending lock {lease.name}: {e}")
+            continue
+        if not extended:
+            lease.lost = True
+            logger.error(f"[DistributedLock] Lost lock {lease.name} (fencing token {lease.fencing_token})")
+            return
+
+def single_flight(name: str, ttl_seconds: Optional[int] = None):
+    """
+    Run the wrapped coroutine only if no other process currently holds the `name` lock.
+
+    Used for scheduled jobs: with several API/worker processes each job runs exactly once
+    cluster-wide, and a slow run is never started twice. The lock is renewed while the job
+    runs (a job that loses it anyway sees `lease_lost()`); a skipped call returns None.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            ttl = ttl_seconds or settings.job_lock_ttl_seconds
+            lease = await acquire_lock(name, ttl)
+            if lease is None:
+                logger.bind(type="news_ingestor", step="Scheduler").info(f"Skipping {name}: already running elsewhere.")
+                return None
+
+            context_token = current_lease.set(lease)
+            keep_alive = asyncio.create_task(_keep_alive(lease, ttl))
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                keep_alive.cancel()
+                current_lease.reset(context_token)
+                await release_lock(lease)
+
+        return wrapper
+    return decorator
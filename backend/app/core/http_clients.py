@@ -0,0 +1,80 @@
+import aiohttp
+import httpx
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from app.core.config import settings
+
+_aiohttp_session: Optional[aiohttp.ClientSession] = None
+_httpx_client: Optional[httpx.AsyncClient] = None
+
+def _create_aiohttp_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.http_max_connections,
+        limit_per_host=settings.http_max_connections_per_host,
+        ttl_dns_cache=settings.http_dns_cache_ttl_seconds,
+        keepalive_timeout=settings.http_keepalive_expiry_seconds,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+def _create_httpx_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        # idle connections kept across all hosts (httpx has no per-host limit)
+        max_keepalive_connections=settings.http_max_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncClient(
+        http2=settings.http_client_http2,
+        limits=limits,
+        timeout=httpx.Timeout(60.0),
+    )
+
+def init_http_clients():
+    """
+    Create the app-lifetime HTTP clients (called from main.lifespan).
+    - aiohttp session for the HN API (per-host limit + DNS cache)
+    - httpx client for Jina Reader and the OpenAI-compatible LLM endpoints (optional HTTP/2)
+    """
+    global _aiohttp_session, _httpx_client
+    if _aiohttp_session is None or _aiohttp_session.closed:
+        _aiohttp_session = _create_aiohttp_session()
+    if _httpx_client is None or _httpx_client.is_closed:
+        _httpx_client = _create_httpx_client()
+
+def get_aiohttp_session() -> aiohttp.ClientSession:
+    global _aiohttp_session
+    if _aiohttp_session is None or _aiohttp_session.closed:
+        _aiohttp_session = _create_aiohttp_session()
+    return _aiohttp_session
+
+def get_httpx_client() -> httpx.AsyncClient:
+    global _httpx_client
+    if _httpx_client is None or _httpx_client.is_closed:
+        _httpx_client = _create_httpx_client()
+    return _httpx_client
+
+async def close_http_clients():
+    global _aiohttp_session, _httpx_client
+    if _aiohttp_session is not None:
+        await _aiohttp_session.close()
+        _aiohttp_session = None
+    if _httpx_client is not None:
+        await _httpx_client.aclose()
+        _httpx_client = None
+
+@asynccontextmanager
+async def aiohttp_session() -> AsyncIterator[aiohttp.ClientSession]:
+    # shared pooled session, or a throwaway one when pooling is switched off
+    if settings.http_client_pooling_enabled:
+        yield get_aiohttp_session()
+    else:
+        async with aiohttp.ClientSession() as session:
+            yield session
+
+@asynccontextmanager
+async def httpx_client() -> AsyncIterator[httpx.AsyncClient]:
+    if settings.http_client_pooling_enabled:
+        yield get_httpx_client()
+    else:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            yield client
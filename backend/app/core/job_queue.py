@@ -0,0 +1,119 @@
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.redis import get_redis
+from app.repositories.pipeline_state_repository import pipeline_state_repository
+
+# pop the next pending job and lease it until ARGV[1] in one step
+_LEASE_SCRIPT = """
+local job_id = redis.call('RPOP', KEYS[1])
+if not job_id then
+    return nil
+end
+redis.call('ZADD', KEYS[2], ARGV[1], job_id)
+return job_id
+"""
+
+class JobQueue:
+    """
+    Reliable Redis job queue with leases.
+
+    - `queue:{name}:pending`  LIST of job ids waiting to be leased
+    - `queue:{name}:jobs`     HASH job id -> {"payload", "attempts"}
+    - `queue:{name}:leases`   ZSET job id -> lease deadline (unix time)
+    - `queue:{name}:dead`     LIST of jobs that used up their attempts
+
+    A leased job that is neither acked nor nacked before its deadline (worker crash,
+    visibility timeout) is moved back to pending by `requeue_expired`. `on_dead(job_id, payload)`
+    runs when a job is moved to the dead list, to clean up state that would bring it back.
+    """
+
+    def __init__(self, name: str, on_dead: Optional[Callable[[str, Dict[str, Any]], Awaitable[Any]]] = None):
+        self.name = name
+        self.on_dead = on_dead
+        self.pending_key = f"queue:{name}:pending"
+        self.jobs_key = f"queue:{name}:jobs"
+        self.leases_key = f"queue:{name}:leases"
+        self.dead_key = f"queue:{name}:dead"
+
+    async def enqueue(self, job_id: str, payload: Dict[str, Any]) -> bool:
+        """Add a job unless one with the same id is already queued or leased."""
+        redis = await get_redis()
+        job = json.dumps({"payload": payload, "attempts": 0}, ensure_ascii=False)
+        if not await redis.hsetnx(self.jobs_key, job_id, job):
+            return False
+        await redis.lpush(self.pending_key, job_id)
+        return True
+
+    async def lease(self) -> Optional[Tuple[str, Dict[str, Any], int]]:
+        """Lease the next job; returns (job_id, payload, attempt) or None when the queue is empty."""
+        redis = await get_redis()
+        deadline = time.time() + settings.job_queue_lease_seconds
+        job_id = await redis.eval(_LEASE_SCRIPT, 2, self.pending_key, self.leases_key, deadline)
+        if job_id is None:
+            return None
+
+        raw = await redis.hget(self.jobs_key, job_id)
+        if raw is None:
+            # acked by a previous holder whose lease had already expired
+            await redis.zrem(self.leases_key, job_id)
+            return None
+
+        job = json.loads(raw)
+        job["attempts"] += 1
+        await redis.hset(self.jobs_key, job_id, json.dumps(job, ensure_ascii=False))
+        return job_id, job["payload"], job["attempts"]
+
+    async def extend_lease(self, job_id: str) -> None:
+        redis = await get_redis()
+        await redis.zadd(self.leases_key, {job_id: time.time() + settings.job_queue_lease_seconds}, xx=True)
+
+    async def ack(self, job_id: str) -> None:
+        redis = await get_redis()
+        await redis.zrem(self.leases_key, job_id)
+        await redis.hdel(self.jobs_key, job_id)
+
+    async def nack(self, job_id: str, error: str = "") -> None:
+        """Release a failed job: retry it, or move it to the dead list after `job_queue_max_attempts`."""
+        redis = await get_redis()
+        if not await redis.zrem(self.leases_key, job_id):
+            # lease already expired and was requeued by another worker
+            return
+
+        raw = await redis.hget(self.jobs_key, job_id)
+        if raw is None:
+            return
+
+        job = json.loads(raw)
+        if job["attempts"] >= settings.job_queue_max_attempts:
+            job["error"] = error
+            await redis.lpush(self.dead_key, json.dumps({"id": job_id, **job}, ensure_ascii=False))
+            await redis.hdel(self.jobs_key, job_id)
+            logger.error(f"[JobQueue:{self.name}] Job {job_id} failed {job['attempts']} times, moved to dead letter list: {error}")
+            if self.on_dead:
+                await self.on_dead(job_id, job["payload"])
+            return
+
+        await redis.lpush(self.pending_key, job_id)
+
+    async def requeue_expired(self) -> List[str]:
+        """Return jobs whose lease deadline passed to the pending list (counts as a failed attempt)."""
+        redis = await get_redis()
+        expired = await redis.zrangebyscore(self.leases_key, "-inf", time.time())
+        for job_id in expired:
+            await self.nack(job_id, error="lease expired")
+        if expired:
+            logger.warning(f"[JobQueue:{self.name}] Requeued {len(expired)} jobs with expired leases")
+        return expired
+
+    async def size(self) -> int:
+        redis = await get_redis()
+        return await redis.llen(self.pending_key)
+
+async def _abandon_story(job_id: str, payload: Dict[str, Any]) -> None:
+    # without this the producer finds the checkpoint and enqueues the story again
+    await pipeline_state_repository.abandon(payload["hn_id"], reason="job dead-lettered")
+
+story_job_queue = JobQueue("stories", on_dead=_abandon_story)
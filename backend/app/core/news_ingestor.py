@@ -1,28 +1,96 @@
-from typing import List, Dict
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Dict, Optional
 from app.services.hn_service import hn_service
 from app.services.extraction_service import extraction_service
 from app.services.translate_service import translate_service
 from app.repositories.article_repository import article_repository
 from app.models.article import Article
-from app.services.contexts.story_contexts import StoryContext
+from app.services.contexts.story_contexts import StoryContext, StoryStage
+from app.repositories.pipeline_state_repository import pipeline_state_repository
+from app.core.job_queue import story_job_queue
+from app.core.distributed_lock import lease_lost
+from app.schemas.external.hn import HNRaw
 from app.services.vector_service import vector_service
 from app.core.decorators import monitor_news_ingestor
+from app.core.config import settings
 from app.core.logger import logger
 
 class NewsIngestor:
     @monitor_news_ingestor(step_name="Ingestion-Pipeline-Main")
     async def run(self) -> List[StoryContext]:
-        # 1. Fetch all stories from HN
+        if settings.pipeline_streaming_enabled:
+            return await self._run_streaming()
+        return await self._run_batch()
+
+    def _stop_if_lease_lost(self, next_step: str) -> bool:
+        # the run's lock expired: another process may be running it; it resumes our stories from their checkpoints
+        if lease_lost():
+            logger.warning(f"[NewsIngestor] Lock lost, stopping before {next_step}")
+            return True
+        return False
+
+    async def _checkpoint(self, ctx: StoryContext, stage: StoryStage) -> None:
+        ctx.stage = stage
+        await pipeline_state_repository.save(ctx)
+
+    async def _translation_failed(self, ctx: StoryContext) -> None:
+        """Count a failed translation in the checkpoint; abandon the story once it failed too often."""
+        if lease_lost():
+            # stopped rather than failed (e.g. a batch left to the next lock holder)
+            return
+        ctx.translation_attempts += 1
+        if ctx.translation_attempts < settings.pipeline_max_translation_attempts:
+            await pipeline_state_repository.save(ctx)
+            return
+        logger.warning(
+            f"[NewsIngestor] Translation of story {ctx.story.hn_id} failed {ctx.translation_attempts} times, abandoning it"
+        )
+        await pipeline_state_repository.abandon(ctx.story.hn_id, reason="translation failed")
+
+    async def _with_resumed(self, stories: List[HNRaw]) -> List[StoryContext]:
+        """
+        Combine fresh stories with unfinished ones checkpointed by an earlier (interrupted) run.
+        A resumed story keeps its progress and skips the stages it already completed.
+        Abandoned stories (given up on after repeated failures) are left out.
+        """
+        resumed = await pipeline_state_repository.load_all()
+        abandoned = await pipeline_state_repository.abandoned_ids(
+            [ctx.story.hn_id for ctx in resumed] + [story.hn_id for story in stories]
+        )
+        resumed = [ctx for ctx in resumed if ctx.story.hn_id not in abandoned]
+        if resumed:
+            logger.info(f"[NewsIngestor] Resuming {len(resumed)} unfinished stories from checkpoints")
+
+        resumed_ids = {ctx.story.hn_id for ctx in resumed}
+        fresh = [
+            StoryContext(story=story) for story in stories
+            if story.hn_id not in resumed_ids and story.hn_id not in abandoned
+        ]
+        return resumed + fresh
+
+    async def _run_batch(self) -> List[StoryContext]:
+        # 1. Fetch all stories from HN (+ unfinished stories from the last run)
         raw_stories = await hn_service.fetch_all_stories()
-        if not raw_stories:
+        contexts = await self._with_resumed(raw_stories)
+        if not contexts:
             logger.info("[NewsIngestor] No new stories.")
             return []
-        
-        contexts = [StoryContext(story=story) for story in raw_stories]
+
         logger.info(f"[NewsIngestor] Processing {len(contexts)} stories...")
+        await asyncio.gather(*(
+            pipeline_state_repository.save(ctx) for ctx in contexts if ctx.stage == StoryStage.FETCHED
+        ))
 
-        # 2. Batch Extraction
-        url_contexts = [ctx for ctx in contexts if ctx.story.original_url]
+        # 2. Triage: low-value stories are stored with their triage result and skip the rest
+        contexts = await self._triage_batch(contexts)
+
+        if self._stop_if_lease_lost("extraction"):
+            return []
+
+        # 3. Batch Extraction
+        pending_extraction = [ctx for ctx in contexts if ctx.stage < StoryStage.EXTRACTED]
+        url_contexts = [ctx for ctx in pending_extraction if ctx.story.original_url]
         if url_contexts:
             urls = [ctx.story.original_url for ctx in url_contexts]
             extracted_map = await extraction_service.extract_batch(urls)
@@ -32,12 +100,21 @@ class NewsIngestor:
                 if content is not None:
                     ctx.extracted_content = content
 
-        # 3. Batch AI Translation and Summarization
+        await asyncio.gather(*(self._checkpoint(ctx, StoryStage.EXTRACTED) for ctx in pending_extraction))
+
+        if self._stop_if_lease_lost("translation"):
+            return []
+
+        # 4. Batch AI Translation and Summarization
         valid_contexts = [ctx for ctx in contexts if ctx.has_valid_content]
+        await asyncio.gather(*(
+            pipeline_state_repository.delete(ctx.story.hn_id) for ctx in contexts if not ctx.has_valid_content
+        ))
+        pending_translation = [ctx for ctx in valid_contexts if ctx.stage < StoryStage.TRANSLATED]
 
-        if valid_contexts:
+        if pending_translation:
             ai_inputs: Dict[int, Dict[str, str]] = {}
-            for ctx in valid_contexts:
+            for ctx in pending_translation:
                 ai_inputs[ctx.story.hn_id] = {
                     "title": ctx.story.original_title,
                     "hn_text": ctx.story.original_text,
@@ -46,49 +123,327 @@ class NewsIngestor:
 
             ai_results_map = await translate_service.translate_and_summarize_batch(ai_inputs)
 
-            for ctx in valid_contexts:
-                ctx.ai_result = ai_results_map.get(ctx.story.hn_id)
+            for ctx in pending_translation:
+                summary = ai_results_map.get(ctx.story.hn_id)
+                if summary:
+                    ctx.ai_result, ctx.analysis_version = summary
+
+            await asyncio.gather(*(
+                self._checkpoint(ctx, StoryStage.TRANSLATED) if ctx.ai_result else self._translation_failed(ctx)
+                for ctx in pending_translation
+            ))
         
-        # 4. Save to Database
-        saved_count = 0
+        if self._stop_if_lease_lost("saving"):
+            return []
+
+        # 5. Save to Database (bulk upsert on hn_id)
         saved_articles: List[Article] = []
+        pending_save: Dict[int, StoryContext] = {}
 
         for ctx in valid_contexts:
-            if ctx.ai_result:
-                try:
-                    article: Article = ctx.to_article()
-                    saved_article = article_repository.add_article(article)
-                    if saved_article:
-                        saved_count += 1
-                        saved_articles.append(saved_article)
-                    else:
-                        logger.error(f"[NewsIngestor] Failed to save story {ctx.story.hn_id}: Insert returned None")
-                except Exception as e:
-                    logger.error(f"[NewsIngestor] Failed to save story {ctx.story.hn_id}: {e}")
+            if ctx.stage >= StoryStage.SAVED:
+                # saved before the restart, only the embedding is missing
+                saved_articles.append(ctx.to_article())
+            elif ctx.ai_result:
+                pending_save[ctx.story.hn_id] = ctx
+
+        inserted_articles = await article_repository.add_articles([ctx.to_article() for ctx in pending_save.values()])
+        saved_count = len(inserted_articles)
+        saved_articles.extend(inserted_articles)
+
+        for saved_article in inserted_articles:
+            ctx = pending_save.pop(saved_article.hn_id)
+            ctx.article_id = saved_article.id
+            await self._checkpoint(ctx, StoryStage.SAVED)
+
+        # not inserted: stored concurrently by another run, or the insert failed (retried via checkpoint)
+        for hn_id in pending_save:
+            if hn_id in article_repository.known_hn_ids:
+                await pipeline_state_repository.delete(hn_id)
+            else:
+                logger.error(f"[NewsIngestor] Failed to save story {hn_id}")
 
         logger.info(f"Successfully saved {saved_count} articles.")
 
         results = []
 
-        # 5. Batch Vectorization
-        if saved_articles:
+        # 6. Batch Vectorization
+        if saved_articles and not self._stop_if_lease_lost("vectorization"):
             logger.info(f"[NewsIngestor] Starting vectorization for {len(saved_articles)} new articles...")
             try:
                 results = await vector_service.process_and_store_articles_batch(saved_articles)
             except Exception as e:
                 logger.error(f"[NewsIngestor] vectorization batch failed: {e}")
 
+            # embedding failures are picked up by the backfill job, the checkpoint is no longer needed
+            await asyncio.gather(*(pipeline_state_repository.delete(article.hn_id) for article in saved_articles))
+
         return results
     
+    async def _run_stage(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[Any]],
+        in_queue: asyncio.Queue,
+        out_queue: Optional[asyncio.Queue],
+        workers: int,
+        next_workers: int = 0,
+    ) -> None:
+        """
+        Run `workers` consumers of `in_queue`; a None item tells a worker to stop.
+        Non-None handler results are forwarded to `out_queue`, and once every worker
+        has stopped, one stop marker per downstream worker is sent on.
+        """
+        async def worker():
+            while True:
+                item = await in_queue.get()
+                if item is None:
+                    return
+                if lease_lost():
+                    # drain without processing; the story's checkpoint lets the next holder resume it
+                    continue
+                try:
+                    result = await handler(item)
+                except Exception as e:
+                    logger.error(f"[NewsIngestor] {name} failed: {e}")
+                    continue
+                if result is not None and out_queue is not None:
+                    await out_queue.put(result)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        if out_queue is not None:
+            for _ in range(next_workers):
+                await out_queue.put(None)
+
+    async def _store_low_value(self, contexts: List[StoryContext]) -> None:
+        """
+        Store triaged-out stories with minimal metadata (no extraction, no analysis, no embedding),
+        so they are known hn_ids and never fetched or reconsidered again.
+        """
+        if not contexts:
+            return
+        saved = await article_repository.add_articles([ctx.to_article() for ctx in contexts])
+        for ctx in contexts:
+            if ctx.story.hn_id in article_repository.known_hn_ids:
+                await pipeline_state_repository.delete(ctx.story.hn_id)
+            else:
+                # keeps its TRIAGED checkpoint and is stored by the next run
+                logger.error(f"[NewsIngestor] Failed to save low-value story {ctx.story.hn_id}")
+        logger.bind(type="news_ingestor", step="Triage").info(
+            f"Stored {len(saved)} low-value stories (ai_score < {settings.triage_min_score}) without full processing"
+        )
+
+    async def _triage_batch(self, contexts: List[StoryContext]) -> List[StoryContext]:
+        # returns the contexts that go on to extraction and full summarization
+        if not settings.triage_enabled:
+            return contexts
+
+        pending = [ctx for ctx in contexts if ctx.stage < StoryStage.TRIAGED and ctx.has_valid_content]
+        if pending:
+            triage_map = await translate_service.triage_batch({
+                ctx.story.hn_id: {
+                    "title": ctx.story.original_title,
+                    "hn_text": ctx.story.original_text,
+                    "url": ctx.story.original_url,
+                } for ctx in pending
+            })
+            for ctx in pending:
+                ctx.triage = triage_map.get(ctx.story.hn_id)
+            await asyncio.gather(*(self._checkpoint(ctx, StoryStage.TRIAGED) for ctx in pending))
+
+        await self._store_low_value([ctx for ctx in contexts if ctx.is_low_value and ctx.stage < StoryStage.SAVED])
+        return [ctx for ctx in contexts if not ctx.is_low_value]
+
+    # --- Per-story stages (streaming pipeline and queue worker) ---
+    # each stage skips stories whose checkpoint shows it already ran
+
+    async def _triage_story(self, ctx: StoryContext) -> Optional[StoryContext]:
+        if settings.triage_enabled and ctx.stage < StoryStage.TRIAGED and ctx.has_valid_content:
+            ctx.triage = await translate_service.triage(
+                title=ctx.story.original_title,
+                hn_text=ctx.story.original_text,
+                url=ctx.story.original_url,
+            )
+            await self._checkpoint(ctx, StoryStage.TRIAGED)
+        if ctx.is_low_value and ctx.stage < StoryStage.SAVED:
+            await self._store_low_value([ctx])
+            return None
+        return ctx
+
+    async def _extract_story(self, ctx: StoryContext) -> Optional[StoryContext]:
+        if ctx.stage < StoryStage.EXTRACTED:
+            if ctx.story.original_url:
+                ctx.extracted_content = await extraction_service.extract_url(ctx.story.original_url)
+            await self._checkpoint(ctx, StoryStage.EXTRACTED)
+        if not ctx.has_valid_content:
+            await pipeline_state_repository.delete(ctx.story.hn_id)
+            return None
+        return ctx
+
+    async def _translate_story(self, ctx: StoryContext) -> Optional[StoryContext]:
+        if ctx.stage < StoryStage.TRANSLATED:
+            summary = await translate_service.translate_and_summarize(
+                title=ctx.story.original_title,
+                hn_text=ctx.story.original_text,
+                scraped_content=ctx.extracted_content,
+            )
+            if not summary:
+                await self._translation_failed(ctx)
+                return None
+            ctx.ai_result, ctx.analysis_version = summary
+            await self._checkpoint(ctx, StoryStage.TRANSLATED)
+        return ctx
+
+    async def _save_story(self, ctx: StoryContext) -> Optional[Article]:
+        if ctx.stage >= StoryStage.SAVED:
+            return ctx.to_article()
+
+        saved_article = await article_repository.add_article(ctx.to_article())
+        if not saved_article:
+            if ctx.story.hn_id in article_repository.known_hn_ids:
+                # stored concurrently by another run (upsert ignored the duplicate)
+                await pipeline_state_repository.delete(ctx.story.hn_id)
+            else:
+                logger.error(f"[NewsIngestor] Failed to save story {ctx.story.hn_id}: Insert returned None")
+            return None
+
+        ctx.article_id = saved_article.id
+        await self._checkpoint(ctx, StoryStage.SAVED)
+        # the article now owns the page text; drop the context's copy
+        ctx.extracted_content = None
+        return saved_article
+
+    async def _embed_article(self, article: Article) -> Optional[bool]:
+        result = await vector_service.process_and_store_article(article)
+        # embedding failures are picked up by the backfill job, the checkpoint is no longer needed
+        await pipeline_state_repository.delete(article.hn_id)
+        return result
+
+    async def process_story(self, ctx: StoryContext) -> bool:
+        """
+        Run one story through triage -> extract -> translate -> save -> embed (queue worker entry point).
+        Returns False when a stage produced no result, so the job can be retried.
+        """
+        triaged = await self._triage_story(ctx)
+        if triaged is None:
+            # low-value: done once it is stored
+            return ctx.story.hn_id in article_repository.known_hn_ids
+
+        ctx = await self._extract_story(triaged)
+        if ctx is None:
+            # nothing to translate; retrying would not change that
+            return True
+
+        ctx = await self._translate_story(ctx)
+        if ctx is None:
+            return False
+
+        article = await self._save_story(ctx)
+        if article is None:
+            # a duplicate stored by another run is done, a failed insert is retried
+            return ctx.story.hn_id in article_repository.known_hn_ids
+
+        await self._embed_article(article)
+        return True
+
+    async def enqueue_new_stories(self) -> int:
+        """
+        Producer side of the worker mode: fetch new stories and push one job per story
+        (plus unfinished checkpointed stories) onto the Redis job queue.
+        """
+        raw_stories = await hn_service.fetch_all_stories()
+        contexts = await self._with_resumed(raw_stories)
+
+        enqueued = 0
+        for ctx in contexts:
+            if ctx.stage == StoryStage.FETCHED:
+                await pipeline_state_repository.save(ctx)
+            if await story_job_queue.enqueue(str(ctx.story.hn_id), {"hn_id": ctx.story.hn_id}):
+                enqueued += 1
+
+        logger.bind(type="news_ingestor", step="Enqueue-Stories").info(
+            f"Enqueued {enqueued} story jobs ({len(contexts) - enqueued} already queued)"
+        )
+        return enqueued
+
+    async def _run_streaming(self) -> List[bool]:
+        """
+        Streaming pipeline: fetch -> triage -> extract -> translate -> save -> embed.
+        Stages are connected by bounded queues, so each story moves on as soon as its
+        own step finishes instead of waiting for the slowest story of the batch.
+        """
+        queue_size = settings.pipeline_queue_size
+        triage_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        extract_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        translate_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        save_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        triage_workers = settings.pipeline_triage_workers
+        extract_workers = settings.pipeline_extract_workers
+        translate_workers = settings.pipeline_translate_workers
+        save_workers = settings.pipeline_save_workers
+        embed_workers = settings.pipeline_embed_workers
+
+        start_time = time.time()
+        extraction_stats = extraction_service.stats_snapshot()
+        translate_stats = translate_service.stats_snapshot()
+        first_saved_at: Optional[float] = None
+        results: List[bool] = []
+
+        async def fetch():
+            try:
+                # unfinished stories from an interrupted run go first; each stage skips what they already did
+                for ctx in await self._with_resumed([]):
+                    await triage_queue.put(ctx)
+
+                async for story in hn_service.iter_new_stories():
+                    if self._stop_if_lease_lost("fetching more stories"):
+                        break
+                    ctx = StoryContext(story=story)
+                    await pipeline_state_repository.save(ctx)
+                    await triage_queue.put(ctx)
+            except Exception as e:
+                logger.error(f"[NewsIngestor] Fetch failed: {e}")
+            finally:
+                for _ in range(triage_workers):
+                    await triage_queue.put(None)
+
+        async def save(ctx: StoryContext) -> Optional[Article]:
+            nonlocal first_saved_at
+            saved_article = await self._save_story(ctx)
+            if saved_article and first_saved_at is None:
+                first_saved_at = time.time()
+                logger.info(f"[NewsIngestor] First article published after {first_saved_at - start_time:.2f}s")
+            return saved_article
+
+        async def embed(article: Article) -> None:
+            results.append(await self._embed_article(article))
+
+        await asyncio.gather(
+            fetch(),
+            self._run_stage("Triage", self._triage_story, triage_queue, extract_queue, triage_workers, extract_workers),
+            self._run_stage("Extract", self._extract_story, extract_queue, translate_queue, extract_workers, translate_workers),
+            self._run_stage("Translate", self._translate_story, translate_queue, save_queue, translate_workers, save_workers),
+            self._run_stage("Save", save, save_queue, embed_queue, save_workers, embed_workers),
+            self._run_stage("Embed", embed, embed_queue, None, embed_workers),
+        )
+
+        extraction_service.log_run_stats(extraction_stats)
+        translate_service.log_run_stats(translate_stats)
+        logger.info(f"[NewsIngestor] Streaming run stored {len(results)} articles.")
+        return results
+
     async def process_failed_embeddings(self, limit: int):
         """
         Backfill/Retry logic for articles that missed vectorization.
         Triggered by a scheduler job.
         """
         try:
-            pending_articles = article_repository.get_articles_without_embedding(limit)
+            pending_articles = await article_repository.get_articles_without_embedding(limit)
             
-            if not pending_articles:
+            if not pending_articles or self._stop_if_lease_lost("backfilling embeddings"):
                 return []
             
             logger.info(f"[NewsIngestor] Backfill: Found {len(pending_articles)}")
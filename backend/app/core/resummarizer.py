@@ -0,0 +1,104 @@
+import asyncio
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.distributed_lock import fenced_set, lease_lost
+from app.core.logger import logger
+from app.db.redis import get_redis
+from app.models.article import Article, AITranslatedResult
+from app.repositories.article_repository import article_repository
+from app.services.translate_service import translate_service
+from app.services.vector_service import vector_service
+
+class Resummarizer:
+    """
+    Refreshes stored analyses after a summarize prompt or model change.
+
+    Walks the archive in id order over articles whose analysis_version is none of the current
+    `translate_service.analysis_versions` (summarize prompt + a configured model), re-summarizes
+    them from the stored raw_content (no re-scraping) a page at a time, and re-embeds only the
+    articles whose embedded analysis text changed. The cursor is checkpointed in Redis per set of
+    versions, so an interrupted or capped run resumes where it stopped.
+    """
+    def _cursor_key(self, analysis_versions: List[str]) -> str:
+        return f"resummarize:cursor:{'+'.join(analysis_versions)}"
+
+    async def _load_cursor(self, analysis_versions: List[str]) -> int:
+        redis = await get_redis()
+        cursor = await redis.get(self._cursor_key(analysis_versions))
+        return int(cursor) if cursor else 0
+
+    async def _store(self, article: Article, result: AITranslatedResult, analysis_version: str) -> Optional[bool]:
+        """Store the new analysis; returns whether the article was re-embedded (None if the update failed)."""
+        # the stored full-text translation is kept (it does not depend on the summarize prompt)
+        result = result.model_copy(update={"url_content_trans": article.detailed_analysis.url_content_trans})
+        changed = vector_service.analysis_text(result) != vector_service.analysis_text(article.detailed_analysis)
+        # articles the backfill has not embedded yet are left to it (it reads the new analysis)
+        reembed = changed and article.is_embedded
+
+        # old chunks go first, while is_embedded is still set: the embedding backfill only picks up
+        # articles with it cleared, so it cannot embed this one between the delete and the re-embed
+        if reembed and not await vector_service.delete_article_chunks(article.id):
+            # nothing changed: the version is not updated and the next run retries the article
+            return None
+        if not await article_repository.update_analysis_version(article.id, result, analysis_version):
+            if reembed:
+                # the old analysis stays but its chunks are gone
+                await article_repository.mark_article_not_embedded(article.id)
+            return None
+        if not reembed:
+            return False
+
+        article.detailed_analysis = result
+        if await vector_service.process_and_store_article(article) is False:
+            await article_repository.mark_article_not_embedded(article.id)
+            return False
+        return True
+
+    async def run(self) -> int:
+        analysis_versions = translate_service.analysis_versions
+        cursor = await self._load_cursor(analysis_versions)
+        processed = updated = reembedded = 0
+
+        while processed < settings.resummarize_max_articles_per_run and not lease_lost():
+            limit = min(settings.resummarize_page_size, settings.resummarize_max_articles_per_run - processed)
+            articles = await article_repository.get_stale_analysis_articles(analysis_versions, cursor, limit)
+            if articles is None:
+                # query failed: keep the cursor, the next run continues from it
+                break
+            if not articles:
+                # reached the end: the next run starts over and retries the articles that failed
+                redis = await get_redis()
+                await redis.delete(self._cursor_key(analysis_versions))
+                break
+
+            inputs: Dict[int, Dict[str, Optional[str]]] = {
+                article.id: {
+                    "title": article.original_title,
+                    "hn_text": article.original_text,
+                    "scraped_content": article.raw_content or None,
+                }
+                for article in articles
+            }
+            results = await translate_service.translate_and_summarize_batch(inputs)
+            if lease_lost():
+                # another process may hold the job now; it redoes this page from the last checkpoint
+                logger.warning("[Resummarizer] Lock lost, stopping before storing the page")
+                break
+
+            stored = await asyncio.gather(*(
+                self._store(article, *results[article.id]) for article in articles if results.get(article.id)
+            ))
+            updated += sum(1 for outcome in stored if outcome is not None)
+            reembedded += sum(1 for outcome in stored if outcome)
+
+            processed += len(articles)
+            cursor = articles[-1].id
+            await fenced_set(self._cursor_key(analysis_versions), cursor)
+            await asyncio.sleep(settings.resummarize_page_delay_seconds)
+
+        logger.bind(type="news_ingestor", step="Resummarize").info(
+            f"Re-summarized {updated} of {processed} articles to versions {', '.join(analysis_versions)}, re-embedded {reembedded}"
+        )
+        return updated
+
+resummarizer = Resummarizer()
@@ -1,33 +1,76 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from app.core.news_ingestor import news_ingestor
+from app.core.resummarizer import resummarizer
+from app.services.vector_service import vector_service
+from app.core.distributed_lock import single_flight
 from app.core.logger import logger
 from app.core.config import settings
 from datetime import datetime
 
 scheduler = AsyncIOScheduler()
 
-async def start_scheduler():
+async def start_scheduler(worker: bool = False):
+    """
+    Register the ingestion jobs.
+    With `ingestion_worker_enabled`, ingestion belongs to the worker process (app.worker):
+    the API process schedules nothing and the worker's job only enqueues story jobs.
+    """
+    if settings.ingestion_worker_enabled and not worker:
+        logger.bind(type="news_ingestor", step="Scheduler").info("Ingestion runs in the worker process, scheduler not started.")
+        return
+
+    news_job = news_ingestor.enqueue_new_stories if worker else news_ingestor.run
+
     try:
+        # single_flight: exactly one run cluster-wide (Redis lock); max_instances/coalesce: no overlap in-process
         scheduler.add_job(
-            news_ingestor.run,
+            single_flight("news_ingestor_task")(news_job),
             trigger=IntervalTrigger(hours=settings.scheduler_news_ingestor_interval_hours),
             id="news_ingestor_task",
             name="News Ingestor Pipeline",
             replace_existing=True,
+            max_instances=1,
+            coalesce=True,
             next_run_time=datetime.now()
         )
 
         scheduler.add_job(
-            news_ingestor.process_failed_embeddings,
+            single_flight("backfill_vectors_task")(news_ingestor.process_failed_embeddings),
             kwargs={"limit": settings.openai_embedding_concurrent_limit},
             trigger=IntervalTrigger(minutes=settings.scheduler_back_fill_embedding_interval_minutes),
             id="backfill_vectors_task",
             name="Backfill Vectors",
             replace_existing=True,
+            max_instances=1,
+            coalesce=True,
             next_run_time=datetime.now()
         )
 
+        if settings.hybrid_search_enabled:
+            scheduler.add_job(
+                single_flight("backfill_lexemes_task")(vector_service.backfill_lexemes),
+                trigger=IntervalTrigger(minutes=settings.scheduler_back_fill_embedding_interval_minutes),
+                id="backfill_lexemes_task",
+                name="Backfill Lexemes",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now()
+            )
+
+        if settings.resummarize_enabled:
+            scheduler.add_job(
+                single_flight("resummarize_task")(resummarizer.run),
+                trigger=IntervalTrigger(hours=settings.scheduler_resummarize_interval_hours),
+                id="resummarize_task",
+                name="Re-summarize Stale Analyses",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now()
+            )
+
         scheduler.start()
         logger.bind(type="news_ingestor", step="Scheduler").info("Scheduler started. Task scheduled every 12h.")
         
@@ -35,6 +78,8 @@ async def start_scheduler():
         logger.error(f"Failed to start scheduler: {str(e)}")
     
 async def stop_scheduler():
+    if not scheduler.running:
+        return
     try:
         scheduler.shutdown()
         logger.bind(type="news_ingestor", step="Scheduler").info("Scheduler shut down..")
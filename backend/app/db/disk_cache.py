@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+from app.core.logger import logger
+
+class DiskCache:
+    """
+    Local disk key/value cache
+    - One file per key, named by the sha256 of the key
+    - Entries expire `ttl_seconds` after they were written
+    - zlib compression (optional, e.g. off for already dense binary payloads)
+    - When the directory grows past `max_bytes`, least recently read entries are evicted
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int, compress: bool = True):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            now = time.time()
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path, stat.st_size)
+                return None
+
+            data = path.read_bytes()
+            # access time drives eviction order, mtime keeps the write time for the TTL
+            os.utime(path, (now, stat.st_mtime))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"[DiskCache] Error reading {path}: {e}")
+            return None
+
+        try:
+            return zlib.decompress(data) if self.compress else data
+        except zlib.error:
+            self._remove(path, len(data))
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        data = zlib.compress(value) if self.compress else value
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous_size = path.stat().st_size if path.exists() else 0
+            # write to a temp file first so readers never see a partial entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"[DiskCache] Error writing {path}: {e}")
+            return
+
+        with self._lock:
+            total = self._current_total_bytes() + len(data) - previous_size
+            self._total_bytes = total
+            if total > self.max_bytes:
+                self._evict()
+
+    def get_text(self, key: str) -> Optional[str]:
+        value = self.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set_text(self, key: str, value: str) -> None:
+        self.set(key, value.encode("utf-8"))
+
+    async def aget(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: bytes) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    async def aget_text(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self.get_text, key)
+
+    async def aset_text(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self.set_text, key, value)
+
+    def _entries(self):
+        return [p for p in self.directory.glob("*/*") if p.suffix != ".tmp"]
+
+    def _current_total_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self._entries())
+        return self._total_bytes
+
+    def _remove(self, path: Path, size: int) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _evict(self) -> None:
+        # caller holds self._lock; shrink to 90% so eviction does not run on every write
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for p in self._entries():
+            try:
+                entries.append((p, p.stat()))
+            except FileNotFoundError:
+                continue
+        entries.sort(key=lambda item: item[1].st_atime)
+
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= stat.st_size
+            except FileNotFoundError:
+                continue
+        self._total_bytes = total
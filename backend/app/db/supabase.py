@@ -1,8 +1,16 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
 from supabase.client import create_client, Client
 from app.core.config import settings
 
 _supabase: Client | None = None
 
+# dedicated, bounded pool for the blocking supabase/PostgREST calls, so DB round-trips never run on
+# the event loop and cannot starve the default executor used by other to_thread work;
+# created on first use and shut down with the app (close_db_executor)
+_db_executor: Optional[ThreadPoolExecutor] = None
+
 def init_supabase() -> Client:
     global _supabase
     if _supabase is None:
@@ -12,4 +20,21 @@ def init_supabase() -> Client:
 def get_supabase() -> Client:
     if _supabase is None:
         raise ValueError("Supabase client not initialized")
-    return _supabase
\ No newline at end of file
+    return _supabase
+
+async def execute_query(query: Any) -> Any:
+    """
+    Run a built PostgREST query (table(...).select(...) / rpc(...)) on the DB executor and await its response.
+    """
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=settings.db_executor_max_workers, thread_name_prefix="supabase")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, query.execute)
+
+def close_db_executor():
+    global _db_executor
+    if _db_executor is not None:
+        # queued queries are dropped; the ones already running finish on their threads
+        _db_executor.shutdown(wait=False, cancel_futures=True)
+        _db_executor = None
@@ -3,9 +3,13 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.api.router import api_router
-from app.db.supabase import init_supabase
+from app.db.supabase import init_supabase, close_db_executor
 from app.core.scheduler import start_scheduler, stop_scheduler
 from app.db.redis import init_redis, close_redis
+from app.core.http_clients import init_http_clients, close_http_clients
+from app.repositories.article_repository import article_repository
+from app.services.vector_service import vector_service
+from app.core.logger import logger
 
 
 @asynccontextmanager
@@ -14,12 +18,21 @@ async def lifespan(app: FastAPI):
     supabase = init_supabase()
     app.state.supabase = supabase
     init_redis()
+    init_http_clients()
+    await vector_service.check_embedding_dimensions()
+    indexed = await article_repository.warm_hn_id_index()
+    logger.info(f"hn_id index warmed with {indexed} ids")
+    # loads in the background; search_similar uses the database until it is ready
+    vector_service.start_index()
     await start_scheduler()
     try:
         yield
     finally:
         await stop_scheduler()
+        await vector_service.stop_index()
+        await close_http_clients()
         await close_redis()
+        close_db_executor()
         app.state.supabase = None
 
 app = FastAPI(
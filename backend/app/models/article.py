@@ -14,6 +14,11 @@ class AITranslatedResult(BaseModel):
     original_text_trans: Optional[str] = Field(default=None, description="Original text translation")
     url_content_trans: Optional[str] = Field(default=None, description="URL Full-text translation")
 
+class TriageResult(BaseModel):
+    # cheap pre-screen on title + HN text, decides whether a story gets the full treatment
+    topic: str = Field(description="Article topic label")
+    ai_score: int = Field(description="Estimated AI score", ge=0, le=100)
+
 class CommentAnalysis(BaseModel):
     comment_trans: str = Field(description="Full-text translation of the comment")
 
@@ -52,6 +57,10 @@ class Article(BaseModel):
     favorites_count: Optional[int] = Field(default=0, description="number of favorites")
 
     detailed_analysis: Optional[AITranslatedResult]
+    # prompt/model version that produced detailed_analysis; older versions are re-summarized
+    analysis_version: Optional[str] = Field(default=None, description="Analysis prompt/model version")
+    # set when the story was triaged; low-value stories are stored with triage only (no detailed_analysis)
+    triage: Optional[TriageResult] = Field(default=None, description="Triage result")
     comment_analysis: Optional[List[CommentAnalysis]]
     
     class Config:
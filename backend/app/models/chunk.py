@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class DocumentChunkMetadata(BaseModel):
     source: str = "combined"
@@ -12,4 +12,6 @@ class DocumentChunk(BaseModel):
     content: str
     embedding: List[float]
     metadata: DocumentChunkMetadata
+    # full-text tokens (HYBRID_SEARCH_ENABLED); None leaves the column out of the insert
+    lexemes: Optional[List[str]] = None
 
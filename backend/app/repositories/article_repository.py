@@ -1,6 +1,7 @@
-from typing import Optional, Tuple, List
-from app.db.supabase import get_supabase
-from app.models.article import Article
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, List
+from app.db.supabase import get_supabase, execute_query
+from app.models.article import Article, AITranslatedResult
+from app.core.config import settings
 from app.core.logger import logger
 from app.schemas.article import SortField, SortOrder
 from datetime import datetime, timedelta, timezone
@@ -8,37 +9,117 @@ from datetime import datetime, timedelta, timezone
 class ArticleRepository:
     def __init__(self):
         self.table_name = "articles"
+        # in-process index of hn_ids known to be stored, warmed at startup and updated on insert
+        self.known_hn_ids: Set[int] = set()
     
     @property
     def supabase(self):
         return get_supabase()
     
-    def has_article(self, hn_id: int) -> bool:
+    async def has_article(self, hn_id: int) -> bool:
         try:
-            result = self.supabase.table(self.table_name)\
+            query = self.supabase.table(self.table_name)\
                 .select("id", count="exact", head=True)\
-                .eq("hn_id", hn_id)\
-                .execute()
+                .eq("hn_id", hn_id)
+            result = await execute_query(query)
             return result.count is not None and result.count > 0
         except Exception as e:
             logger.error(f"Error checking existence of article with hn_id {hn_id}: {e}")
             return False
-    
-    def add_article(self, article: Article) -> Optional[Article]:
+
+    async def warm_hn_id_index(self, page_size: int = 1000) -> int:
+        """
+        Load every stored hn_id into the in-process index.
+        Pages through the table because PostgREST caps the rows returned per request.
+        """
+        loaded: Set[int] = set()
         try:
-            data = article.model_dump(mode="json", exclude={"id"})
-            response = self.supabase.table(self.table_name).insert(data).execute()
-            if response.data:
-                return Article.model_validate(response.data[0])
-            return None
+            start = 0
+            while True:
+                query = self.supabase.table(self.table_name)\
+                    .select("hn_id")\
+                    .order("id")\
+                    .range(start, start + page_size - 1)
+                result = await execute_query(query)
+                rows = result.data or []
+                loaded.update(row["hn_id"] for row in rows)
+                if len(rows) < page_size:
+                    break
+                start += page_size
         except Exception as e:
-            logger.error(f"Error adding article: {e}")
-            return None
+            logger.error(f"[ArticleRepository] Error warming hn_id index: {e}")
+
+        self.known_hn_ids.update(loaded)
+        return len(self.known_hn_ids)
+
+    async def get_existing_hn_ids(self, hn_ids: Iterable[int]) -> Tuple[Set[int], Set[int]]:
+        """
+        Return (the subset of hn_ids that are already stored, the ids that could not be checked).
+        Ids found in the in-process index skip the database; the rest are checked
+        with one `in` query per batch of `settings.hn_exists_batch_size` ids.
+        """
+        existing = {hn_id for hn_id in hn_ids if hn_id in self.known_hn_ids}
+        unknown = [hn_id for hn_id in hn_ids if hn_id not in self.known_hn_ids]
+        unchecked: Set[int] = set()
+
+        batch_size = settings.hn_exists_batch_size
+        for i in range(0, len(unknown), batch_size):
+            batch = unknown[i:i + batch_size]
+            try:
+                query = self.supabase.table(self.table_name)\
+                    .select("hn_id")\
+                    .in_("hn_id", batch)
+                result = await execute_query(query)
+                found = {row["hn_id"] for row in result.data or []}
+            except Exception as e:
+                logger.error(f"[ArticleRepository] Error checking existence of {len(batch)} hn_ids: {e}")
+                # not fetched now (a DB hiccup never pays the LLM for duplicates); callers must
+                # keep these ids eligible for the next run
+                unchecked.update(batch)
+                continue
+
+            self.known_hn_ids.update(found)
+            existing.update(found)
+
+        return existing, unchecked
     
-    def get_articles(self, skip: int, limit: int, sort_by: SortField, order: SortOrder) -> Tuple[List[dict], int]:
+    async def add_article(self, article: Article) -> Optional[Article]:
+        saved_articles = await self.add_articles([article])
+        return saved_articles[0] if saved_articles else None
+
+    async def add_articles(self, articles: List[Article]) -> List[Article]:
+        """
+        Bulk insert in batches of `settings.db_bulk_batch_size` rows.
+        Upserts on hn_id ignoring duplicates, so a story already stored by a concurrent run
+        is skipped instead of failing the batch; only newly inserted rows are returned.
+        """
+        saved_articles: List[Article] = []
+        batch_size = settings.db_bulk_batch_size
+
+        for i in range(0, len(articles), batch_size):
+            batch = articles[i:i + batch_size]
+            try:
+                rows = [article.model_dump(mode="json", exclude={"id"}) for article in batch]
+                query = self.supabase.table(self.table_name)\
+                    .upsert(rows, on_conflict="hn_id", ignore_duplicates=True)
+                response = await execute_query(query)
+            except Exception as e:
+                logger.error(f"Error adding {len(batch)} articles: {e}")
+                continue
+
+            # inserted or already present: either way the hn_ids are stored now
+            self.known_hn_ids.update(article.hn_id for article in batch)
+            saved_articles.extend(Article.model_validate(row) for row in response.data or [])
+
+        return saved_articles
+    
+    async def get_articles(self, skip: int, limit: int, sort_by: SortField, order: SortOrder) -> Tuple[List[dict], int]:
         try:
             # use count = "exact" to get the total number of articles
-            query = self.supabase.table(self.table_name).select("*", count="exact")
+            # low-value stories stored by triage have no analysis and are not listed
+            query = self.supabase.table(self.table_name)\
+                .select("*", count="exact")\
+                .not_.is_("detailed_analysis", "null")
 
             is_desc = (order == SortOrder.DESC)
             if sort_by == SortField.AI_SCORE:
@@ -49,36 +130,89 @@ class ArticleRepository:
                 query = query.order("posted_at", desc=is_desc)
 
             query = query.range(skip, skip + limit - 1)
-            result = query.execute()
+            result = await execute_query(query)
             return (result.data, result.count if result.count is not None else 0)
             
         except Exception as e:
             logger.error(f"Error getting articles: {e}")
             return ([], 0)
 
-    def get_article_by_id(self, article_id: int) -> Optional[Article]:
+    async def get_article_by_id(self, article_id: int) -> Optional[Article]:
         try:
-            result = self.supabase.table(self.table_name)\
+            query = self.supabase.table(self.table_name)\
                 .select("*")\
                 .eq("id", article_id)\
-                .single()\
-                .execute()
+                .single()
+            result = await execute_query(query)
             return Article.model_validate(result.data) if result.data else None
         except Exception as e:
             logger.error(f"Error getting article by article_id {article_id}: {e}")
             return None
 
-    def get_articles_without_embedding(self, limit: int = 10) -> List[Article]:
+    async def _merge_detailed_analysis(
+        self, article_id: int, patch: Dict[str, Any], analysis_version: Optional[str] = None
+    ) -> bool:
+        # merged in the database (db/functions/merge_detailed_analysis.sql): keys outside `patch` keep
+        # whatever a concurrent writer stored, where writing back a whole read-modified blob would lose them
+        params = {"article_id": article_id, "patch": patch, "new_analysis_version": analysis_version}
+        response = await execute_query(self.supabase.rpc("merge_detailed_analysis", params))
+        return bool(response.data)
+
+    async def update_translation(self, article_id: int, translation: str) -> bool:
+        """Store the full-text translation (`url_content_trans`) without touching the rest of the analysis."""
+        try:
+            return await self._merge_detailed_analysis(article_id, {"url_content_trans": translation})
+        except Exception as e:
+            logger.error(f"[ArticleRepository] Error storing translation of article {article_id}: {e}")
+            return False
+
+    async def get_stale_analysis_articles(self, analysis_versions: List[str], after_id: int, limit: int) -> Optional[List[Article]]:
+        """
+        Analyzed articles whose analysis_version is none of `analysis_versions`, by id after `after_id`;
+        None on error, so callers can tell a failed query from the end of the archive.
+        """
+        try:
+            current = ",".join(f'"{version}"' for version in analysis_versions)
+            query = self.supabase.table(self.table_name)\
+                .select("*")\
+                .not_.is_("detailed_analysis", "null")\
+                .or_(f"analysis_version.is.null,analysis_version.not.in.({current})")\
+                .gt("id", after_id)\
+                .order("id")\
+                .limit(limit)
+            result = await execute_query(query)
+            return [Article.model_validate(item) for item in result.data or []]
+        except Exception as e:
+            logger.error(f"[ArticleRepository] Error getting articles with stale analysis: {e}")
+            return None
+
+    async def update_analysis_version(
+        self,
+        article_id: int,
+        analysis: AITranslatedResult,
+        analysis_version: str,
+    ) -> bool:
+        try:
+            # the full-text translation is generated separately and does not depend on the summarize prompt
+            patch = analysis.model_dump(mode="json", exclude={"url_content_trans"})
+            return await self._merge_detailed_analysis(article_id, patch, analysis_version)
+        except Exception as e:
+            logger.error(f"[ArticleRepository] Error updating analysis of article {article_id}: {e}")
+            return False
+
+    async def get_articles_without_embedding(self, limit: int = 10) -> List[Article]:
         try:
             cutoff_time = (datetime.now(timezone.utc) - timedelta(minutes=10)).isoformat()
 
-            result = self.supabase.table(self.table_name)\
+            query = self.supabase.table(self.table_name)\
                 .select("*")\
                 .eq("is_embedded", False)\
+                .not_.is_("detailed_analysis", "null")\
                 .lt("created_at", cutoff_time)\
                 .order("id", desc=True)\
-                .limit(limit)\
-                .execute()
+                .limit(limit)
+
+            result = await execute_query(query)
             
             if result.data:
                 return [Article.model_validate(item) for item in result.data]
@@ -87,15 +221,42 @@ class ArticleRepository:
             logger.error(f"[ArticleRepository] Error getting pending embedding articles: {e}")
             return []
 
-    def mark_article_embedded(self, article_id: int) -> bool:
+    async def mark_article_embedded(self, article_id: int) -> bool:
         try:
-            response = self.supabase.table(self.table_name)\
+            query = self.supabase.table(self.table_name)\
                 .update({"is_embedded": True})\
-                .eq("id", article_id)\
-                .execute()
+                .eq("id", article_id)
+            response = await execute_query(query)
 
             return bool(response.data)
         except Exception as e:
             logger.error(f"[ArticleRepository] Error marking article {article_id} as embedded: {e}")
 
+    async def mark_article_not_embedded(self, article_id: int) -> bool:
+        """Hand the article to the embedding backfill (`get_articles_without_embedding`)."""
+        try:
+            query = self.supabase.table(self.table_name)\
+                .update({"is_embedded": False})\
+                .eq("id", article_id)
+            response = await execute_query(query)
+            return bool(response.data)
+        except Exception as e:
+            logger.error(f"[ArticleRepository] Error marking article {article_id} as not embedded: {e}")
+            return False
+
+    async def mark_articles_embedded(self, article_ids: List[int]) -> int:
+        marked = 0
+        batch_size = settings.db_bulk_batch_size
+        for i in range(0, len(article_ids), batch_size):
+            batch = article_ids[i:i + batch_size]
+            try:
+                query = self.supabase.table(self.table_name)\
+                    .update({"is_embedded": True})\
+                    .in_("id", batch)
+                response = await execute_query(query)
+                marked += len(response.data or [])
+            except Exception as e:
+                logger.error(f"[ArticleRepository] Error marking {len(batch)} articles as embedded: {e}")
+        return marked
+
 article_repository = ArticleRepository()
\ No newline at end of file
@@ -1,9 +1,8 @@
-from app.db.supabase import get_supabase
+from app.db.supabase import get_supabase, execute_query
 from typing import Optional, List, Dict, Any
 from app.core.config import settings
 from app.core.logger import logger
 from datetime import datetime
-import asyncio
 import json
 from app.db.redis import get_redis
 
@@ -30,7 +29,7 @@ class ChatRepository:
                 .insert(payload)\
                 .single()
 
-            result = await asyncio.to_thread(query.execute())
+            result = await execute_query(query)
             
             if result.data and "id" in result.data:
                 return result.data["id"]
@@ -51,7 +50,7 @@ class ChatRepository:
             query = query.order("updated_at", desc=True)\
                 .range(skip, skip + limit - 1)
 
-            result = await asyncio.to_thread(query.execute)
+            result = await execute_query(query)
             
             return result.data if result.data else []
         except Exception as e:
@@ -65,7 +64,7 @@ class ChatRepository:
                 .eq("id", conversation_id)\
                 .eq("user_id", user_id)\
                 .single()
-            result = await asyncio.to_thread(query.execute)
+            result = await execute_query(query)
             return result.data if result.data else None
         except Exception as e:
             logger.error(f"Error fetching conversation by id: {e}")
@@ -76,7 +75,7 @@ class ChatRepository:
             query = self.supabase.table(self.conversation_table)\
                 .update({"updated_at": datetime.now().isoformat()})\
                 .eq("id", conversation_id)
-            result = await asyncio.to_thread(query.execute)
+            result = await execute_query(query)
             return True
         except Exception as e:
             logger.error(f"Error updating conversation timestamp: {e}")
@@ -88,7 +87,7 @@ class ChatRepository:
                 .delete()\
                 .eq("id", conversation_id)\
                 .eq("user_id", user_id)
-            await asyncio.to_thread(query.execute)
+            await execute_query(query)
 
             redis = await get_redis()
             cache_key = f"chat:{conversation_id}"
@@ -110,7 +109,7 @@ class ChatRepository:
             }
             query = self.supabase.table(self.messages_table)\
                 .insert(payload)
-            await asyncio.to_thread(query.execute)
+            await execute_query(query)
 
             redis = await get_redis()
             cache_key = f"chat:{conversation_id}"
@@ -140,7 +139,7 @@ class ChatRepository:
                 .eq("conversation_id", conversation_id)\
                 .order("created_at", desc=True)\
                 .limit(limit)
-            result = await asyncio.to_thread(query.execute)
+            result = await execute_query(query)
 
             messages = result.data if result.data else []
 
@@ -0,0 +1,107 @@
+from typing import Iterable, List, Optional, Set
+from app.core.config import settings
+from app.core.logger import logger
+from app.db.redis import get_redis
+from app.services.contexts.story_contexts import StoryContext
+
+class PipelineStateRepository:
+    """
+    Per-story pipeline checkpoints in Redis.
+    Each story is stored under its own key (with a TTL) and indexed in a set so
+    unfinished stories can be listed after a restart. A story given up on is tombstoned
+    (`pipeline:abandoned:{hn_id}`) so producers don't pick it up again.
+    """
+    def __init__(self):
+        self.key_prefix = "pipeline:story:"
+        self.index_key = "pipeline:stories"
+        self.abandoned_prefix = "pipeline:abandoned:"
+
+    def _key(self, hn_id: int) -> str:
+        return f"{self.key_prefix}{hn_id}"
+
+    def _abandoned_key(self, hn_id: int) -> str:
+        return f"{self.abandoned_prefix}{hn_id}"
+
+    async def save(self, ctx: StoryContext) -> bool:
+        try:
+            redis = await get_redis()
+            await redis.set(self._key(ctx.story.hn_id), ctx.to_checkpoint(), ex=settings.pipeline_state_ttl_seconds)
+            await redis.sadd(self.index_key, ctx.story.hn_id)
+            return True
+        except Exception as e:
+            logger.error(f"[PipelineStateRepository] Error saving checkpoint for {ctx.story.hn_id}: {e}")
+            return False
+
+    async def delete(self, hn_id: int) -> bool:
+        try:
+            redis = await get_redis()
+            await redis.delete(self._key(hn_id))
+            await redis.srem(self.index_key, hn_id)
+            return True
+        except Exception as e:
+            logger.error(f"[PipelineStateRepository] Error deleting checkpoint for {hn_id}: {e}")
+            return False
+
+    async def abandon(self, hn_id: int, reason: str) -> bool:
+        """Drop the story's checkpoint and tombstone it for `pipeline_abandoned_ttl_seconds`."""
+        try:
+            redis = await get_redis()
+            await redis.set(self._abandoned_key(hn_id), reason, ex=settings.pipeline_abandoned_ttl_seconds)
+            await redis.delete(self._key(hn_id))
+            await redis.srem(self.index_key, hn_id)
+            return True
+        except Exception as e:
+            logger.error(f"[PipelineStateRepository] Error abandoning story {hn_id}: {e}")
+            return False
+
+    async def abandoned_ids(self, hn_ids: Iterable[int]) -> Set[int]:
+        hn_ids = list(hn_ids)
+        if not hn_ids:
+            return set()
+        try:
+            redis = await get_redis()
+            reasons = await redis.mget([self._abandoned_key(hn_id) for hn_id in hn_ids])
+            return {hn_id for hn_id, reason in zip(hn_ids, reasons) if reason is not None}
+        except Exception as e:
+            # unknown: treat none as abandoned, a dead story is at worst retried once more
+            logger.error(f"[PipelineStateRepository] Error checking abandoned stories: {e}")
+            return set()
+
+    async def load(self, hn_id: int) -> Optional[StoryContext]:
+        try:
+            redis = await get_redis()
+            payload = await redis.get(self._key(hn_id))
+            return StoryContext.from_checkpoint(payload) if payload else None
+        except Exception as e:
+            logger.error(f"[PipelineStateRepository] Error loading checkpoint for {hn_id}: {e}")
+            return None
+
+    async def load_all(self) -> List[StoryContext]:
+        try:
+            redis = await get_redis()
+            hn_ids = list(await redis.smembers(self.index_key))
+            if not hn_ids:
+                return []
+
+            payloads = await redis.mget([self._key(int(hn_id)) for hn_id in hn_ids])
+
+            contexts: List[StoryContext] = []
+            expired = []
+            for hn_id, payload in zip(hn_ids, payloads):
+                if payload is None:
+                    expired.append(hn_id)
+                    continue
+                try:
+                    contexts.append(StoryContext.from_checkpoint(payload))
+                except Exception as e:
+                    logger.error(f"[PipelineStateRepository] Dropping unreadable checkpoint for {hn_id}: {e}")
+                    expired.append(hn_id)
+
+            if expired:
+                await redis.srem(self.index_key, *expired)
+            return contexts
+        except Exception as e:
+            logger.error(f"[PipelineStateRepository] Error loading checkpoints: {e}")
+            return []
+
+pipeline_state_repository = PipelineStateRepository()
@@ -1,27 +1,125 @@
-from app.db.supabase import get_supabase
-from typing import List, Dict, Any
+import asyncio
+import json
+from app.db.supabase import get_supabase, execute_query
+from typing import List, Dict, Any, Optional
+import numpy as np
+from app.core.config import settings
 from app.core.logger import logger
 from app.models.chunk import DocumentChunk
 
 class VectorRepository:
     def __init__(self):
         self.table_name = "document_chunks"
+        self.match_function = "match_documents_halfvec" if settings.embedding_storage == "halfvec" else "match_documents"
     
     @property
     def supabase(self):
         return get_supabase()
     
-    def add_chunks(self, chunks: List[DocumentChunk]) -> bool:
+    def encode_vector(self, vector: List[float]) -> str:
+        """
+        pgvector text literal with only the digits the column keeps: a JSON float list spends
+        ~20 characters per float64 value, float32 needs 7 significant digits and float16 needs 5.
+        """
+        if settings.embedding_storage == "halfvec":
+            values = np.asarray(vector, dtype=np.float16)
+            return "[" + ",".join(f"{value:.5g}" for value in values.tolist()) + "]"
+        values = np.asarray(vector, dtype=np.float32)
+        return "[" + ",".join(f"{value:.7g}" for value in values.tolist()) + "]"
+
+    async def add_chunks(self, chunks: List[DocumentChunk]) -> bool:
         try:
             # Convert Pydantic models to list of dicts for Supabase insertion
-            records = [chunk.model_dump() for chunk in chunks]
-            self.supabase.table(self.table_name).insert(records).execute()
+            records = []
+            for chunk in chunks:
+                record = chunk.model_dump(exclude_none=True)
+                record["embedding"] = self.encode_vector(chunk.embedding)
+                records.append(record)
+            query = self.supabase.table(self.table_name).insert(records)
+            await execute_query(query)
             return True
         except Exception as e:
             logger.error(f"Error adding document chunks: {e}")
             return False
 
-    def search_similar(
+    async def get_stored_dimensions(self) -> Optional[int]:
+        """Width of the stored embeddings (from one row), None if there are none yet or it can't be read."""
+        try:
+            query = self.supabase.table(self.table_name).select("embedding").limit(1)
+            response = await execute_query(query)
+            if not response.data or response.data[0].get("embedding") is None:
+                return None
+            embedding = response.data[0]["embedding"]
+            return len(json.loads(embedding) if isinstance(embedding, str) else embedding)
+        except Exception as e:
+            logger.warning(f"Could not read the stored embedding width, skipping the check: {e}")
+            return None
+
+    async def get_chunks_after(self, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        # chunks (with embeddings) in id order, for loading the in-process index
+        try:
+            query = self.supabase.table(self.table_name)\
+                .select("id, content, metadata, embedding")\
+                .gt("id", after_id)\
+                .order("id")\
+                .limit(limit)
+            response = await execute_query(query)
+            return response.data or []
+        except Exception as e:
+            logger.error(f"Error loading document chunks after {after_id}: {e}")
+            return []
+
+    async def delete_chunks(self, article_id: int) -> Optional[List[int]]:
+        # returns the ids of the deleted chunks (None on error), so in-process indexes can drop exactly those
+        try:
+            query = self.supabase.table(self.table_name).select("id").eq("article_id", article_id)
+            response = await execute_query(query)
+            chunk_ids = [row["id"] for row in response.data or []]
+            if chunk_ids:
+                query = self.supabase.table(self.table_name).delete().in_("id", chunk_ids)
+                await execute_query(query)
+            return chunk_ids
+        except Exception as e:
+            logger.error(f"Error deleting document chunks of article {article_id}: {e}")
+            return None
+
+    async def get_chunks_without_lexemes(self, limit: int) -> List[Dict[str, Any]]:
+        # chunks stored before hybrid search was enabled
+        try:
+            query = self.supabase.table(self.table_name)\
+                .select("id, content")\
+                .is_("lexemes", "null")\
+                .order("id")\
+                .limit(limit)
+            response = await execute_query(query)
+            return response.data or []
+        except Exception as e:
+            logger.error(f"Error loading document chunks without lexemes: {e}")
+            return []
+
+    async def _update_chunk_lexemes(self, chunk_id: int, tokens: List[str]) -> bool:
+        try:
+            query = self.supabase.table(self.table_name)\
+                .update({"lexemes": tokens})\
+                .eq("id", chunk_id)
+            response = await execute_query(query)
+            return bool(response.data)
+        except Exception as e:
+            logger.error(f"Error updating lexemes of document chunk {chunk_id}: {e}")
+            return False
+
+    async def update_lexemes(self, lexemes: Dict[int, List[str]]) -> int:
+        """
+        Write the lexemes of existing chunks; returns how many were updated. An UPDATE per row
+        (concurrently, bounded by the DB executor): an upsert on id would insert a bare row for
+        a chunk deleted since it was read.
+        """
+        updated = await asyncio.gather(*(
+            self._update_chunk_lexemes(chunk_id, tokens) for chunk_id, tokens in lexemes.items()
+        ))
+        return sum(updated)
+
+    async def search_similar(
         self,
         query_embedding: List[float],
         match_threshold: float = 0.5,
@@ -29,13 +127,13 @@ class VectorRepository:
     ) -> List[Dict[str, Any]]:
         try:
             params = {
-                "query_embedding": query_embedding,
+                "query_embedding": self.encode_vector(query_embedding),
                 "match_threshold": match_threshold,
                 "match_count": match_count,
                 "filter": {}
             }
 
-            response = self.supabase.rpc("match_documents", params).execute()
+            response = await execute_query(self.supabase.rpc(self.match_function, params))
 
             return response.data if response.data else []
 
@@ -44,4 +142,23 @@ class VectorRepository:
             return []
 
 
-vector_repository = VectorRepository() 
\ No newline at end of file
+    async def search_lexical(self, query_lexemes: List[str], match_count: int = 5) -> List[Dict[str, Any]]:
+        if not query_lexemes:
+            return []
+        try:
+            params = {
+                "query_lexemes": query_lexemes,
+                "match_count": match_count,
+                "filter": {}
+            }
+
+            response = await execute_query(self.supabase.rpc("match_documents_lexical", params))
+
+            return response.data if response.data else []
+
+        except Exception as e:
+            logger.error(f"[ChunkRepository] Error searching documents by lexemes: {e}")
+            return []
+
+
+vector_repository = VectorRepository()
\ No newline at end of file
@@ -33,6 +33,7 @@ class ArticleSchema(BaseModel):
     type: str = Field(description="Article Type")
 
     detailed_analysis: Optional[AITranslatedResult] = Field(default=None, description="AI Analysis Result")
+    full_translation_status: Optional[str] = Field(default=None, description="ready / pending (stream it from /articles/{id}/translation) / unavailable")
 
     # Statistics
     descendants: Optional[int] = Field(default=None, description="In the case of stories or polls, the total comment count")
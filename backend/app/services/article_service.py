@@ -1,15 +1,16 @@
 import math
 from fastapi import HTTPException
-from typing import Optional
+from typing import AsyncIterator, Optional
 from app.repositories.article_repository import article_repository
 from app.schemas.article import ArticleFilterParams, ArticleSchema, ArticleListResponse
 from app.services.interaction_service import interaction_service
+from app.services.full_translation_service import full_translation_service
 
 class ArticleService:
-    def get_article_list(self, params: ArticleFilterParams) -> ArticleListResponse:
+    async def get_article_list(self, params: ArticleFilterParams) -> ArticleListResponse:
         skip = (params.page - 1) * params.size
 
-        data, total = article_repository.get_articles(
+        data, total = await article_repository.get_articles(
             skip=skip,
             limit=params.size,
             sort_by=params.sort_by,
@@ -28,25 +29,34 @@ class ArticleService:
             total_pages=total_pages,
         )
 
-    def get_article_detail(self, article_id: int, user_id: Optional[str] = None) -> ArticleSchema:
-        article = article_repository.get_article_by_id(article_id)
+    async def get_article_detail(self, article_id: int, user_id: Optional[str] = None) -> ArticleSchema:
+        article = await article_repository.get_article_by_id(article_id)
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
 
         article_data = article.model_dump()
 
+        # the full-text translation is generated lazily, by the first request for its stream
+        article_data["full_translation_status"] = full_translation_service.status(article)
+
         article_data["is_favorited"] = False
         article_data["is_read_later"] = False
 
         if user_id:
-            status = interaction_service.get_interaction_status(user_id, article_id)
+            status = await interaction_service.get_interaction_status(user_id, article_id)
             article_data.update(status)
         
         return ArticleSchema.model_validate(article_data)
     
-    def get_article_context(self, article_id: int) -> dict:
+    async def stream_full_translation(self, article_id: int, client: Optional[str] = None) -> AsyncIterator[str]:
+        article = await article_repository.get_article_by_id(article_id)
+        if not article:
+            raise HTTPException(status_code=404, detail="Article not found")
+        return full_translation_service.stream(article, client)
+
+    async def get_article_context(self, article_id: int) -> dict:
         # get article context from database
-        data = article_repository.get_article_by_id(article_id)
+        data = await article_repository.get_article_by_id(article_id)
         if not data:
             raise HTTPException(status_code=404, detail="Article not found")
 
@@ -11,7 +11,6 @@ from app.services.article_service import article_service
 from app.services.vector_service import vector_service
 from app.repositories.chat_repository import chat_repository
 from app.schemas.chat import ChatMessage, ConversationSchema, ConversationMessageSchema
-import asyncio
 
 
 llm = ChatGoogleGenerativeAI(
@@ -70,7 +69,7 @@ class ChatService:
         history_objs = [ChatMessage(role=msg["role"], content=msg["content"]) for msg in raw_history_messages]
         lc_history = self._convert_history(history_objs)
 
-        article_data = await asyncio.to_thread(article_service.get_article_context, article_id)
+        article_data = await article_service.get_article_context(article_id)
 
         full_ai_response = ""
         async for chunk in chain.astream({
@@ -0,0 +1,265 @@
+import re
+import threading
+from typing import List, Optional, Tuple
+import tiktoken
+from app.core.config import settings
+from app.core.logger import logger
+
+# Jina reader metadata lines ("Title: ...", "URL Source: ...", "Markdown Content:")
+METADATA_LINE = re.compile(r"^(Title|URL Source|Published Time|Markdown Content|Warning):", re.IGNORECASE)
+IMAGE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+BARE_URL = re.compile(r"https?://\S+")
+HEADING = re.compile(r"^#{1,6}\s")
+HORIZONTAL_RULE = re.compile(r"^\s*([-*_=]\s*){3,}$")
+LIST_MARKER = re.compile(r"^\s*([-*+]|\d+\.)\s+")
+# opening ``` / ~~~ of a fenced code block, and indented code
+FENCE = re.compile(r"^(`{3,}|~{3,})")
+INDENTED_CODE = re.compile(r"^( {4}|\t)")
+# a line of prose (or code) ends like a sentence; menu entries and footer links don't
+SENTENCE_END = re.compile(r"[.!?:;,。！？：；，)\]}]$")
+# page chrome phrases, dropped from nav/footer-like runs of lines
+BOILERPLATE = re.compile(
+    r"cookie|accept all|privacy policy|terms of (service|use)|all rights reserved|subscribe|newsletter|"
+    r"sign (in|up)|log ?in|skip to (main )?content|share (this|on)|follow us|advertisement|"
+    r"post navigation|read more|back to top|toggle (menu|navigation)",
+    re.IGNORECASE,
+)
+BOILERPLATE_MAX_CHARS = 120
+
+class CompactionService:
+    """
+    Shrinks scraped markdown before it is sent to the LLM:
+    strips page boilerplate locally, then fits the text into a token budget,
+    keeping leading sections whole and the headings of the sections that did not fit.
+    """
+    def __init__(self):
+        self.token_budget = settings.llm_input_token_budget
+        self._encoding: Optional[tiktoken.Encoding] = None
+        self._encoding_failed = False
+        # compaction runs in worker threads; load the tokenizer once
+        self._encoding_lock = threading.Lock()
+
+    @property
+    def encoding(self) -> Optional[tiktoken.Encoding]:
+        # loaded lazily: tiktoken downloads the BPE file on first use
+        if self._encoding is None and not self._encoding_failed:
+            with self._encoding_lock:
+                if self._encoding is None and not self._encoding_failed:
+                    try:
+                        self._encoding = tiktoken.get_encoding(settings.llm_input_encoding)
+                    except Exception as e:
+                        self._encoding_failed = True
+                        logger.error(f"[CompactionService] Could not load tokenizer {settings.llm_input_encoding}, estimating tokens: {e}")
+        return self._encoding
+
+    def count_tokens(self, text: str) -> int:
+        if self.encoding:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        # rough estimate: one token per CJK character, ~4 characters per token otherwise
+        non_ascii = sum(1 for ch in text if ord(ch) > 127)
+        return non_ascii + (len(text) - non_ascii) // 4
+
+    def truncate_tokens(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        if self.encoding:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self.encoding.decode(tokens[:max_tokens])
+        # no tokenizer: shrink until the estimate fits
+        while text and self.count_tokens(text) > max_tokens:
+            text = text[:int(len(text) * 0.9)]
+        return text
+
+    def _is_chrome(self, run: List[Tuple[str, bool]]) -> bool:
+        """
+        Whether a run of consecutive lines (stripped text, had links) looks like a nav bar, menu
+        or footer: mostly links, or only short lines that don't end like a sentence.
+        """
+        lines = [(text, has_links) for text, has_links in run if not HEADING.match(text)]
+        if not lines:
+            return False
+        if 2 * sum(has_links for _, has_links in lines) >= len(lines):
+            return True
+        return all(len(text) <= BOILERPLATE_MAX_CHARS and not SENTENCE_END.search(text) for text, _ in lines)
+
+    def strip_boilerplate(self, markdown: str) -> str:
+        """
+        Drop Jina metadata, images, link-only lines and rules; in nav/footer-like runs also drop
+        page chrome phrases and lines repeated from an earlier such run (header and footer menus).
+        Code (fenced or indented) and the indentation of the other lines are kept as they are.
+        """
+        lines: List[str] = []
+        run: List[Tuple[str, str, bool]] = []  # (line, stripped, had links) of the current paragraph
+        seen_chrome = set()
+        fence: Optional[str] = None
+
+        def flush() -> None:
+            chrome = self._is_chrome([(stripped, has_links) for _, stripped, has_links in run])
+            for line, stripped, _ in run:
+                if chrome and not HEADING.match(stripped):
+                    if BOILERPLATE.search(stripped) or stripped in seen_chrome:
+                        continue
+                    seen_chrome.add(stripped)
+                lines.append(line)
+            run.clear()
+
+        for line in markdown.splitlines():
+            line = line.rstrip()
+            stripped = line.strip()
+            if fence:
+                lines.append(line)
+                if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                    fence = None
+                continue
+            opening = FENCE.match(stripped)
+            if opening or (stripped and INDENTED_CODE.match(line) and not run):
+                flush()
+                lines.append(line)
+                fence = opening.group(1) if opening else None
+                continue
+
+            if not stripped:
+                flush()
+                if lines and lines[-1]:
+                    lines.append("")
+                continue
+            if METADATA_LINE.match(stripped) or HORIZONTAL_RULE.match(stripped):
+                continue
+
+            has_links = bool(IMAGE.search(line) or LINK.search(line) or BARE_URL.search(line))
+            line = IMAGE.sub("", line)
+            text_only = BARE_URL.sub("", LINK.sub("", line))
+            # images, link lists and nav bars: nothing left once links are removed
+            if has_links and not LIST_MARKER.sub("", text_only).strip(" |·•-#"):
+                continue
+
+            line = LINK.sub(r"\1", line).rstrip()
+            run.append((line, line.strip(), has_links))
+        flush()
+
+        return "\n".join(lines).strip("\n")
+
+    def _split_sections(self, text: str) -> List[Tuple[str, str]]:
+        # (heading, body) pairs; the text before the first heading has an empty heading.
+        # A "# comment" inside a fenced code block is not a heading.
+        sections: List[Tuple[str, List[str]]] = [("", [])]
+        fence: Optional[str] = None
+        for line in text.split("\n"):
+            stripped = line.strip()
+            if fence:
+                if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                    fence = None
+            elif FENCE.match(stripped):
+                fence = FENCE.match(stripped).group(1)
+            elif HEADING.match(line):
+                sections.append((line, []))
+                continue
+            sections[-1][1].append(line)
+        # only blank lines are trimmed, so the body's first line keeps its indentation
+        return [(heading, "\n".join(body).strip("\n")) for heading, body in sections if heading or "".join(body).strip()]
+
+    def fit_to_budget(self, text: str, budget: int) -> str:
+        if self.count_tokens(text) <= budget:
+            return text
+
+        sections = self._split_sections(text)
+        # keep room for the outline of the sections that will be cut
+        outline_reserve = min(sum(self.count_tokens(heading) + 1 for heading, _ in sections), budget // 10)
+        remaining = budget - outline_reserve
+
+        kept: List[str] = []
+        index = 0
+        for index, (heading, body) in enumerate(sections):
+            section = f"{heading}\n{body}".strip()
+            cost = self.count_tokens(section) + 1
+            if cost <= remaining:
+                kept.append(section)
+                remaining -= cost
+                continue
+
+            # partially keep the section that crosses the budget, whole paragraphs first
+            partial = [heading] if heading else []
+            remaining -= self.count_tokens(heading) + 1 if heading else 0
+            for paragraph in body.split("\n\n"):
+                cost = self.count_tokens(paragraph) + 2
+                if cost > remaining:
+                    partial.append(self.truncate_tokens(paragraph, remaining - 2))
+                    break
+                partial.append(paragraph)
+                remaining -= cost
+            kept.append("\n\n".join(p for p in partial if p))
+            break
+        else:
+            return "\n\n".join(kept)
+
+        remaining += outline_reserve
+        omitted = [heading for heading, _ in sections[index + 1:] if heading]
+        for heading in omitted:
+            cost = self.count_tokens(heading) + 1
+            if cost > remaining:
+                break
+            kept.append(heading)
+            remaining -= cost
+
+        return "\n\n".join(kept) + "\n\n[...]"
+
+    def split_chunks(self, text: str, max_tokens: int) -> List[str]:
+        """
+        Split `text` into consecutive chunks of at most about `max_tokens` tokens, cutting at
+        headings first, then paragraphs, then lines; a single line longer than `max_tokens` is
+        kept whole. The chunks, joined with blank lines, hold the whole text in order.
+        """
+        blocks: List[str] = []
+        for heading, body in self._split_sections(text):
+            # a heading starts a new block so chunks prefer to begin at section boundaries
+            paragraphs = [p for p in body.split("\n\n") if p.strip()]
+            if heading:
+                paragraphs = [f"{heading}\n{paragraphs[0]}" if paragraphs else heading] + paragraphs[1:]
+            for paragraph in paragraphs:
+                if self.count_tokens(paragraph) <= max_tokens:
+                    blocks.append(paragraph)
+                    continue
+                # oversized paragraph (long list, code block): cut between lines
+                lines: List[str] = []
+                lines_tokens = 0
+                for line in paragraph.split("\n"):
+                    cost = self.count_tokens(line) + 1
+                    if lines and lines_tokens + cost > max_tokens:
+                        blocks.append("\n".join(lines))
+                        lines, lines_tokens = [], 0
+                    lines.append(line)
+                    lines_tokens += cost
+                if lines:
+                    blocks.append("\n".join(lines))
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for block in blocks:
+            cost = self.count_tokens(block) + 2
+            starts_section = bool(HEADING.match(block))
+            # close the chunk at a heading once it is half full, otherwise only when it would overflow
+            if current and (current_tokens + cost > max_tokens or (starts_section and current_tokens >= max_tokens // 2)):
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(block)
+            current_tokens += cost
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+    def compact(self, markdown: str, budget: Optional[int] = None) -> str:
+        """
+        Strip boilerplate and fit `markdown` into `budget` tokens (default LLM_INPUT_TOKEN_BUDGET).
+        CPU-bound: call it through asyncio.to_thread from async code.
+        """
+        budget = budget or self.token_budget
+        cleaned = self.strip_boilerplate(markdown)
+        # tokens average far fewer than 32 characters, so text past this point could never fit; skip encoding it
+        cleaned = cleaned[:budget * 32]
+        compacted = self.fit_to_budget(cleaned, budget)
+        logger.debug(f"[CompactionService] Compacted {len(markdown)} chars to {len(compacted)} chars")
+        return compacted
+
+compaction_service = CompactionService()
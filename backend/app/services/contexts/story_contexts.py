@@ -1,23 +1,81 @@
+import json
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import Optional
 from app.schemas.external.hn import HNRaw
-from app.models.article import Article, AITranslatedResult
+from app.core.config import settings
+from app.models.article import Article, AITranslatedResult, TriageResult
+
+class StoryStage(IntEnum):
+    # last pipeline stage a story has completed (ordered, so stages can be compared)
+    FETCHED = 0
+    TRIAGED = 1
+    EXTRACTED = 2
+    TRANSLATED = 3
+    SAVED = 4
+    EMBEDDED = 5
 
 @dataclass
 class StoryContext:
     story: HNRaw
+    triage: Optional[TriageResult] = None
     extracted_content: Optional[str] = None
     ai_result: Optional[AITranslatedResult] = None
+    analysis_version: Optional[str] = None
+    stage: StoryStage = StoryStage.FETCHED
+    article_id: Optional[int] = None
+    # failed translate-and-summarize runs, kept across restarts so a story that always fails is given up
+    translation_attempts: int = 0
 
     @property
     def has_valid_content(self) -> bool:
         return bool(self.story.original_title or self.story.original_text)
-    
+
+    @property
+    def is_low_value(self) -> bool:
+        # only a successful triage can rule a story out; untriaged stories get the full treatment
+        return self.triage is not None and self.triage.ai_score < settings.triage_min_score
+
+    def to_checkpoint(self) -> str:
+        """
+        Serialize the context (including intermediate payloads) so the pipeline can resume it after a restart.
+        """
+        story_data = self.story.model_dump(mode="json", by_alias=True)
+        # HNRaw parses `time` from unix time
+        story_data["time"] = int(self.story.posted_at.timestamp())
+
+        return json.dumps({
+            "stage": self.stage.name,
+            "story": story_data,
+            "triage": self.triage.model_dump(mode="json") if self.triage else None,
+            "extracted_content": self.extracted_content,
+            "ai_result": self.ai_result.model_dump(mode="json") if self.ai_result else None,
+            "analysis_version": self.analysis_version,
+            "article_id": self.article_id,
+            "translation_attempts": self.translation_attempts,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_checkpoint(cls, data: str) -> "StoryContext":
+        payload = json.loads(data)
+        return cls(
+            story=HNRaw.model_validate(payload["story"]),
+            triage=TriageResult.model_validate(payload["triage"]) if payload.get("triage") else None,
+            extracted_content=payload.get("extracted_content"),
+            ai_result=AITranslatedResult.model_validate(payload["ai_result"]) if payload.get("ai_result") else None,
+            analysis_version=payload.get("analysis_version"),
+            stage=StoryStage[payload["stage"]],
+            article_id=payload.get("article_id"),
+            translation_attempts=payload.get("translation_attempts", 0),
+        )
+
     def to_article(self) -> Article:
-        if not self.ai_result:
+        if not self.ai_result and not self.is_low_value:
             raise ValueError(f"Cannot convert story {self.story.hn_id} to Article: AI result is missing")
-        
+
         return Article(
+            id=self.article_id,
+
             # Basic info
             hn_id=self.story.hn_id,
             type=self.story.type,
@@ -43,7 +101,9 @@ class StoryContext:
             raw_content=self.extracted_content or "",
             image_urls=None,
 
-            # AI-generated results
+            # AI-generated results (triage only for low-value stories)
             detailed_analysis=self.ai_result,
+            analysis_version=self.analysis_version if self.ai_result else None,
+            triage=self.triage,
             comment_analysis=None,
-        )
\ No newline at end of file
+        )
@@ -1,38 +1,107 @@
 import asyncio
 import httpx
-from typing import Optional, List, Dict
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from app.core.config import settings
 from app.core.decorators import monitor_news_ingestor
 from app.core.logger import logger
+from app.core.http_clients import httpx_client
+from app.core.adaptive_limiter import AdaptiveLimiter, RetryableError, parse_retry_after
+from app.db.disk_cache import DiskCache
+
+# query parameters that only track the visitor and never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "_hsenc", "_hsmi", "igshid"}
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL for use as a cache key:
+    lowercase scheme/host, drop default ports, fragments, tracking params and trailing slashes,
+    and sort the remaining query params.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
 
 class ExtractionService:
     def __init__(self):
         self.jina_reader_base = settings.jina_reader_base
         self.headers = {
-            "X-Retain-Images": "none" 
+            "X-Retain-Images": "none"
         }
         if settings.jina_api_key:
             self.headers["Authorization"] = f"Bearer {settings.jina_api_key}"
-        
-        self.sem = asyncio.Semaphore(settings.jina_fetch_concurrent_limit)
+
+        # a slow page fails after jina_request_timeout_seconds per attempt, and its retries stop
+        # after jina_retry_budget_seconds, instead of 4 x 60s per URL
+        self.limiter = AdaptiveLimiter(
+            "jina", settings.jina_fetch_concurrent_limit, retry_budget=settings.jina_retry_budget_seconds,
+        )
+
+        # cache of extracted markdown keyed by normalized URL
+        self.cache: Optional[DiskCache] = None
+        if settings.extraction_cache_enabled:
+            self.cache = DiskCache(
+                directory=str(Path(settings.cache_dir) / "extraction"),
+                ttl_seconds=settings.extraction_cache_ttl_seconds,
+                max_bytes=settings.extraction_cache_max_bytes,
+            )
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     async def extract_url(self, url: str) -> Optional[str]:
         if not url:
             return None
 
+        cache_key = normalize_url(url)
+        if self.cache:
+            cached = await self.cache.aget_text(cache_key)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+            self.cache_misses += 1
+
+        content = await self._fetch_from_jina(url)
+
+        if content is not None and self.cache:
+            await self.cache.aset_text(cache_key, content)
+        return content
+
+    async def _request_jina(self, target_url: str) -> httpx.Response:
+        # shared keep-alive client unless pooling is disabled (HTTP_CLIENT_POOLING_ENABLED)
+        async with httpx_client() as client:
+            response = await client.get(target_url, headers=self.headers, timeout=settings.jina_request_timeout_seconds)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableError(
+                f"Jina returned {response.status_code}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        return response
+
+    async def _fetch_from_jina(self, url: str) -> Optional[str]:
         target_url = f"{self.jina_reader_base}{url}"
 
         try:
-            async with self.sem:
-                # Use a fresh client for each request to avoid connection pooling issues
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    response = await client.get(target_url, headers=self.headers)
-                    if response.status_code != 200:
-                        logger.error(f"[ExtractionService] [Jina Error] Status: {response.status_code} for URL: {url}")
-                        return None
-                    return response.text
+            response = await self.limiter.call(self._request_jina, target_url)
+            if response.status_code != 200:
+                logger.error(f"[ExtractionService] [Jina Error] Status: {response.status_code} for URL: {url}")
+                return None
+            return response.text
+        except RetryableError as e:
+            logger.error(f"[ExtractionService] [Jina Error] {e} for URL: {url} (retries exhausted)")
+            return None
         except httpx.TimeoutException:
-            logger.error(f"[ExtractionService] [Timeout] Extracting {url} took too long (>60s).")
+            logger.error(f"[ExtractionService] [Timeout] Extracting {url} timed out (retries exhausted).")
             return None
         except Exception as e:
             logger.error(f"[ExtractionService] Error extracting URL {url}: {str(e)}")
@@ -40,8 +109,31 @@ class ExtractionService:
 
     @monitor_news_ingestor(step_name="Extract-Jina")
     async def extract_batch(self, urls: List[str]) -> Optional[Dict[str, Optional[str]]]:
-        tasks = [self.extract_url(url) for url in urls]
-        results = await asyncio.gather(*tasks)
-        return dict(zip(urls, results))
+        stats_before = self.stats_snapshot()
+
+        # reposts of the same page within a batch (by cache key, so tracking params and
+        # trailing slashes don't count as different pages) are fetched once
+        keys = {url: normalize_url(url) if url else url for url in urls}
+        first_url_by_key = {}
+        for url, key in keys.items():
+            first_url_by_key.setdefault(key, url)
+        tasks = [self.extract_url(url) for url in first_url_by_key.values()]
+        contents = dict(zip(first_url_by_key, await asyncio.gather(*tasks)))
+
+        self.log_run_stats(stats_before)
+        return {url: contents[key] for url, key in keys.items()}
+
+    def stats_snapshot(self) -> Tuple[int, int]:
+        return self.cache_hits, self.cache_misses
+
+    def log_run_stats(self, before: Tuple[int, int]) -> None:
+        # cache counters since the given snapshot, in the Extract-Jina stage log
+        if not self.cache:
+            return
+        hits, misses = (now - then for now, then in zip(self.stats_snapshot(), before))
+        hit_rate = hits / (hits + misses) if hits + misses else 0.0
+        logger.bind(type="news_ingestor", step="Extract-Jina").info(
+            f"Cache hits: {hits}, misses: {misses} (hit rate {hit_rate:.0%})"
+        )
 
-extraction_service = ExtractionService()
\ No newline at end of file
+extraction_service = ExtractionService()
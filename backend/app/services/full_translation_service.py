@@ -0,0 +1,262 @@
+import asyncio
+import time
+from enum import Enum
+from typing import AsyncIterator, Dict, List, Optional, Set
+from app.core.config import settings
+from app.core.prompts import Prompts
+from app.core.logger import logger
+from app.core.distributed_lock import single_flight
+from app.db.redis import get_redis
+from app.models.article import Article
+from app.repositories.article_repository import article_repository
+from app.services.compaction_service import compaction_service
+from app.services.translate_service import translate_service
+
+class TranslationStatus(str, Enum):
+    READY = "ready"
+    PENDING = "pending"
+    UNAVAILABLE = "unavailable"
+
+class _Generation:
+    """Chunks of one in-flight translation; late subscribers replay what was already produced."""
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self._cond = asyncio.Condition()
+
+    async def append(self, chunk: str) -> None:
+        async with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    async def finish(self, error: Optional[str] = None) -> None:
+        async with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: len(self.chunks) > index or self.done)
+                new_chunks = self.chunks[index:]
+                done = self.done
+            index += len(new_chunks)
+            for chunk in new_chunks:
+                yield chunk
+            if done:
+                return
+
+class FullTranslationService:
+    """
+    Full-text translation (`url_content_trans`) generated on demand instead of at ingestion.
+
+    The first request for an article's translation stream (`stream()`) starts the generation;
+    new generations are rate limited per client and globally, since each one is a paid LLM
+    call. Generation is single-flighted: one per article in this process (concurrent viewers
+    share the same chunks) and one across processes (Redis lock); a process that loses the
+    lock waits for the winner to persist the result.
+
+    Long articles are split into sections that are translated in parallel and stitched back
+    in order, so one slow or failed call does not cost the whole output.
+    """
+    def __init__(self):
+        self._generations: Dict[int, _Generation] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def status(self, article: Article) -> TranslationStatus:
+        if article.detailed_analysis and article.detailed_analysis.url_content_trans:
+            return TranslationStatus.READY
+        if not article.detailed_analysis or not article.raw_content:
+            return TranslationStatus.UNAVAILABLE
+        return TranslationStatus.PENDING
+
+    async def _allow_start(self, client: Optional[str]) -> bool:
+        """Count a new generation against the hourly per-client and global limits (fixed windows in Redis)."""
+        window = int(time.time() // 3600)
+        counters = []
+        if client:
+            # checked first, so one client over its limit does not use up the global budget
+            counters.append((f"full_translation:starts:{client}:{window}", settings.full_translation_starts_per_client_per_hour))
+        counters.append((f"full_translation:starts:{window}", settings.full_translation_starts_per_hour))
+        try:
+            redis = await get_redis()
+            for key, limit in counters:
+                count = await redis.incr(key)
+                if count == 1:
+                    await redis.expire(key, 3600)
+                if count > limit:
+                    logger.warning(f"[FullTranslationService] Generation limit reached ({key}: {count} > {limit})")
+                    return False
+            return True
+        except Exception as e:
+            # no limiter, no paid generation
+            logger.error(f"[FullTranslationService] Error checking generation limits: {e}")
+            return False
+
+    async def _start(self, article: Article, client: Optional[str]) -> Optional[_Generation]:
+        """The article's in-flight generation, or a new one if the limits allow it."""
+        generation = self._generations.get(article.id)
+        if generation is not None:
+            return generation
+        if not await self._allow_start(client):
+            return None
+
+        # another request may have started it while the limits were checked
+        generation = self._generations.get(article.id)
+        if generation is None:
+            generation = _Generation()
+            self._generations[article.id] = generation
+            task = asyncio.create_task(self._run(article, generation))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return generation
+
+    async def stream(self, article: Article, client: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Server-sent events with the translation: the stored text, or chunks as they are generated
+        (starting the generation for `client` if none is in flight).
+        """
+        status = self.status(article)
+        if status == TranslationStatus.READY:
+            yield self._event(article.detailed_analysis.url_content_trans)
+            yield "event: stop\ndata: [DONE]\n\n"
+            return
+        if status == TranslationStatus.UNAVAILABLE:
+            yield "event: error\ndata: No content to translate\n\n"
+            return
+
+        generation = await self._start(article, client)
+        if generation is None:
+            yield "event: error\ndata: Too many translation requests, please try again later\n\n"
+            return
+
+        async for chunk in generation.subscribe():
+            yield self._event(chunk)
+        if generation.error:
+            yield f"event: error\ndata: {generation.error}\n\n"
+        else:
+            yield "event: stop\ndata: [DONE]\n\n"
+
+    def _event(self, chunk: str) -> str:
+        clean_chunk = chunk.replace("\n", "\\n")
+        return f"data: {clean_chunk}\n\n"
+
+    async def _run(self, article: Article, generation: _Generation) -> None:
+        error: Optional[str] = None
+        try:
+            generated = await single_flight(f"full_translation:{article.id}")(self._generate)(article, generation)
+            if generated is None:
+                # another process is generating it
+                text = await self._wait_for_persisted(article.id)
+                if text:
+                    await generation.append(text)
+                else:
+                    error = "Translation is not available yet"
+        except Exception as e:
+            logger.error(f"[FullTranslationService] Error translating article {article.id}: {e}")
+            error = "Translation failed"
+        finally:
+            self._generations.pop(article.id, None)
+            await generation.finish(error)
+
+    async def _generate(self, article: Article, generation: _Generation) -> bool:
+        # the previous lock holder may have stored it since this request read the article
+        stored = await article_repository.get_article_by_id(article.id)
+        if stored and stored.detailed_analysis and stored.detailed_analysis.url_content_trans:
+            await generation.append(stored.detailed_analysis.url_content_trans)
+            return True
+
+        # the reader asked for the full text: no boilerplate stripping, only the token cap
+        content = await asyncio.to_thread(
+            compaction_service.truncate_tokens, article.raw_content, settings.full_translation_max_input_tokens
+        )
+        sections = [content]
+        if settings.full_translation_sectioned_enabled:
+            sections = await asyncio.to_thread(
+                compaction_service.split_chunks, content, settings.full_translation_section_tokens
+            )
+
+        if len(sections) > 1:
+            await self._translate_sections(article.id, sections, generation)
+        else:
+            await self._translate_streaming(content, generation)
+
+        translation = "".join(generation.chunks)
+        if not translation:
+            raise ValueError("LLM returned an empty translation")
+
+        if not await article_repository.update_translation(article.id, translation):
+            raise ValueError("could not persist the translation")
+        logger.info(f"[FullTranslationService] Translated and stored article {article.id} ({len(translation)} chars)")
+        return True
+
+    async def _translate_streaming(self, content: str, generation: _Generation) -> None:
+        # short article: one call, streamed token by token
+        _, stream = await translate_service.router.complete(
+            messages=[
+                {"role": "system", "content": Prompts.FULL_TRANSLATION_SYSTEM_Chinese},
+                {"role": "user", "content": content},
+            ],
+            stream=True,
+        )
+
+        # the provider's concurrency slot is held until the stream is read or closed
+        async with stream:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    await generation.append(delta)
+
+    async def _translate_sections(self, article_id: int, sections: List[str], generation: _Generation) -> None:
+        """
+        Long article: translate the sections concurrently (bounded by the providers' limiters)
+        and publish them in order, each as soon as it and every section before it are done.
+        """
+        tasks = [
+            asyncio.create_task(self._translate_section(article_id, index, section))
+            for index, section in enumerate(sections)
+        ]
+        try:
+            for index, task in enumerate(tasks):
+                translated = await task
+                await generation.append(translated if index == 0 else "\n\n" + translated)
+        finally:
+            # a section that failed for good fails the article: stop the others
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _translate_section(self, article_id: int, index: int, section: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                _, response = await translate_service.router.complete(
+                    messages=[
+                        {"role": "system", "content": Prompts.FULL_TRANSLATION_SECTION_SYSTEM_Chinese},
+                        {"role": "user", "content": section},
+                    ],
+                )
+                translated = (response.choices[0].message.content or "").strip()
+                if not translated:
+                    raise ValueError("empty section translation")
+                return translated
+            except Exception as e:
+                # only this section is retried; the others keep their results
+                if attempt >= settings.full_translation_section_max_retries:
+                    raise
+                attempt += 1
+                logger.warning(f"[FullTranslationService] Section {index} of article {article_id} failed ({e}), retry {attempt}")
+
+    async def _wait_for_persisted(self, article_id: int) -> Optional[str]:
+        deadline = time.monotonic() + settings.full_translation_wait_timeout_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(2)
+            article = await article_repository.get_article_by_id(article_id)
+            if article and article.detailed_analysis and article.detailed_analysis.url_content_trans:
+                return article.detailed_analysis.url_content_trans
+        return None
+
+full_translation_service = FullTranslationService()
@@ -1,10 +1,18 @@
 import asyncio
 import aiohttp
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from app.core.config import settings
+from app.core.logger import logger
+from app.core.http_clients import aiohttp_session
+from app.db.redis import get_redis
+from app.core.distributed_lock import fenced_set
 from app.schemas.external.hn import HNRaw
 from app.repositories.article_repository import article_repository
 from app.core.decorators import monitor_news_ingestor
+from app.core.adaptive_limiter import AdaptiveLimiter
+
+# newstories.json lists at most this many ids
+NEW_STORIES_LIST_SIZE = 500
 
 class HNService:
     def __init__(self):
@@ -12,29 +20,45 @@ class HNService:
         self.new_url = settings.hn_new_url
         self.best_url = settings.hn_best_url
         self.item_url = settings.hn_item_url
+        self.max_item_url = settings.hn_max_item_url
+        self.updates_url = settings.hn_updates_url
         self.limit = settings.hn_story_limit
-        # limit the number of concurrent requests to the HN API
-        self.sem = asyncio.Semaphore(settings.hn_fetch_concurrent_limit)
+        # limit the number of concurrent requests to the HN API (adapts to its error rate/latency)
+        self.limiter = AdaptiveLimiter("hn", settings.hn_fetch_concurrent_limit)
+
+        # incremental polling: only stories newer than the persisted max item cursor
+        self.incremental = settings.hn_incremental_enabled
+        self.incremental_max_items = settings.hn_incremental_max_items
+        self.cursor_key = "hn:cursor:max_item"
 
-    async def _fetch_ids(self, session: aiohttp.ClientSession, url: str) -> List[int]:
+    async def _get_json(self, session: aiohttp.ClientSession, url: str) -> Any:
+        async with session.get(url) as resp:
+            # checks if the HTTP response returned a successful status code (e.g. 200 OK).
+            # If the response status code indicates an error (e.g. 404, 500), it will raise an aiohttp.ClientResponseError exception.
+            resp.raise_for_status()
+            return await resp.json()
+
+    async def _fetch_json(self, session: aiohttp.ClientSession, url: str) -> Optional[Any]:
         try:
-            async with session.get(url) as resp:
-                # checks if the HTTP response returned a successful status code (e.g. 200 OK).
-                # If the response status code indicates an error (e.g. 404, 500), it will raise an aiohttp.ClientResponseError exception.
-                resp.raise_for_status()
-                ids = await resp.json()
-                return ids[:self.limit]
+            return await self.limiter.call(self._get_json, session, url)
         except Exception as e:
-            print(f"Error fetching IDs from {url}: {e}")
+            logger.error(f"[HNService] Error fetching {url}: {e}")
+            return None
+
+    async def _fetch_ids(self, session: aiohttp.ClientSession, url: str, limit: Optional[int] = None) -> List[int]:
+        ids = await self._fetch_json(session, url)
+        if not ids:
             return []
+        return ids[:limit if limit is not None else self.limit]
     
-    async def _fetch_item(self, session: aiohttp.ClientSession, id: int) -> Optional[Dict[str, Any]]:
+    async def _fetch_item(self, session: aiohttp.ClientSession, id: int, failed_ids: Set[int]) -> Optional[Dict[str, Any]]:
+        # ids whose request failed (as opposed to items that are not stories) are added to `failed_ids`
         url = self.item_url.format(id=id)
         try:
-            async with session.get(url) as resp:
-                resp.raise_for_status()
-                data = await resp.json()
-        except Exception:
+            data = await self.limiter.call(self._get_json, session, url)
+        except Exception as e:
+            logger.error(f"[HNService] Error fetching item {id}: {e}")
+            failed_ids.add(id)
             return None
         
         if not data or data.get("type") != "story":
@@ -47,36 +71,161 @@ class HNService:
             print(f"[HNService] Error parsing story {id}: {e}")
             return None
     
+    async def _collect_ids(self, session: aiohttp.ClientSession) -> Set[int]:
+        task_ids = [
+            # self._fetch_ids(session, self.top_url),
+            self._fetch_ids(session, self.best_url),
+            self._fetch_ids(session, self.new_url)
+        ]
+        lists_of_ids = await asyncio.gather(*task_ids)
+
+        all_ids_set: Set[int] = set[int]()
+        for ids in lists_of_ids:
+            all_ids_set.update(ids)
+        return all_ids_set
+
+    async def _load_cursor(self) -> Optional[int]:
+        redis = await get_redis()
+        cursor = await redis.get(self.cursor_key)
+        return int(cursor) if cursor is not None else None
+
+    async def _collect_incremental_ids(self, session: aiohttp.ClientSession) -> Tuple[Set[int], Optional[int]]:
+        """
+        Return the candidate ids since the last run plus the item id to advance the cursor to
+        (None: leave it where it is).
+
+        Candidates are new stories above the cursor and best stories that appear in the
+        HN `updates` feed (changed since they were last seen). Without a cursor the
+        full best/new lists are used once to seed it. A gap of more than
+        `hn_incremental_max_items` new stories is paged through oldest first, one page per run.
+        """
+        last_max_item = await self._load_cursor()
+
+        max_item = await self._fetch_json(session, self.max_item_url)
+        if not isinstance(max_item, int):
+            return set(), None
+
+        if last_max_item is None:
+            return await self._collect_ids(session), max_item
+
+        new_ids, best_ids, updates = await asyncio.gather(
+            self._fetch_ids(session, self.new_url, limit=NEW_STORIES_LIST_SIZE),
+            self._fetch_ids(session, self.best_url),
+            self._fetch_json(session, self.updates_url),
+        )
+        if not new_ids:
+            # the list request failed: nothing is known about the gap, keep the cursor
+            return set(), None
+
+        fetch_logger = logger.bind(type="news_ingestor", step="Fetch-HN")
+        if len(new_ids) >= NEW_STORIES_LIST_SIZE and min(new_ids) > last_max_item + 1:
+            fetch_logger.warning(
+                f"newstories no longer reaches back to the cursor: stories between {last_max_item} "
+                f"and {min(new_ids)} are not listed and will be missed"
+            )
+
+        pending = sorted(id for id in new_ids if id > last_max_item)
+        cursor_target = max_item
+        if len(pending) > self.incremental_max_items:
+            fetch_logger.warning(
+                f"{len(pending)} new stories above the cursor, processing the oldest "
+                f"{self.incremental_max_items} now and the rest in the next runs"
+            )
+            pending = pending[:self.incremental_max_items]
+            # the cursor stops at this page, so the newer ids stay above it
+            cursor_target = pending[-1]
+
+        candidate_ids: Set[int] = set(pending)
+
+        changed_ids = set((updates or {}).get("items", []))
+        candidate_ids.update(changed_ids.intersection(best_ids))
+
+        fetch_logger.info(
+            f"Incremental cursor {last_max_item} -> {cursor_target}: {len(candidate_ids)} candidate ids"
+        )
+        return candidate_ids, cursor_target
+
+    async def _advance_cursor(self, cursor_target: Optional[int], failed_ids: Set[int]) -> None:
+        """
+        Move the cursor to `cursor_target`, but never past an id whose item fetch or existence
+        check failed: it stays below the lowest failed id so the next run considers it again
+        (ids stored in the meantime are filtered by the existence check). Without a cursor yet
+        (the first run fetched the best/new lists) there is nothing to hold: failed best-story ids
+        can be far older than the new ones, so the cursor starts at `cursor_target`.
+        """
+        if cursor_target is None:
+            return
+        last_max_item = await self._load_cursor()
+        if last_max_item is None:
+            await fenced_set(self.cursor_key, cursor_target)
+            return
+        retry_ids = [id for id in failed_ids if last_max_item < id <= cursor_target]
+        if retry_ids:
+            cursor_target = min(cursor_target, min(retry_ids) - 1)
+            logger.bind(type="news_ingestor", step="Fetch-HN").warning(
+                f"{len(retry_ids)} new ids failed, cursor held at {cursor_target} to retry them"
+            )
+        if cursor_target > last_max_item:
+            # fenced: a run that lost its job lock cannot move the cursor of the current run
+            await fenced_set(self.cursor_key, cursor_target)
+
+    async def _get_ids_to_fetch(self, session: aiohttp.ClientSession) -> Tuple[List[int], Optional[int], Set[int]]:
+        """Ids to fetch, the cursor target, and the ids whose existence check failed."""
+        cursor_target = None
+        if self.incremental:
+            all_ids_set, cursor_target = await self._collect_incremental_ids(session)
+        else:
+            all_ids_set = await self._collect_ids(session)
+
+        # prevent duplicate in db (bulk check off the event loop); unchecked ids are left for the next run
+        existing_ids, unchecked_ids = await article_repository.get_existing_hn_ids(all_ids_set)
+        ids_to_fetch = [id for id in all_ids_set if id not in existing_ids and id not in unchecked_ids]
+        return ids_to_fetch, cursor_target, unchecked_ids
+
     @monitor_news_ingestor(step_name="Fetch-HN")
-    async def fetch_all_stories(self) -> List[HNRaw]:
-        async with aiohttp.ClientSession() as session:
-            task_ids = [
-                # self._fetch_ids(session, self.top_url),
-                self._fetch_ids(session, self.best_url),
-                self._fetch_ids(session, self.new_url)
-            ]
-            lists_of_ids = await asyncio.gather(*task_ids)
-
-            all_ids_set: Set[int] = set[int]()
-            for ids in lists_of_ids:
-                all_ids_set.update(ids)
-
-            # prevent duplicate in db
-            ids_to_fetch = [id for id in all_ids_set if not article_repository.has_article(id)]
+    async def fetch_all_stories(self, advance_cursor: bool = True) -> List[HNRaw]:
+        """
+        New stories not stored yet. `advance_cursor=False` for callers that don't store them
+        (the demo endpoint): the incremental cursor is left for the next ingest run.
+        """
+        async with aiohttp_session() as session:
+            ids_to_fetch, cursor_target, failed_ids = await self._get_ids_to_fetch(session)
+            if not advance_cursor:
+                cursor_target = None
 
             if not ids_to_fetch:
+                await self._advance_cursor(cursor_target, failed_ids)
                 return []
             
-            # concurrent fetch (with semaphore)
-            async def fetch_with_sem(hn_id):
-                async with self.sem:
-                    return await self._fetch_item(session, hn_id)
-            
-            tasks_items = [fetch_with_sem(hn_id) for hn_id in ids_to_fetch]
+            # concurrent fetch (bounded by the adaptive limiter)
+            tasks_items = [self._fetch_item(session, hn_id, failed_ids) for hn_id in ids_to_fetch]
 
             stories = await asyncio.gather(*tasks_items)
             valid_stories = [s for s in stories if s is not None]
 
+            # advance the cursor only after the items were fetched
+            await self._advance_cursor(cursor_target, failed_ids)
+
             return valid_stories
 
+    async def iter_new_stories(self) -> AsyncIterator[HNRaw]:
+        """
+        Streaming variant of fetch_all_stories: yields each new story as soon as its item is fetched,
+        so downstream stages can start before the slowest HN request returns.
+        """
+        async with aiohttp_session() as session:
+            ids_to_fetch, cursor_target, failed_ids = await self._get_ids_to_fetch(session)
+
+            tasks = [asyncio.create_task(self._fetch_item(session, hn_id, failed_ids)) for hn_id in ids_to_fetch]
+            try:
+                for next_story in asyncio.as_completed(tasks):
+                    story = await next_story
+                    if story is not None:
+                        yield story
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            await self._advance_cursor(cursor_target, failed_ids)
+
 hn_service = HNService()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import asyncio
 import math
 from fastapi import HTTPException
 from app.repositories.interaction_repository import interaction_repository
@@ -5,19 +6,19 @@ from app.schemas.article import ArticleSchema, ArticleListResponse, ArticleFilte
 
 class InteractionService:
     # --- Favorites ---
-    def favorite_article(self, user_id: str, article_id: int):
-        success = interaction_repository.add_favorite(user_id, article_id)
+    async def favorite_article(self, user_id: str, article_id: int):
+        success = await interaction_repository.add_favorite(user_id, article_id)
         if not success:
             raise HTTPException(status_code=400, detail="Failed to favorite article")
 
-    def unfavorite_article(self, user_id: str, article_id: int):
-        success = interaction_repository.remove_favorite(user_id, article_id)
+    async def unfavorite_article(self, user_id: str, article_id: int):
+        success = await interaction_repository.remove_favorite(user_id, article_id)
         if not success:
             raise HTTPException(status_code=400, detail="Failed to unfavorite article")
 
-    def get_my_favorites(self, user_id: str, params: ArticleFilterParams):
+    async def get_my_favorites(self, user_id: str, params: ArticleFilterParams):
         skip = (params.page - 1) * params.size
-        data, total = interaction_repository.get_user_favorites(
+        data, total = await interaction_repository.get_user_favorites(
             user_id=user_id,
             skip=skip,
             limit=params.size,
@@ -34,19 +35,19 @@ class InteractionService:
         )
     
     # --- Read Later ---
-    def read_later_article(self, user_id: str, article_id: int):
-        success = interaction_repository.add_read_later(user_id, article_id)
+    async def read_later_article(self, user_id: str, article_id: int):
+        success = await interaction_repository.add_read_later(user_id, article_id)
         if not success:
             raise HTTPException(status_code=400, detail="Failed to read later article")
 
-    def unread_later_article(self, user_id: str, article_id: int):
-        success = interaction_repository.remove_read_later(user_id, article_id)
+    async def unread_later_article(self, user_id: str, article_id: int):
+        success = await interaction_repository.remove_read_later(user_id, article_id)
         if not success:
             raise HTTPException(status_code=400, detail="Failed to unread later article")
 
-    def get_my_read_laters(self, user_id: str, params: ArticleFilterParams):
+    async def get_my_read_laters(self, user_id: str, params: ArticleFilterParams):
         skip = (params.page - 1) * params.size
-        data, total = interaction_repository.get_user_read_laters(
+        data, total = await interaction_repository.get_user_read_laters(
             user_id=user_id,
             skip=skip,
             limit=params.size,
@@ -63,10 +64,14 @@ class InteractionService:
         )
     
     # --- Helper for Article Service ---
-    def get_interaction_status(self, user_id: str, article_id: int) -> dict:
+    async def get_interaction_status(self, user_id: str, article_id: int) -> dict:
+        is_favorited, is_read_later = await asyncio.gather(
+            interaction_repository.check_is_favorite(user_id, article_id),
+            interaction_repository.check_is_read_later(user_id, article_id),
+        )
         return {
-            "is_favorited": interaction_repository.check_is_favorite(user_id, article_id),
-            "is_read_later": interaction_repository.check_is_read_later(user_id, article_id)
+            "is_favorited": is_favorited,
+            "is_read_later": is_read_later,
         }
 
 interaction_service = InteractionService()
\ No newline at end of file
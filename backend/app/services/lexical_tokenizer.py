@@ -0,0 +1,54 @@
+import re
+import unicodedata
+from typing import List
+
+# words and identifiers, keeping inner punctuation: cve-2024-3094, node.js, c++, c#, pg_trgm, v1.2.3
+WORD = re.compile(r"[a-z0-9](?:[a-z0-9_.+#\-]*[a-z0-9+#])?")
+WORD_PART = re.compile(r"[a-z0-9]+")
+# CJK unified ideographs (extension A, basic block, compatibility)
+CJK_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+class LexicalTokenizer:
+    """
+    Tokens for full-text matching of mixed English / Chinese text, without a segmenter:
+    - English words and identifiers are lowercased and kept whole (so `CVE-2024-3094` or `node.js`
+      match exactly); compound identifiers also emit their parts (`node.js` -> `node`, `js`)
+    - Chinese runs become overlapping character bigrams (a single character stays a unigram),
+      so any two-character word in a query matches without a dictionary
+    Documents and queries go through the same tokenizer; the tokens are stored verbatim as
+    lexemes (`document_chunks.lexemes`), so nothing is stemmed or re-parsed in Postgres.
+    """
+
+    def tokenize(self, text: str) -> List[str]:
+        """Distinct tokens of `text`, in order of first occurrence."""
+        # NFKC folds full-width letters and digits to ASCII
+        text = unicodedata.normalize("NFKC", text).lower()
+        tokens: List[str] = []
+        position = 0
+        for run in CJK_RUN.finditer(text):
+            tokens.extend(self._words(text[position:run.start()]))
+            tokens.extend(self._bigrams(run.group()))
+            position = run.end()
+        tokens.extend(self._words(text[position:]))
+        return list(dict.fromkeys(tokens))
+
+    def _words(self, text: str) -> List[str]:
+        tokens: List[str] = []
+        for word in WORD.findall(text):
+            if word in STOPWORDS:
+                continue
+            tokens.append(word)
+            parts = WORD_PART.findall(word)
+            if len(parts) > 1:
+                tokens.extend(part for part in parts if part not in STOPWORDS)
+        return tokens
+
+    def _bigrams(self, run: str) -> List[str]:
+        if len(run) == 1:
+            return [run]
+        return [run[i:i + 2] for i in range(len(run) - 1)]
+
+lexical_tokenizer = LexicalTokenizer()
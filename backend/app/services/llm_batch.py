@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.distributed_lock import lease_lost
+from app.core.logger import logger
+from app.db.redis import get_redis
+from app.services.llm_router import LLMProvider, LLMRouter
+
+# batch statuses after which the output (possibly partial) is final
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+# the provider finishes or expires a batch within its completion window
+COMPLETION_WINDOW_SECONDS = 24 * 3600
+
+class LLMBatchClient:
+    """
+    Chat completions through a provider's batch endpoint (OpenAI-compatible Files + Batches API):
+    the requests are written as one JSONL batch job, submitted, polled until done, and the answers
+    matched back by custom_id. Far higher throughput and lower cost than interactive calls, at the
+    price of minutes-to-hours latency, so it is meant for backlogs rather than fresh stories.
+
+    LLM_BATCH_PROVIDER=local is a stand-in that runs the same requests through the interactive
+    router (providers without a batch endpoint, development).
+
+    The submitted batch is recorded in Redis under a hash of the provider, model and request ids,
+    so a run restarted during the wait resumes polling it instead of submitting (and paying for)
+    the same requests again.
+    """
+    def __init__(self, router: LLMRouter):
+        self.router = router
+
+    def _provider(self) -> LLMProvider:
+        for provider in self.router.providers:
+            if provider.name == settings.llm_batch_provider:
+                return provider
+        raise ValueError(f"LLM batch provider {settings.llm_batch_provider} is not in LLM_PROVIDERS")
+
+    def _to_jsonl(self, provider: LLMProvider, requests: Dict[str, List[Dict[str, str]]], **kwargs: Any) -> bytes:
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {"model": provider.model, "messages": messages, "temperature": provider.temperature, **kwargs},
+            }, ensure_ascii=False)
+            for custom_id, messages in requests.items()
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    async def complete(self, requests: Dict[str, List[Dict[str, str]]], **kwargs: Any) -> Dict[str, Tuple[str, str]]:
+        """
+        Run every request as one batch job, as {custom_id: (model, answer text)}.
+        Requests missing from the result failed inside the batch; callers retry them interactively.
+        """
+        if not requests:
+            return {}
+        if settings.llm_batch_provider == "local":
+            return await self._complete_local(requests, **kwargs)
+
+        provider = self._provider()
+        record_key = self._record_key(provider, requests)
+        batch, submitted_at = await self._resume(provider, record_key)
+        if batch is None:
+            batch_file = await provider.client.files.create(
+                file=("requests.jsonl", self._to_jsonl(provider, requests, **kwargs)),
+                purpose="batch",
+            )
+            batch = await provider.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+            submitted_at = time.time()
+            await self._save_record(record_key, batch.id, submitted_at)
+            logger.info(f"[LLMBatchClient] Submitted batch {batch.id} with {len(requests)} requests to {provider.name}")
+
+        batch = await self._wait(provider, batch, submitted_at + settings.llm_batch_timeout_seconds)
+        if lease_lost():
+            # the run lost its lock: the record stays, whoever runs the job now resumes the batch
+            return {}
+        await self._delete_record(record_key)
+        logger.info(f"[LLMBatchClient] Batch {batch.id} finished with status {batch.status}")
+        if not batch.output_file_id:
+            return {}
+
+        output = await provider.client.files.content(batch.output_file_id)
+        results: Dict[str, Tuple[str, str]] = {}
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            choices = (response.get("body") or {}).get("choices") or []
+            content = choices[0].get("message", {}).get("content") if choices else None
+            if content:
+                results[item["custom_id"]] = (provider.model, content)
+        return results
+
+    def _record_key(self, provider: LLMProvider, requests: Dict[str, List[Dict[str, str]]]) -> str:
+        digest = hashlib.sha256("\n".join(sorted(requests)).encode("utf-8")).hexdigest()
+        return f"llm_batch:{provider.name}:{provider.model}:{digest}"
+
+    async def _resume(self, provider: LLMProvider, record_key: str) -> Tuple[Optional[Any], float]:
+        """The batch a previous run submitted for these requests, with its submit time, if any."""
+        try:
+            redis = await get_redis()
+            raw = await redis.get(record_key)
+            if not raw:
+                return None, 0.0
+            record = json.loads(raw)
+            batch = await provider.client.batches.retrieve(record["batch_id"])
+            logger.info(f"[LLMBatchClient] Resuming batch {batch.id} ({batch.status}) submitted by an earlier run")
+            return batch, record["submitted_at"]
+        except Exception as e:
+            logger.error(f"[LLMBatchClient] Could not resume the recorded batch, submitting a new one: {e}")
+            return None, 0.0
+
+    async def _save_record(self, record_key: str, batch_id: str, submitted_at: float) -> None:
+        try:
+            redis = await get_redis()
+            record = json.dumps({"batch_id": batch_id, "submitted_at": submitted_at})
+            await redis.set(record_key, record, ex=COMPLETION_WINDOW_SECONDS)
+        except Exception as e:
+            logger.error(f"[LLMBatchClient] Could not record batch {batch_id}, a restart will not resume it: {e}")
+
+    async def _delete_record(self, record_key: str) -> None:
+        try:
+            redis = await get_redis()
+            await redis.delete(record_key)
+        except Exception as e:
+            logger.error(f"[LLMBatchClient] Could not delete batch record {record_key}: {e}")
+
+    async def _wait(self, provider: LLMProvider, batch: Any, deadline: float) -> Any:
+        """
+        Poll until the batch is final, cancelling it at `deadline` (unix time). Returns early, with
+        the batch still running, when the run's lock is lost.
+        """
+        cancelled = False
+        while batch.status not in TERMINAL_STATUSES:
+            if lease_lost():
+                logger.warning(f"[LLMBatchClient] Lock lost, leaving batch {batch.id} to the next run")
+                return batch
+            if cancelled and time.time() >= deadline + 10 * settings.llm_batch_poll_interval_seconds:
+                logger.error(f"[LLMBatchClient] Batch {batch.id} is still {batch.status} after cancelling, giving up")
+                return batch
+            if time.time() >= deadline and not cancelled:
+                # answers finished so far are still delivered once the batch is cancelled
+                logger.warning(f"[LLMBatchClient] Batch {batch.id} timed out, cancelling")
+                try:
+                    await provider.client.batches.cancel(batch.id)
+                except Exception as e:
+                    logger.error(f"[LLMBatchClient] Error cancelling batch {batch.id}: {e}")
+                    return batch
+                cancelled = True
+            await asyncio.sleep(settings.llm_batch_poll_interval_seconds)
+            batch = await provider.client.batches.retrieve(batch.id)
+        return batch
+
+    async def _complete_local(self, requests: Dict[str, List[Dict[str, str]]], **kwargs: Any) -> Dict[str, Tuple[str, str]]:
+        async def run(messages: List[Dict[str, str]]) -> Optional[Tuple[str, str]]:
+            try:
+                provider, response = await self.router.complete(messages=messages, **kwargs)
+            except Exception as e:
+                logger.error(f"[LLMBatchClient] Local batch request failed: {e}")
+                return None
+            content = response.choices[0].message.content
+            return (provider.model, content) if content else None
+
+        answers = await asyncio.gather(*(run(messages) for messages in requests.values()))
+        return {custom_id: answer for custom_id, answer in zip(requests, answers) if answer}
@@ -0,0 +1,216 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from openai import AsyncOpenAI
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.http_clients import get_httpx_client
+from app.core.adaptive_limiter import AdaptiveLimiter
+
+class LLMProvider:
+    """One OpenAI-compatible chat backend plus its observed latency and error rate."""
+    def __init__(self, name: str, base_url: str, api_key: str, model: str, temperature: float, concurrent_limit: int):
+        self.name = name
+        self.model = model
+        self.temperature = temperature
+        self._base_url = base_url
+        self._api_key = api_key
+        self._client: Optional[AsyncOpenAI] = None
+        self._http_client: Optional[Any] = None
+        self.limiter = AdaptiveLimiter(name, concurrent_limit)
+
+        self.latencies: Deque[float] = deque(maxlen=settings.llm_router_latency_window)
+        # exponentially weighted error rate, 0..1
+        self.error_rate = 0.0
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # created on first use, and again whenever the shared pool was replaced: close_http_clients()
+        # at shutdown closes it, and a restarted lifespan gets a new one from get_httpx_client()
+        http_client = get_httpx_client() if settings.http_client_pooling_enabled else None
+        if self._client is None or http_client is not self._http_client:
+            self._client = AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=self._base_url,
+                http_client=http_client,
+                # retries (honoring Retry-After) are done by the adaptive limiter
+                max_retries=0 if settings.adaptive_limiter_enabled else 2,
+            )
+            self._http_client = http_client
+        return self._client
+
+    def record_error(self) -> None:
+        self.error_rate = 0.8 * self.error_rate + 0.2
+
+    def record_success(self, latency: Optional[float]) -> None:
+        # latency None: no latency sample (streams, where only the time to the first byte is known)
+        self.error_rate *= 0.8
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < settings.llm_router_min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def score(self) -> float:
+        # lower is better; providers without enough samples score 0 so they get explored
+        if len(self.latencies) < settings.llm_router_min_samples:
+            return 0.0
+        median = sorted(self.latencies)[len(self.latencies) // 2]
+        return median * (1 + 10 * self.error_rate)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "samples": len(self.latencies),
+            "p95_seconds": self.p95(),
+            "error_rate": round(self.error_rate, 3),
+        }
+
+class HeldStream:
+    """
+    A streamed completion that keeps its provider's limiter slot until it has been read to the
+    end or closed, so streams count against the concurrency limit for their whole duration.
+    Use as `async with stream: async for chunk in stream: ...`.
+    """
+    def __init__(self, stream: Any, release: Callable[[], Awaitable[None]]):
+        self._stream = stream
+        self._iterator = stream.__aiter__()
+        self._release = release
+
+    def __aiter__(self) -> "HeldStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self._iterator.__anext__()
+        except BaseException:
+            # end of the stream, or it failed / was cancelled mid-way
+            await self._release()
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                await close()
+        finally:
+            await self._release()
+
+    async def __aenter__(self) -> "HeldStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+def _provider_from_settings(name: str) -> LLMProvider:
+    if name == "gemini":
+        return LLMProvider(
+            name, settings.gemini_base_url, settings.gemini_api_key,
+            settings.gemini_model, settings.gemini_temperature, settings.gemini_concurrent_limit,
+        )
+    if name == "deepseek":
+        return LLMProvider(
+            name, settings.deepseek_base_url, settings.deepseek_api_key,
+            settings.deepseek_model, settings.deepseek_temperature, settings.deepseek_concurrent_limit,
+        )
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+class LLMRouter:
+    """
+    Routes chat completions across the configured providers (LLM_PROVIDERS):
+    - picks the provider with the best observed median latency x error rate
+    - fails over to the next provider when a call errors
+    - optionally hedges: if the first provider has not answered by its p95 latency,
+      fires the same request at the next provider and takes whichever returns first
+      (not for streams, which are returned as a `HeldStream`)
+    """
+    def __init__(self, providers: List[LLMProvider], hedging: bool = False):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = providers
+        self.hedging = hedging
+
+    @classmethod
+    def from_settings(cls) -> "LLMRouter":
+        names = [name.strip() for name in settings.llm_providers.split(",") if name.strip()]
+        return cls([_provider_from_settings(name) for name in names], hedging=settings.llm_hedging_enabled)
+
+    def _ranked(self) -> List[LLMProvider]:
+        # random tie-break spreads load across providers that score the same (e.g. while exploring)
+        return sorted(self.providers, key=lambda p: (p.score(), random.random()))
+
+    async def _call(self, provider: LLMProvider, messages: List[Dict[str, str]], **kwargs: Any) -> Tuple[LLMProvider, Any]:
+        # a cancelled call (the losing side of a hedged race) records nothing: it did not complete
+        start = time.monotonic()
+        request = dict(model=provider.model, messages=messages, temperature=provider.temperature, **kwargs)
+        try:
+            if kwargs.get("stream"):
+                stream, release = await provider.limiter.call_held(provider.client.chat.completions.create, **request)
+                provider.record_success(None)
+                return provider, HeldStream(stream, release)
+            response = await provider.limiter.call(provider.client.chat.completions.create, **request)
+        except Exception:
+            provider.record_error()
+            raise
+        provider.record_success(time.monotonic() - start)
+        return provider, response
+
+    def _hedge_delay(self, provider: LLMProvider) -> float:
+        p95 = provider.p95()
+        return max(settings.llm_hedge_min_delay_seconds, p95) if p95 is not None else settings.llm_hedge_default_delay_seconds
+
+    async def complete(self, messages: List[Dict[str, str]], **kwargs: Any) -> Tuple[LLMProvider, Any]:
+        """
+        Chat completion from the best available provider, as (provider that answered, response).
+        Raises the last error if every provider failed.
+        """
+        ranked = self._ranked()
+        last_error: Optional[Exception] = None
+
+        index = 0
+        while index < len(ranked):
+            primary = ranked[index]
+            hedge = self.hedging and not kwargs.get("stream")
+            backup = ranked[index + 1] if hedge and index + 1 < len(ranked) else None
+            try:
+                if backup is None:
+                    return await self._call(primary, messages, **kwargs)
+                return await self._hedged(primary, backup, messages, **kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"[LLMRouter] {primary.name}{' / ' + backup.name if backup else ''} failed: {e}")
+                index += 2 if backup else 1
+
+        raise last_error
+
+    async def _hedged(self, primary: LLMProvider, backup: LLMProvider, messages: List[Dict[str, str]], **kwargs: Any) -> Tuple[LLMProvider, Any]:
+        tasks = [asyncio.create_task(self._call(primary, messages, **kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+            if done and tasks[0].exception() is None:
+                return tasks[0].result()
+
+            # primary is slow (or already failed): race it against the backup
+            logger.debug(f"[LLMRouter] Hedging {primary.name} with {backup.name}")
+            tasks.append(asyncio.create_task(self._call(backup, messages, **kwargs)))
+            error = tasks[0].exception() if done else None
+            pending = {task for task in tasks if not task.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {provider.name: provider.stats() for provider in self.providers}
@@ -0,0 +1,145 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type, get_args, get_origin
+from annotated_types import Ge, Le, MaxLen
+from pydantic import BaseModel, ValidationError
+
+CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+BULLET = re.compile(r"^\s*([-*+•]|\d+[.)])\s*")
+
+class SalvageService:
+    """
+    Recovers structured LLM output that failed strict validation:
+    - lenient parsing: code fences, text around the object, truncated JSON (cut back to the
+      last complete member and closed)
+    - normalization against the model's field types and bounds: out-of-range numbers are
+      clamped, over-long lists trimmed, strings/lists coerced
+    - whatever is still missing or invalid is reported so the caller can request only those fields
+    """
+
+    def parse_lenient(self, text: str) -> Optional[Dict[str, Any]]:
+        text = CODE_FENCE.sub("", text.strip())
+        start = text.find("{")
+        if start < 0:
+            return None
+        text = text[start:]
+
+        for candidate in self._candidates(text):
+            # second try without trailing commas ("a", "b",])
+            for attempt in (candidate, TRAILING_COMMA.sub(r"\1", candidate)):
+                try:
+                    data = json.loads(attempt)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(data, dict):
+                    return data
+        return None
+
+    def _candidates(self, text: str) -> List[str]:
+        # complete object first, then the text cut at each earlier comma and closed
+        stack: List[str] = []
+        cuts: List[Tuple[int, List[str]]] = []
+        in_string = escape = False
+        for index, ch in enumerate(text):
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch in "{[":
+                stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if stack:
+                    stack.pop()
+                if not stack:
+                    # anything after the object is chatter
+                    return [text[:index + 1]]
+            elif ch == ",":
+                cuts.append((index, list(stack)))
+
+        candidates: List[str] = []
+        # truncated right after a complete string / container; a trailing number or word may be cut short
+        if not in_string and text.rstrip()[-1:] in ('"', "}", "]"):
+            candidates.append(text + "".join(reversed(stack)))
+        # the member cut off by the truncation is dropped and regenerated if it was required
+        candidates.extend(text[:index] + "".join(reversed(closers)) for index, closers in reversed(cuts))
+        return candidates
+
+    def _normalize_value(self, annotation: Any, metadata: List[Any], value: Any) -> Any:
+        if get_origin(annotation) is not None and type(None) in get_args(annotation):
+            # Optional[X]
+            if value is None:
+                return None
+            annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+
+        if annotation is int:
+            if isinstance(value, str):
+                value = float(value.strip().rstrip("%"))
+            if isinstance(value, float):
+                value = int(round(value))
+            for bound in metadata:
+                if isinstance(bound, Ge):
+                    value = max(value, bound.ge)
+                elif isinstance(bound, Le):
+                    value = min(value, bound.le)
+            return value
+
+        if annotation is str:
+            if isinstance(value, list):
+                value = "\n".join(str(item) for item in value)
+            return value.strip() if isinstance(value, str) else value
+
+        if get_origin(annotation) in (list, List) and get_args(annotation) == (str,):
+            if isinstance(value, str):
+                value = [BULLET.sub("", line) for line in value.splitlines()]
+            if isinstance(value, list):
+                value = [str(item).strip() for item in value if item is not None and str(item).strip()]
+                for bound in metadata:
+                    if isinstance(bound, MaxLen):
+                        value = value[:bound.max_length]
+            return value
+
+        return value
+
+    def normalize(self, model: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+        normalized: Dict[str, Any] = {}
+        for name, field in model.model_fields.items():
+            if name not in data:
+                continue
+            try:
+                normalized[name] = self._normalize_value(field.annotation, field.metadata, data[name])
+            except (TypeError, ValueError):
+                # unusable: leave it out so it is reported missing
+                continue
+        return normalized
+
+    def validate_partial(self, model: Type[BaseModel], data: Dict[str, Any]) -> Tuple[Optional[BaseModel], Dict[str, Any], List[str]]:
+        """
+        Validate `data` against `model` as (result, valid fields, missing or invalid required fields).
+        `result` is None unless every required field is valid.
+        """
+        data = self.normalize(model, data)
+        try:
+            return model.model_validate(data), data, []
+        except ValidationError as e:
+            invalid = {error["loc"][0] for error in e.errors() if error["loc"]}
+
+        valid = {name: value for name, value in data.items() if name not in invalid}
+        missing = [name for name, field in model.model_fields.items() if field.is_required() and name not in valid]
+        if not missing:
+            # only optional fields were invalid: drop them
+            return model.model_validate(valid), valid, []
+        return None, valid, missing
+
+    def salvage(self, model: Type[BaseModel], text: str) -> Tuple[Optional[BaseModel], Dict[str, Any], List[str]]:
+        """Lenient parse + normalize + validate of raw LLM output; see `validate_partial`."""
+        data = self.parse_lenient(text) or {}
+        return self.validate_partial(model, data)
+
+salvage_service = SalvageService()
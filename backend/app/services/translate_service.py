@@ -1,40 +1,96 @@
 import json
 import asyncio
-from typing import Dict, Any, Optional
-from pydantic import ValidationError
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar
+from urllib.parse import urlsplit
+from pydantic import BaseModel, ValidationError
 from app.core.config import settings
 from app.core.prompts import Prompts
-from app.models.article import AITranslatedResult
-from openai import AsyncOpenAI
+from app.models.article import AITranslatedResult, TriageResult
 from app.core.decorators import monitor_news_ingestor
+from app.core.distributed_lock import lease_lost
 from app.core.logger import logger
+from app.db.disk_cache import DiskCache
+from app.services.compaction_service import compaction_service
+from app.services.llm_router import LLMRouter
+from app.services.llm_batch import LLMBatchClient
+from app.services.salvage_service import salvage_service
+
+ResultT = TypeVar("ResultT", bound=BaseModel)
+# a summarize result and the analysis_version it is stored with
+Summary = Tuple[AITranslatedResult, str]
+
+def _prompt_version(prompt: str) -> str:
+    # any edit to the system prompt changes the version and invalidates cached results
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
 
 class TranslateService:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.gemini_api_key,
-            base_url=settings.gemini_base_url,
+        # summarization is routed across the configured providers (LLM_PROVIDERS)
+        self.router = LLMRouter.from_settings()
+        # large backlogs go through the provider's batch endpoint instead (LLM_BATCH_ENABLED)
+        self.batch_client = LLMBatchClient(self.router)
 
-        )
-        self.model = settings.gemini_model
-        self.temperature = settings.gemini_temperature
-        self.sem = asyncio.Semaphore(settings.gemini_concurrent_limit)
+        # cache of validated results keyed by model, prompt version and input
+        self.prompt_version = _prompt_version(Prompts.SUMMARIZE_SYSTEM_Chinese)
+        self.triage_prompt_version = _prompt_version(Prompts.TRIAGE_SYSTEM)
+        # versions an analysis can currently be stored with (one per configured model); analyses from
+        # another prompt or from a model that is no longer configured are stale
+        self.analysis_versions = sorted({self.analysis_version(provider.model) for provider in self.router.providers})
+        self.cache: Optional[DiskCache] = None
+        if settings.llm_cache_enabled:
+            self.cache = DiskCache(
+                directory=str(Path(settings.cache_dir) / "llm"),
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                max_bytes=settings.llm_cache_max_bytes,
+            )
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # summarize results that failed validation, and how many of them were repaired
+        self.salvage_attempts = 0
+        self.salvaged = 0
 
-    async def translate_and_summarize(
-        self, 
-        title: str, 
-        hn_text: Optional[str]=None, 
-        scraped_content: Optional[str]=None
-        ) -> Optional[AITranslatedResult]:
+    def analysis_version(self, model: str) -> str:
+        """Stored with each article's detailed_analysis: the summarize prompt version and the model that answered."""
+        return f"{self.prompt_version}:{model}"
+
+    def _cache_key(self, model: str, prompt_version: str, combined_input: str) -> str:
+        return f"{model}:{prompt_version}:{hashlib.sha256(combined_input.encode('utf-8')).hexdigest()}"
+
+    async def _get_cached(
+        self, result_type: Type[ResultT], prompt_version: str, combined_input: str
+    ) -> Optional[Tuple[str, ResultT]]:
+        # a result from any configured provider's model is reused; returns (model, result)
+        for provider in self.router.providers:
+            cached = await self.cache.aget_text(self._cache_key(provider.model, prompt_version, combined_input))
+            if cached is None:
+                continue
+            try:
+                return provider.model, result_type.model_validate_json(cached)
+            except ValidationError:
+                # written under an older AITranslatedResult schema
+                continue
+        return None
 
+    async def _summarize_input(
+        self,
+        title: str,
+        hn_text: Optional[str] = None,
+        scraped_content: Optional[str] = None,
+        ) -> Optional[str]:
+        # user message for the summarize prompt; None when there is nothing to summarize
         if not title and not hn_text and not scraped_content:
             return None
         
         safe_title = title or "N/A"
         safe_hn_text = hn_text or "N/A"
-        safe_scraped_content = scraped_content[:100000] if scraped_content else "N/A"
+        if scraped_content and settings.llm_compaction_enabled:
+            # strip page boilerplate and fit the content into the input token budget
+            scraped_content = await asyncio.to_thread(compaction_service.compact, scraped_content)
+        safe_scraped_content = scraped_content or "N/A"
 
-        combined_input = f"""
+        return f"""
         Title: {safe_title}
         Original Post Description: 
         {safe_hn_text}
@@ -43,30 +99,75 @@ class TranslateService:
         {safe_scraped_content}
         """
 
-        system_prompt = Prompts.SUMMARIZE_SYSTEM_Chinese
+    def _summarize_messages(self, combined_input: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": Prompts.SUMMARIZE_SYSTEM_Chinese},
+            {"role": "user", "content": combined_input},
+        ]
+
+    async def _get_cached_summary(self, combined_input: str) -> Optional[Summary]:
+        if not self.cache:
+            return None
+        cached = await self._get_cached(AITranslatedResult, self.prompt_version, combined_input)
+        if cached is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        model, result = cached
+        return result, self.analysis_version(model)
+
+    async def translate_and_summarize(
+        self, 
+        title: str, 
+        hn_text: Optional[str]=None, 
+        scraped_content: Optional[str]=None
+        ) -> Optional[Summary]:
+        """The summarize result and its analysis_version, or None on failure."""
+        combined_input = await self._summarize_input(title, hn_text, scraped_content)
+        if combined_input is None:
+            return None
 
+        cached = await self._get_cached_summary(combined_input)
+        if cached is not None:
+            return cached
+        return await self._summarize(combined_input)
+
+    async def _summarize(self, combined_input: str) -> Optional[Summary]:
         try:
-            async with self.sem:
-                response = await self.client.chat.completions.create(
-                    model = self.model,
-                    messages = [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": combined_input},
-                    ],
-                    response_format={"type": "json_object"},
-                    temperature=self.temperature,
-                )
+            provider, response = await self.router.complete(
+                messages = self._summarize_messages(combined_input),
+                response_format={"type": "json_object"},
+            )
+        except Exception as e:
+            logger.error(f"[TranslateAndSummarizerService] Error processing content: {str(e)}")
+            return None
 
-                result_text = response.choices[0].message.content
+        return await self._accept_result(provider.model, combined_input, response.choices[0].message.content)
 
-                if not result_text:
-                    logger.error(f"[TranslateAndSummarizerService] Error: LLM returned empty result")
+    async def _accept_result(self, model: str, combined_input: str, result_text: Optional[str]) -> Optional[Summary]:
+        # validate (salvaging if needed) and cache one summarize answer, from an interactive or a batch call;
+        # `model` is the one that answered (a salvage follow-up only fills in its gaps)
+        try:
+            if not result_text:
+                logger.error("[TranslateAndSummarizerService] Error: LLM returned empty result")
+                return None
+            
+            try:
+                result = AITranslatedResult.model_validate_json(result_text)
+            except ValidationError as e:
+                if not settings.llm_salvage_enabled:
+                    raise
+                logger.warning(f"[TranslateAndSummarizerService] Invalid result ({e.error_count()} errors), salvaging")
+                result = await self._salvage(self._summarize_messages(combined_input), result_text)
+                if result is None:
                     return None
-                
-                return AITranslatedResult.model_validate_json(result_text)
+
+            if self.cache:
+                await self.cache.aset_text(self._cache_key(model, self.prompt_version, combined_input), result.model_dump_json())
+            return result, self.analysis_version(model)
 
         except json.JSONDecodeError:
-            logger.error(f"[TranslateAndSummarizerService] Error: LLM returned invalid JSON")
+            logger.error("[TranslateAndSummarizerService] Error: LLM returned invalid JSON")
             return None
         except ValidationError as e:
             logger.error(f"[TranslateAndSummarizerService] Validation Error: {str(e)}")
@@ -75,15 +176,50 @@ class TranslateService:
             logger.error(f"[TranslateAndSummarizerService] Error processing content: {str(e)}")
             return None
 
+    async def _salvage(self, messages: List[Dict[str, str]], result_text: str) -> Optional[AITranslatedResult]:
+        """
+        Repair an invalid summarize result: lenient parse and clamping first, then one follow-up
+        turn that regenerates only the fields still missing or invalid.
+        """
+        self.salvage_attempts += 1
+        result, valid, missing = salvage_service.salvage(AITranslatedResult, result_text)
+
+        if result is None and settings.llm_salvage_followup_enabled:
+            try:
+                _, response = await self.router.complete(
+                    messages = messages + [
+                        {"role": "assistant", "content": json.dumps(valid, ensure_ascii=False)},
+                        {"role": "user", "content": Prompts.SALVAGE_FOLLOWUP.format(fields=", ".join(missing))},
+                    ],
+                    response_format={"type": "json_object"},
+                )
+                regenerated = salvage_service.parse_lenient(response.choices[0].message.content or "") or {}
+                valid.update({name: value for name, value in regenerated.items() if name in missing})
+                result, _, missing = salvage_service.validate_partial(AITranslatedResult, valid)
+            except Exception as e:
+                logger.error(f"[TranslateAndSummarizerService] Salvage follow-up error: {str(e)}")
+
+        if result is None:
+            logger.error(f"[TranslateAndSummarizerService] Could not salvage result, missing or invalid: {', '.join(missing)}")
+            return None
+        self.salvaged += 1
+        return result
+
     @monitor_news_ingestor(step_name="Translate-Summarize")
     async def translate_and_summarize_batch(
         self, 
         inputs: Dict[int, Dict[str, Any]]
-        ) -> Dict[int, Optional[AITranslatedResult]]:
+        ) -> Dict[int, Optional[Summary]]:
         # concurrently translate and summarize multiple inputs
+        stats_before = self.stats_snapshot()
 
         ids = list[int](inputs.keys())
 
+        if settings.llm_batch_enabled and len(ids) >= settings.llm_batch_min_size:
+            results_map = await self._translate_and_summarize_offline(inputs)
+            self.log_run_stats(stats_before)
+            return results_map
+
         tasks = [
             self.translate_and_summarize(
                 title = inputs[i].get("title", ""),
@@ -94,7 +230,142 @@ class TranslateService:
 
         results = await asyncio.gather(*tasks)
 
+        self.log_run_stats(stats_before)
         return dict(zip(ids, results))
+
+    async def _translate_and_summarize_offline(self, inputs: Dict[int, Dict[str, Any]]) -> Dict[int, Optional[Summary]]:
+        """
+        Batch-API mode for backlogs: cache misses are submitted as one batch job and the answers
+        validated like interactive ones. Requests the batch did not answer fall back to interactive calls.
+        """
+        ids = list(inputs.keys())
+        combined_inputs = await asyncio.gather(*(
+            self._summarize_input(
+                title = inputs[i].get("title", ""),
+                hn_text = inputs[i].get("hn_text"),
+                scraped_content = inputs[i].get("scraped_content"),
+                ) for i in ids
+        ))
+
+        results: Dict[int, Optional[Summary]] = {}
+        pending: Dict[int, str] = {}
+        for i, combined_input in zip(ids, combined_inputs):
+            results[i] = await self._get_cached_summary(combined_input) if combined_input else None
+            if combined_input and results[i] is None:
+                pending[i] = combined_input
+
+        try:
+            answers = await self.batch_client.complete(
+                {str(i): self._summarize_messages(combined_input) for i, combined_input in pending.items()},
+                response_format={"type": "json_object"},
+            )
+        except Exception as e:
+            logger.error(f"[TranslateAndSummarizerService] Batch job failed, falling back to interactive calls: {str(e)}")
+            answers = {}
+        if lease_lost():
+            # the batch was left running for the process that holds the lock now
+            return results
+
+        fallback = [i for i in pending if str(i) not in answers]
+        if fallback:
+            logger.warning(f"[TranslateAndSummarizerService] {len(fallback)} of {len(pending)} batch requests unanswered, retrying interactively")
+
+        async def accept(i: int) -> Optional[Summary]:
+            model, result_text = answers[str(i)]
+            return await self._accept_result(model, pending[i], result_text)
+
+        answered = [i for i in pending if str(i) in answers]
+        outcomes = await asyncio.gather(
+            *(accept(i) for i in answered),
+            *(self._summarize(pending[i]) for i in fallback),
+        )
+        results.update(zip(answered + fallback, outcomes))
+        return results
+
+    async def triage(
+        self,
+        title: str,
+        hn_text: Optional[str] = None,
+        url: Optional[str] = None,
+        ) -> Optional[TriageResult]:
+        """
+        Cheap pre-screen on title + HN text + link domain (no extraction, short output).
+        Returns None on failure; callers treat that as "not triaged" and process the story fully.
+        """
+        safe_hn_text = "N/A"
+        if hn_text:
+            # tiktoken encoding is CPU-bound: keep it off the event loop
+            safe_hn_text = await asyncio.to_thread(compaction_service.truncate_tokens, hn_text, settings.triage_max_input_tokens)
+        triage_input = f"""
+        Title: {title or "N/A"}
+        Original Post Description:
+        {safe_hn_text}
+        ---
+        Domain: {urlsplit(url).netloc if url else "N/A"}
+        """
+
+        if self.cache:
+            cached = await self._get_cached(TriageResult, self.triage_prompt_version, triage_input)
+            if cached is not None:
+                return cached[1]
+
+        try:
+            provider, response = await self.router.complete(
+                messages = [
+                    {"role": "system", "content": Prompts.TRIAGE_SYSTEM},
+                    {"role": "user", "content": triage_input},
+                ],
+                response_format={"type": "json_object"},
+            )
+
+            result_text = response.choices[0].message.content
+            if not result_text:
+                logger.error("[TranslateAndSummarizerService] Triage error: LLM returned empty result")
+                return None
+
+            try:
+                result = TriageResult.model_validate_json(result_text)
+            except ValidationError:
+                # out-of-range score, code fences, ...: repair locally, a triage is not worth a follow-up
+                result, _, _ = salvage_service.salvage(TriageResult, result_text)
+                if result is None:
+                    raise
+
+            if self.cache:
+                await self.cache.aset_text(self._cache_key(provider.model, self.triage_prompt_version, triage_input), result.model_dump_json())
+            return result
+
+        except ValidationError as e:
+            logger.error(f"[TranslateAndSummarizerService] Triage validation error: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"[TranslateAndSummarizerService] Triage error: {str(e)}")
+            return None
+
+    @monitor_news_ingestor(step_name="Triage")
+    async def triage_batch(self, inputs: Dict[int, Dict[str, Any]]) -> Dict[int, Optional[TriageResult]]:
+        ids = list(inputs.keys())
+        results = await asyncio.gather(*(
+            self.triage(
+                title = inputs[i].get("title", ""),
+                hn_text = inputs[i].get("hn_text"),
+                url = inputs[i].get("url"),
+                ) for i in ids
+        ))
+        return dict(zip(ids, results))
+
+    def stats_snapshot(self) -> Tuple[int, int, int, int]:
+        return self.cache_hits, self.cache_misses, self.salvage_attempts, self.salvaged
+
+    def log_run_stats(self, before: Tuple[int, int, int, int]) -> None:
+        # cache and salvage counters since the given snapshot, in the Translate-Summarize stage log
+        hits, misses, attempts, salvaged = (now - then for now, then in zip(self.stats_snapshot(), before))
+        stage_logger = logger.bind(type="news_ingestor", step="Translate-Summarize")
+        if self.cache:
+            hit_rate = hits / (hits + misses) if hits + misses else 0.0
+            stage_logger.info(f"Cache hits: {hits}, misses: {misses} (hit rate {hit_rate:.0%})")
+        if attempts:
+            stage_logger.info(f"Invalid results: {attempts}, salvaged: {salvaged} (salvage rate {salvaged / attempts:.0%})")
         
 
 translate_service = TranslateService()
@@ -0,0 +1,223 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from app.core.logger import logger
+
+# rows scored per matrix product
+BLOCK_ROWS = 65_536
+
+class VectorIndex:
+    """
+    In-memory cosine top-k index over chunk embeddings, a read cache in front of `match_documents`.
+
+    - vectors are L2-normalized; with `quantize`, stored as int8 with one float32 scale per row
+      (4x smaller, scores within ~1% of float32)
+    - IVF: once `build_ivf` has run, vectors are assigned to their nearest k-means centroid and
+      a search only scores the lists of the `nprobe` centroids closest to the query
+    - rows are appended into preallocated arrays (capacity doubles), deleted rows are masked
+      until `compact` drops them
+    Thread-safe: searches run in worker threads while chunks are added from the event loop.
+    """
+    def __init__(self, quantize: bool = True, nprobe: int = 16):
+        self.quantize = quantize
+        self.nprobe = nprobe
+
+        self.size = 0
+        self._dims: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._chunk_ids = np.zeros(0, dtype=np.int64)
+        self._contents: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        # chunk id -> row of the live rows
+        self._rows: Dict[int, int] = {}
+
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def dead_fraction(self) -> float:
+        # share of the used rows that were removed and are only masked
+        return (self.size - len(self._rows)) / self.size if self.size else 0.0
+
+    def _grow(self, extra: int, dims: int) -> None:
+        needed = self.size + extra
+        capacity = len(self._alive)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+
+        def resized(array: Optional[np.ndarray], shape, dtype) -> np.ndarray:
+            grown = np.zeros(shape, dtype=dtype)
+            if array is not None and self.size:
+                grown[:self.size] = array[:self.size]
+            return grown
+
+        self._vectors = resized(self._vectors, (capacity, dims), np.int8 if self.quantize else np.float32)
+        self._scales = resized(self._scales, (capacity,), np.float32)
+        self._alive = resized(self._alive, (capacity,), bool)
+        self._chunk_ids = resized(self._chunk_ids, (capacity,), np.int64)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add(
+        self,
+        chunk_ids: Sequence[int],
+        vectors: np.ndarray,
+        contents: Sequence[str],
+        metadata: Sequence[Dict[str, Any]],
+    ) -> int:
+        """Add chunks (rows already indexed are skipped); returns how many were added."""
+        with self._lock:
+            new = [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in self._rows]
+            if not new:
+                return 0
+            vectors = self._normalize(np.asarray(vectors, dtype=np.float32)[new])
+            if self._dims is None:
+                self._dims = vectors.shape[1]
+            elif vectors.shape[1] != self._dims:
+                raise ValueError(f"vector width {vectors.shape[1]} does not match the index ({self._dims})")
+
+            self._grow(len(new), self._dims)
+            rows = slice(self.size, self.size + len(new))
+            if self.quantize:
+                scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+                self._vectors[rows] = np.round(vectors / scales[:, None]).astype(np.int8)
+                self._scales[rows] = scales
+            else:
+                self._vectors[rows] = vectors
+                self._scales[rows] = 1.0
+            self._alive[rows] = True
+            self._chunk_ids[rows] = [chunk_ids[i] for i in new]
+            self._contents.extend(contents[i] for i in new)
+            self._metadata.extend(metadata[i] for i in new)
+            self._rows.update((chunk_ids[i], row) for i, row in zip(new, range(rows.start, rows.stop)))
+
+            if self._centroids is not None:
+                for row, centroid in zip(range(rows.start, rows.stop), np.argmax(vectors @ self._centroids.T, axis=1)):
+                    self._lists[centroid].append(row)
+            self.size = rows.stop
+            return len(new)
+
+    def remove(self, chunk_ids: Iterable[int]) -> int:
+        """Remove chunks by id (unknown ids are ignored); returns how many were removed."""
+        with self._lock:
+            removed = 0
+            for chunk_id in chunk_ids:
+                row = self._rows.pop(chunk_id, None)
+                if row is None:
+                    continue
+                self._alive[row] = False
+                # the text is freed now, the vector row by the next compact()
+                self._contents[row] = None
+                self._metadata[row] = None
+                removed += 1
+            return removed
+
+    def compact(self) -> int:
+        """Drop the removed rows from the arrays (and IVF lists); returns how many rows were dropped."""
+        with self._lock:
+            keep = np.flatnonzero(self._alive[:self.size])
+            dropped = self.size - len(keep)
+            if not dropped:
+                return 0
+            # old row -> new row, -1 for dropped rows
+            remap = np.full(self.size, -1, dtype=np.int64)
+            remap[keep] = np.arange(len(keep))
+
+            capacity = max(len(keep), 1024)
+            def packed(array: np.ndarray) -> np.ndarray:
+                compacted = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+                compacted[:len(keep)] = array[keep]
+                return compacted
+
+            self._vectors = packed(self._vectors)
+            self._scales = packed(self._scales)
+            self._alive = packed(self._alive)
+            self._chunk_ids = packed(self._chunk_ids)
+            self._contents = [self._contents[row] for row in keep.tolist()]
+            self._metadata = [self._metadata[row] for row in keep.tolist()]
+            self._rows = {int(chunk_id): row for row, chunk_id in enumerate(self._chunk_ids[:len(keep)].tolist())}
+            self._lists = [[int(remap[row]) for row in rows if remap[row] >= 0] for rows in self._lists]
+            self.size = len(keep)
+        logger.info(f"[VectorIndex] Compacted {dropped} removed rows, {self.size} rows left")
+        return dropped
+
+    def _dequantized(self, rows: np.ndarray) -> np.ndarray:
+        vectors = self._vectors[rows]
+        if not self.quantize:
+            return vectors
+        return vectors.astype(np.float32) * self._scales[rows, None]
+
+    def _scores(self, rows: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+        # blockwise, so int8 rows are never dequantized all at once
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = rows[start:start + BLOCK_ROWS]
+            scores[start:start + len(block)] = self._dequantized(block) @ query_vector
+        return scores
+
+    def build_ivf(self, nlist: int, iterations: int = 10, sample_size: int = 50_000, seed: int = 0) -> None:
+        """Spherical k-means on a sample of the vectors, then assign every row to its nearest centroid."""
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:self.size])
+            if len(rows) < nlist:
+                return
+            rng = np.random.default_rng(seed)
+            sample = self._dequantized(rng.choice(rows, size=min(sample_size, len(rows)), replace=False))
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = ~sums.any(axis=1)
+                # an empty cluster keeps its centroid
+                sums[empty] = centroids[empty]
+                centroids = self._normalize(sums)
+
+            lists: List[List[int]] = [[] for _ in range(nlist)]
+            for start in range(0, len(rows), BLOCK_ROWS):
+                block = rows[start:start + BLOCK_ROWS]
+                for row, centroid in zip(block.tolist(), np.argmax(self._dequantized(block) @ centroids.T, axis=1).tolist()):
+                    lists[centroid].append(row)
+            self._centroids = centroids
+            self._lists = lists
+        logger.info(f"[VectorIndex] Built IVF with {nlist} lists over {len(rows)} vectors")
+
+    def search(self, query: Sequence[float], limit: int, threshold: float) -> List[Dict[str, Any]]:
+        """Top `limit` chunks by cosine similarity above `threshold`, shaped like `match_documents` rows."""
+        query_vector = self._normalize(np.asarray(query, dtype=np.float32))
+        with self._lock:
+            if not self.size:
+                return []
+            if self._centroids is not None:
+                probes = np.argsort(self._centroids @ query_vector)[-self.nprobe:]
+                rows = np.fromiter((row for probe in probes for row in self._lists[probe]), dtype=np.int64)
+            else:
+                rows = np.arange(self.size)
+            rows = rows[self._alive[rows]]
+            if not len(rows):
+                return []
+
+            scores = self._scores(rows, query_vector)
+            top = np.argpartition(-scores, min(limit, len(scores)) - 1)[:limit]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                {
+                    "id": int(self._chunk_ids[rows[i]]),
+                    "content": self._contents[rows[i]],
+                    "metadata": self._metadata[rows[i]],
+                    "similarity": float(scores[i]),
+                }
+                for i in top if scores[i] > threshold
+            ]
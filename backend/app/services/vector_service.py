@@ -1,21 +1,50 @@
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import json
+import math
+import time
+from pathlib import Path
+import numpy as np
+from typing import List, Dict, Any, Optional
 from langchain_openai import OpenAIEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from app.core.config import settings
-from app.models.article import Article
+from app.models.article import Article, AITranslatedResult
 from app.models.chunk import DocumentChunk, DocumentChunkMetadata
 from app.core.logger import logger
 from app.repositories.vector_repository import vector_repository
 from app.repositories.article_repository import article_repository
 from app.core.config import settings
 from app.core.decorators import monitor_news_ingestor
+from app.core.adaptive_limiter import AdaptiveLimiter
+from app.db.disk_cache import DiskCache
+from app.core.distributed_lock import lease_lost
+from app.db.redis import get_redis
+from app.services.compaction_service import compaction_service
+from app.services.lexical_tokenizer import lexical_tokenizer
+from app.services.vector_index import VectorIndex
+
+# chunk ids deleted by any process, scored by deletion time; read by every in-process index
+TOMBSTONES_KEY = "vector_index:tombstones"
+# re-read tombstones this far before the last one seen (clock skew between writers)
+TOMBSTONE_LOOKBACK_SECONDS = 60
+# output width of the embedding models when EMBEDDING_DIMENSIONS is not set
+DEFAULT_EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
 
 class VectorService:
     def __init__(self):
         self.embeddings = OpenAIEmbeddings(
-            model = "text-embedding-3-small",
-            openai_api_key=settings.openai_api_key
+            model = settings.embedding_model,
+            dimensions=settings.embedding_dimensions,
+            openai_api_key=settings.openai_api_key,
+            # retries (honoring Retry-After) are done by the adaptive limiter
+            max_retries=0 if settings.adaptive_limiter_enabled else 2,
+            # requests are packed by _pack; one pack is one HTTP request
+            chunk_size=settings.embedding_request_max_chunks,
         )
 
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -25,100 +54,449 @@ class VectorService:
             separators=["\n\n", "\n", "。", "！", "？", ".", " ", ""]
         )
         
-        self.sem = asyncio.Semaphore(settings.openai_embedding_concurrent_limit)
+        self.limiter = AdaptiveLimiter("openai_embedding", settings.openai_embedding_concurrent_limit)
 
-    async def process_and_store_article(self, article: Article):
-        async with self.sem:
-            try:
-                parts = []
-
-                # (Part A: original description in HN)
-                if article.original_text:
-                    parts.append(f"=== Hacker News Description ===\n{article.original_text}")
-                
-                # (Part B: raw content from url)
-                if article.raw_content:
-                    parts.append(f"=== Article Content ===\n{article.raw_content}")
-                
-                # (Part C: detailed analysis from LLM)
-                if article.detailed_analysis:
-                    analysis = article.detailed_analysis
-                    analysis_text = f"""
-                    === AI Analysis Report ===
-                    Topic: {analysis.topic}
-                    Chinese Title: {analysis.title_cn}
-                    Summary: {analysis.summary}
-                    Key Points: {chr(10).join(analysis.key_points)}
-                    Takeaway: {analysis.takeaway}
-                    """
-                    parts.append(analysis_text)
-                
-                full_text = "\n\n".join(parts)
-
-                if not full_text or len(full_text) < 50:
-                    logger.info(f"[VectorService] Article {article.hn_id} content too short, skipping.")
-                    return
-                
-                chunks = self.text_splitter.split_text(full_text)
-
-                records = []
-                vectors = await self.embeddings.aembed_documents(chunks)
-
-                for i, chunk in enumerate(chunks):
-                    doc_chunk = DocumentChunk(
-                        article_id=article.id,
-                        content=chunk,
-                        embedding=vectors[i],
-                        metadata=DocumentChunkMetadata(
-                            chunk_index=i,
-                            title=article.original_title,
-                            hn_id=article.hn_id
-                        )
-                    )
-                    records.append(doc_chunk)
-                
-                if not records:
-                    logger.warning(f"[VectorService] Skipped saving chunks for {article.hn_id}: Missing article.id")
-                    return False
-                
-                success = vector_repository.add_chunks(records)
-                if success:
-                    mark_success = article_repository.mark_article_embedded(article.id)
-                    if mark_success:
-                         logger.info(f"[VectorService] Stored {len(records)} chunks & marked embedded for {article.hn_id}")
-                    else:
-                         logger.warning(f"[VectorService] Stored chunks but FAILED to mark embedded for {article.hn_id}")
-                    return True
+        # chunk vectors (raw float32) keyed by model, dimensions and chunk text hash
+        self.cache: Optional[DiskCache] = None
+        if settings.embedding_cache_enabled:
+            self.cache = DiskCache(
+                directory=str(Path(settings.cache_dir) / "embeddings"),
+                ttl_seconds=settings.embedding_cache_ttl_seconds,
+                max_bytes=settings.embedding_cache_max_bytes,
+                compress=False,
+            )
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # in-process read cache for search_similar (VECTOR_INDEX_ENABLED); started by start_index()
+        self.index: Optional[VectorIndex] = None
+        if settings.vector_index_enabled:
+            self.index = VectorIndex(quantize=settings.vector_index_quantize, nprobe=settings.vector_index_nprobe)
+        self._index_ready = False
+        self._index_cursor = 0
+        self._tombstone_cursor = 0.0
+        self._index_ivf_size = 0
+        self._index_task: Optional[asyncio.Task] = None
+        self._index_refresh = asyncio.Event()
+
+    def analysis_text(self, analysis: AITranslatedResult) -> str:
+        # the part of the analysis that is embedded; articles only need re-embedding when it changes
+        return f"""
+                === AI Analysis Report ===
+                Topic: {analysis.topic}
+                Chinese Title: {analysis.title_cn}
+                Summary: {analysis.summary}
+                Key Points: {chr(10).join(analysis.key_points)}
+                Takeaway: {analysis.takeaway}
+                """
+
+    def _split_article(self, article: Article) -> List[str]:
+        parts = []
+
+        # (Part A: original description in HN)
+        if article.original_text:
+            parts.append(f"=== Hacker News Description ===\n{article.original_text}")
+        
+        # (Part B: raw content from url)
+        if article.raw_content:
+            parts.append(f"=== Article Content ===\n{article.raw_content}")
+        
+        # (Part C: detailed analysis from LLM)
+        if article.detailed_analysis:
+            parts.append(self.analysis_text(article.detailed_analysis))
+        
+        full_text = "\n\n".join(parts)
+
+        if not full_text or len(full_text) < 50:
+            logger.info(f"[VectorService] Article {article.hn_id} content too short, skipping.")
+            return []
+        
+        return self.text_splitter.split_text(full_text)
+
+    def _pack(self, chunks: List[str]) -> List[List[int]]:
+        """
+        Group chunk indexes into embedding requests as large as the API allows:
+        at most `embedding_request_max_chunks` inputs and `embedding_request_max_tokens` tokens each.
+        """
+        packs: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for index, chunk in enumerate(chunks):
+            tokens = compaction_service.count_tokens(chunk)
+            if current and (
+                len(current) >= settings.embedding_request_max_chunks
+                or current_tokens + tokens > settings.embedding_request_max_tokens
+            ):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    def _cache_key(self, chunk: str) -> str:
+        dimensions = self.embeddings.dimensions or "default"
+        return f"{self.embeddings.model}:{dimensions}:{hashlib.sha256(chunk.encode('utf-8')).hexdigest()}"
+
+    def _get_cached(self, chunks: List[str]) -> List[Optional[List[float]]]:
+        vectors: List[Optional[List[float]]] = []
+        for chunk in chunks:
+            cached = self.cache.get(self._cache_key(chunk))
+            vectors.append(np.frombuffer(cached, dtype=np.float32).tolist() if cached is not None else None)
+        return vectors
+
+    def _set_cached(self, chunks: List[str], vectors: List[List[float]]) -> None:
+        for chunk, vector in zip(chunks, vectors):
+            self.cache.set(self._cache_key(chunk), np.asarray(vector, dtype=np.float32).tobytes())
+
+    async def _embed_chunks(self, chunks: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed chunks, answering repeated and previously embedded texts from the cache; the rest
+        go out in packed requests, run concurrently. Chunks of a failed request get None.
+        """
+        cached: List[Optional[List[float]]] = [None] * len(chunks)
+        if self.cache:
+            cached = await asyncio.to_thread(self._get_cached, chunks)
 
+        # identical texts (shared scaffolding, re-runs) are embedded once
+        positions: Dict[str, List[int]] = {}
+        for index, (chunk, vector) in enumerate(zip(chunks, cached)):
+            if vector is None:
+                positions.setdefault(chunk, []).append(index)
+        if self.cache:
+            self.cache_hits += len(chunks) - len(positions)
+            self.cache_misses += len(positions)
+
+        vectors = list(cached)
+        missing = list(positions)
+        if not missing:
+            return vectors
+
+        embedded = await self._embed_packed(missing)
+        for chunk, vector in zip(missing, embedded):
+            for index in positions[chunk]:
+                vectors[index] = vector
+
+        if self.cache:
+            done = [(chunk, vector) for chunk, vector in zip(missing, embedded) if vector is not None]
+            await asyncio.to_thread(self._set_cached, [chunk for chunk, _ in done], [vector for _, vector in done])
+        return vectors
+
+    async def _embed_packed(self, chunks: List[str]) -> List[Optional[List[float]]]:
+        # packed requests, run concurrently; chunks of a failed request get None
+        packs = await asyncio.to_thread(self._pack, chunks)
+
+        async def embed_pack(pack: List[int]) -> Optional[List[List[float]]]:
+            try:
+                return await self.limiter.call(self.embeddings.aembed_documents, [chunks[i] for i in pack])
             except Exception as e:
-                logger.error(f"[VectorService] Error processing article {article.hn_id}: {e}")
+                logger.error(f"[VectorService] Embedding request with {len(pack)} chunks failed: {e}")
+                return None
+
+        vectors: List[Optional[List[float]]] = [None] * len(chunks)
+        for pack, pack_vectors in zip(packs, await asyncio.gather(*(embed_pack(pack) for pack in packs))):
+            if pack_vectors is not None:
+                for index, vector in zip(pack, pack_vectors):
+                    vectors[index] = vector
+        logger.debug(f"[VectorService] Embedded {len(chunks)} chunks in {len(packs)} requests")
+        return vectors
+
+    async def _store_chunks(self, article: Article, chunks: List[str], vectors: List[List[float]], mark_embedded: bool) -> bool:
+        records = []
+        for i, chunk in enumerate(chunks):
+            doc_chunk = DocumentChunk(
+                article_id=article.id,
+                content=chunk,
+                embedding=vectors[i],
+                metadata=DocumentChunkMetadata(
+                    chunk_index=i,
+                    title=article.original_title,
+                    hn_id=article.hn_id
+                ),
+                lexemes=lexical_tokenizer.tokenize(chunk) if settings.hybrid_search_enabled else None,
+            )
+            records.append(doc_chunk)
+        
+        if not records:
+            logger.warning(f"[VectorService] Skipped saving chunks for {article.hn_id}: Missing article.id")
+            return False
+        
+        success = await vector_repository.add_chunks(records)
+        if success and self.index is not None:
+            # pick the new chunks up without waiting for the next periodic refresh
+            self._index_refresh.set()
+        if success and not mark_embedded:
+            # caller marks the whole batch with one update
+            logger.info(f"[VectorService] Stored {len(records)} chunks for {article.hn_id}")
+            return True
+        if success:
+            mark_success = await article_repository.mark_article_embedded(article.id)
+            if mark_success:
+                 logger.info(f"[VectorService] Stored {len(records)} chunks & marked embedded for {article.hn_id}")
+            else:
+                 logger.warning(f"[VectorService] Stored chunks but FAILED to mark embedded for {article.hn_id}")
+            return True
+        return False
+
+    async def process_and_store_article(self, article: Article, mark_embedded: bool = True):
+        try:
+            chunks = self._split_article(article)
+            if not chunks:
+                return
+
+            vectors = await self._embed_chunks(chunks)
+            if any(vector is None for vector in vectors):
                 return False
 
+            return await self._store_chunks(article, chunks, vectors, mark_embedded)
+
+        except Exception as e:
+            logger.error(f"[VectorService] Error processing article {article.hn_id}: {e}")
+            return False
+
     @monitor_news_ingestor(step_name="Vectorization-Batch")
     async def process_and_store_articles_batch(self, articles: List[Article]):
         """
-        Batch process vectorization tasks for multiple articles
+        Batch process vectorization tasks for multiple articles.
+        Chunks of all articles are packed together into as few embedding requests as possible,
+        then the vectors are scattered back and each article's chunks stored.
         """
         if not articles:
             return
 
-        tasks = [self.process_and_store_article(article) for article in articles]
+        hits_before, misses_before = self.cache_hits, self.cache_misses
+        article_chunks = [self._split_article(article) for article in articles]
+        all_chunks = [chunk for chunks in article_chunks for chunk in chunks]
+        all_vectors = await self._embed_chunks(all_chunks)
+
+        if self.cache:
+            hits, misses = self.cache_hits - hits_before, self.cache_misses - misses_before
+            hit_rate = hits / (hits + misses) if hits + misses else 0.0
+            logger.bind(type="news_ingestor", step="Vectorization-Batch").info(
+                f"Embedding cache hits: {hits}, misses: {misses} (hit rate {hit_rate:.0%})"
+            )
+
+        async def store(article: Article, chunks: List[str], vectors: List[Optional[List[float]]]):
+            if not chunks:
+                return None
+            if any(vector is None for vector in vectors):
+                return False
+            try:
+                return await self._store_chunks(article, chunks, vectors, mark_embedded=False)
+            except Exception as e:
+                logger.error(f"[VectorService] Error processing article {article.hn_id}: {e}")
+                return False
+
+        tasks = []
+        offset = 0
+        for article, chunks in zip(articles, article_chunks):
+            tasks.append(store(article, chunks, all_vectors[offset:offset + len(chunks)]))
+            offset += len(chunks)
         
         results = await asyncio.gather(*tasks)
+
+        embedded_ids = [article.id for article, success in zip(articles, results) if success]
+        if embedded_ids:
+            marked = await article_repository.mark_articles_embedded(embedded_ids)
+            if marked < len(embedded_ids):
+                logger.warning(f"[VectorService] Stored chunks for {len(embedded_ids)} articles but marked only {marked} as embedded")
         
         return results
     
-    async def search_similar(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    async def delete_article_chunks(self, article_id: int) -> bool:
+        chunk_ids = await vector_repository.delete_chunks(article_id)
+        if chunk_ids is None:
+            return False
+        if settings.vector_index_enabled and chunk_ids:
+            # the index of this process drops them now, the API processes on their next refresh
+            if self.index is not None:
+                await asyncio.to_thread(self.index.remove, chunk_ids)
+            await self._publish_tombstones(chunk_ids)
+        return True
+
+    async def _publish_tombstones(self, chunk_ids: List[int]) -> None:
         try:
-            query_embedding = await self.embeddings.aembed_query(query)
+            now = time.time()
+            redis = await get_redis()
+            await redis.zadd(TOMBSTONES_KEY, {str(chunk_id): now for chunk_id in chunk_ids})
+            await redis.zremrangebyscore(TOMBSTONES_KEY, 0, now - settings.vector_index_tombstone_retention_seconds)
+        except Exception as e:
+            logger.error(f"[VectorService] Error publishing {len(chunk_ids)} deleted chunks: {e}")
 
-            results = vector_repository.search_similar(
-                query_embedding=query_embedding,
-                match_threshold=settings.embedding_match_threshold,
-                match_count=limit
+    async def _apply_tombstones(self) -> int:
+        """Drop chunks deleted by any process since the last refresh."""
+        try:
+            redis = await get_redis()
+            entries = await redis.zrangebyscore(
+                TOMBSTONES_KEY, self._tombstone_cursor - TOMBSTONE_LOOKBACK_SECONDS, "+inf", withscores=True
             )
+        except Exception as e:
+            # retried on the next refresh; new chunks are still loaded meanwhile
+            logger.error(f"[VectorService] Error reading deleted chunks: {e}")
+            return 0
+        if not entries:
+            return 0
+        removed = await asyncio.to_thread(self.index.remove, [int(chunk_id) for chunk_id, _ in entries])
+        self._tombstone_cursor = max(score for _, score in entries)
+        return removed
+
+    async def check_embedding_dimensions(self) -> None:
+        """
+        Fail startup when the stored embeddings are not EMBEDDING_DIMENSIONS wide: every insert and
+        search would otherwise fail on the width mismatch (after a dimension change, the migration in
+        db/document_chunk.sql has to run first). Only a confirmed mismatch fails; an empty table or
+        a failed lookup does not.
+        """
+        expected = settings.embedding_dimensions or DEFAULT_EMBEDDING_DIMENSIONS.get(settings.embedding_model)
+        if expected is None:
+            return
+        stored = await vector_repository.get_stored_dimensions()
+        if stored is not None and stored != expected:
+            raise RuntimeError(
+                f"document_chunks.embedding holds {stored}-dimensional vectors but {settings.embedding_model} is "
+                f"configured for {expected} (EMBEDDING_DIMENSIONS); migrate the column first, see db/document_chunk.sql"
+            )
+
+    def start_index(self) -> None:
+        if self.index is not None and self._index_task is None:
+            self._index_task = asyncio.create_task(self._maintain_index())
+
+    async def stop_index(self) -> None:
+        if self._index_task is not None:
+            self._index_task.cancel()
+            self._index_task = None
 
-            return results
+    async def _load_new_chunks(self) -> int:
+        """Load chunks stored since the last load, in id order, into the index."""
+        loaded = 0
+        # re-read a window before the cursor: ids of concurrent inserts can become visible out of order
+        after_id = max(0, self._index_cursor - settings.vector_index_page_size)
+        while True:
+            rows = await vector_repository.get_chunks_after(after_id, settings.vector_index_page_size)
+            if rows:
+                vectors = np.array([
+                    json.loads(row["embedding"]) if isinstance(row["embedding"], str) else row["embedding"]
+                    for row in rows
+                ], dtype=np.float32)
+                loaded += await asyncio.to_thread(
+                    self.index.add,
+                    [row["id"] for row in rows],
+                    vectors,
+                    [row["content"] for row in rows],
+                    [row["metadata"] for row in rows],
+                )
+                after_id = rows[-1]["id"]
+                self._index_cursor = max(self._index_cursor, after_id)
+            if len(rows) < settings.vector_index_page_size:
+                return loaded
+
+    async def _maybe_build_ivf(self) -> None:
+        # (re)partition once the index is large enough, and again whenever it has doubled
+        size = len(self.index)
+        if size < settings.vector_index_ivf_min_size or size < 2 * self._index_ivf_size:
+            return
+        nlist = settings.vector_index_nlist or int(math.sqrt(size))
+        await asyncio.to_thread(self.index.build_ivf, nlist)
+        self._index_ivf_size = size
+
+    async def _maintain_index(self) -> None:
+        while True:
+            try:
+                # tombstones first: a chunk deleted before it was loaded is no longer in the database
+                removed = await self._apply_tombstones()
+                loaded = await self._load_new_chunks()
+                if self.index.dead_fraction > settings.vector_index_compact_dead_fraction:
+                    await asyncio.to_thread(self.index.compact)
+                await self._maybe_build_ivf()
+                if not self._index_ready:
+                    self._index_ready = True
+                    logger.info(f"[VectorService] In-process vector index ready with {len(self.index)} chunks")
+                elif loaded or removed:
+                    logger.debug(f"[VectorService] Added {loaded} and removed {removed} chunks in the vector index")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[VectorService] Error refreshing the vector index: {e}")
+
+            try:
+                await asyncio.wait_for(self._index_refresh.wait(), timeout=settings.vector_index_refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._index_refresh.clear()
+
+    @monitor_news_ingestor(step_name="Lexeme-Backfill")
+    async def backfill_lexemes(self) -> int:
+        """Tokenize chunks stored before hybrid search was enabled, a page at a time."""
+        updated = 0
+        while not lease_lost():
+            rows = await vector_repository.get_chunks_without_lexemes(settings.hybrid_backfill_page_size)
+            if not rows:
+                break
+            lexemes = {row["id"]: lexical_tokenizer.tokenize(row["content"] or "") for row in rows}
+            page_updated = await vector_repository.update_lexemes(lexemes)
+            if not page_updated:
+                # nothing on the page could be written: stop instead of re-reading it forever
+                break
+            updated += page_updated
+        if updated:
+            logger.bind(type="news_ingestor", step="Lexeme-Backfill").info(f"Tokenized {updated} stored chunks")
+        return updated
+
+    async def _search_vector(self, query: str, limit: int, threshold: float) -> List[Dict[str, Any]]:
+        query_embedding = await self.limiter.call(self.embeddings.aembed_query, query)
+
+        if self._index_ready:
+            try:
+                return await asyncio.to_thread(self.index.search, query_embedding, limit, threshold)
+            except Exception as e:
+                logger.error(f"[VectorService] In-process search failed, using the database: {e}")
+
+        return await vector_repository.search_similar(
+            query_embedding=query_embedding,
+            match_threshold=threshold,
+            match_count=limit
+        )
+
+    def _fuse(self, rankings: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+        """
+        Reciprocal rank fusion: a chunk scores sum(1 / (k + rank)) over the rankings it appears in,
+        so agreement between rankings beats a high position in one, and raw scores never need calibrating.
+        """
+        scores: Dict[int, float] = {}
+        rows: Dict[int, Dict[str, Any]] = {}
+        for ranking in rankings:
+            for rank, row in enumerate(ranking, start=1):
+                scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (settings.hybrid_rrf_k + rank)
+                # a chunk found by both keeps its vector similarity and its lexical rank
+                rows[row["id"]] = {**row, **rows.get(row["id"], {})}
+        ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+        # one shape for every row: similarity is None for lexical-only matches, rank for vector-only ones
+        return [
+            {
+                "id": chunk_id,
+                "content": rows[chunk_id]["content"],
+                "metadata": rows[chunk_id]["metadata"],
+                "similarity": rows[chunk_id].get("similarity"),
+                "rank": rows[chunk_id].get("rank"),
+                "score": scores[chunk_id],
+            }
+            for chunk_id in ranked
+        ]
+
+    async def search_similar(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        try:
+            if not settings.hybrid_search_enabled:
+                return await self._search_vector(query, limit, settings.embedding_match_threshold)
+
+            # exact identifiers (library names, CVE ids, usernames) are found by the lexical ranking
+            # even when their embedding similarity is below the threshold
+            candidates = max(limit, settings.hybrid_candidates)
+            vector_results, lexical_results = await asyncio.gather(
+                self._search_vector(query, candidates, settings.hybrid_vector_threshold),
+                vector_repository.search_lexical(lexical_tokenizer.tokenize(query), candidates),
+            )
+            return self._fuse([vector_results, lexical_results], limit)
 
         except Exception as e:
             logger.error(f"[VectorService] Search error: {e}")
@@ -0,0 +1,121 @@
+import asyncio
+import signal
+from typing import Any, Dict
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.job_queue import story_job_queue
+from app.core.news_ingestor import news_ingestor
+from app.core.scheduler import start_scheduler, stop_scheduler
+from app.core.http_clients import init_http_clients, close_http_clients
+from app.db.supabase import init_supabase, close_db_executor
+from app.db.redis import init_redis, close_redis
+from app.repositories.article_repository import article_repository
+from app.repositories.pipeline_state_repository import pipeline_state_repository
+from app.services.vector_service import vector_service
+
+worker_logger = logger.bind(type="news_ingestor", step="Ingestion-Worker")
+
+async def _keep_lease(job_id: str) -> None:
+    # heartbeat: extend the lease well before it expires while the story is still being processed
+    while True:
+        await asyncio.sleep(settings.job_queue_lease_seconds / 3)
+        await story_job_queue.extend_lease(job_id)
+
+async def _settle(job_id: str, success: bool, error: str = "") -> None:
+    # a Redis error here must not kill the consumer: the lease expires and the job is requeued
+    try:
+        if success:
+            await story_job_queue.ack(job_id)
+        else:
+            await story_job_queue.nack(job_id, error=error)
+    except Exception as e:
+        logger.error(f"[Worker] Error {'acking' if success else 'nacking'} job {job_id}, leaving it to its lease: {e}")
+
+async def _handle_job(job_id: str, payload: Dict[str, Any], attempt: int) -> None:
+    ctx = await pipeline_state_repository.load(payload["hn_id"])
+    if ctx is None:
+        # checkpoint already removed (story finished) or expired
+        await _settle(job_id, True)
+        return
+
+    heartbeat = asyncio.create_task(_keep_lease(job_id))
+    try:
+        success = await news_ingestor.process_story(ctx)
+    except Exception as e:
+        logger.error(f"[Worker] Job {job_id} (attempt {attempt}) crashed: {e}")
+        success = False
+    finally:
+        heartbeat.cancel()
+
+    await _settle(job_id, success, error=f"story {payload['hn_id']} did not complete")
+
+async def _consume(stop_event: asyncio.Event) -> None:
+    while not stop_event.is_set():
+        try:
+            job = await story_job_queue.lease()
+        except Exception as e:
+            logger.error(f"[Worker] Error leasing job: {e}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=settings.job_queue_poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        await _handle_job(*job)
+
+async def _reap_expired_leases(stop_event: asyncio.Event) -> None:
+    while not stop_event.is_set():
+        try:
+            await story_job_queue.requeue_expired()
+        except Exception as e:
+            logger.error(f"[Worker] Error requeueing expired jobs: {e}")
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=settings.job_queue_lease_seconds / 2)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_worker() -> None:
+    """
+    Ingestion worker process:
+    - runs the scheduled producer (fetch HN -> enqueue story jobs) and the embedding backfill
+    - consumes story jobs with `ingestion_worker_concurrency` concurrent consumers
+    - requeues jobs whose lease expired (crashed or stuck workers)
+    """
+    init_supabase()
+    init_redis()
+    init_http_clients()
+    await vector_service.check_embedding_dimensions()
+    await article_repository.warm_hn_id_index()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows: fall back to KeyboardInterrupt
+            pass
+
+    await start_scheduler(worker=True)
+    worker_logger.info(f"Worker started with {settings.ingestion_worker_concurrency} consumers.")
+
+    try:
+        await asyncio.gather(
+            _reap_expired_leases(stop_event),
+            *(_consume(stop_event) for _ in range(settings.ingestion_worker_concurrency)),
+        )
+    finally:
+        await stop_scheduler()
+        await close_http_clients()
+        await close_redis()
+        close_db_executor()
+        worker_logger.info("Worker stopped.")
+
+def main():
+    asyncio.run(run_worker())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Recall cost of the compact embedding storage options (EMBEDDING_STORAGE=halfvec, shortened
+EMBEDDING_DIMENSIONS), measured on a fixed, seeded local vector set (no embedding model or database).
+
+    uv run python -m benchmarks.embedding_precision --size 100000 --dims 1536
+
+Ground truth is the exact float32 top-k at full width. Each variant stores the corpus the way the
+app does (prefix truncation then re-normalization, then the float16 cast of halfvec) and is
+searched exhaustively, so the numbers isolate the storage loss from any ANN index.
+
+text-embedding-3 vectors are trained so the leading dimensions carry most of the signal
+(that is what makes shortening work); the synthetic corpus imitates this with per-dimension
+scales decaying as 1/sqrt(1 + d / --decay). --decay 0 makes all dimensions equally important,
+the worst case for shortening.
+"""
+import argparse
+from typing import List, Tuple
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_vectors(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray]:
+    """(corpus, queries), float32, unit length; queries are noisy copies of topic centers."""
+    rng = np.random.default_rng(args.seed)
+    scales = np.ones(args.dims, dtype=np.float32)
+    if args.decay:
+        scales = (1.0 / np.sqrt(1.0 + np.arange(args.dims) / args.decay)).astype(np.float32)
+    centers = rng.standard_normal((args.clusters, args.dims)).astype(np.float32)
+
+    def sample(count: int) -> np.ndarray:
+        labels = rng.integers(args.clusters, size=count)
+        noise = args.noise * rng.standard_normal((count, args.dims)).astype(np.float32)
+        return normalize((centers[labels] + noise) * scales)
+
+    return sample(args.size), sample(args.queries)
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, limit: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+
+
+def stored(vectors: np.ndarray, dims: int, half: bool) -> np.ndarray:
+    # what the app stores and queries with: the model's shortened output is the re-normalized prefix
+    shortened = normalize(vectors[:, :dims])
+    return shortened.astype(np.float16) if half else shortened
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return sum(len(set(f) & set(t)) for f, t in zip(found.tolist(), truth.tolist())) / truth.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--reduced", default="1024,512,256", help="shortened widths to compare")
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.8)
+    parser.add_argument("--decay", type=float, default=64.0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus, queries = make_vectors(args)
+    truth = top_k(corpus, queries, args.limit)
+    print(f"{args.size} x {args.dims} corpus, {args.queries} queries, recall@{args.limit} vs exact float32 at full width\n")
+    print(f"{'storage':<18} {'bytes/vector':>12} {'recall@' + str(args.limit):>10}")
+
+    widths: List[int] = [args.dims] + [int(width) for width in args.reduced.split(",")]
+    for dims in widths:
+        for half in (False, True):
+            # scored in float32, as pgvector does for both types
+            stored_corpus = stored(corpus, dims, half).astype(np.float32)
+            stored_queries = stored(queries, dims, half).astype(np.float32)
+            found = top_k(stored_corpus, stored_queries, args.limit)
+            name = f"{'halfvec' if half else 'vector'}({dims})"
+            print(f"{name:<18} {dims * (2 if half else 4):12d} {recall(found, truth):10.3f}")
+
+
+if __name__ == "__main__":
+    main()
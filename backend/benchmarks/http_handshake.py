@@ -0,0 +1,157 @@
+"""
+Cost of connection setup (TCP + TLS handshakes) with and without the shared keep-alive pools of
+app.core.http_clients, against a local HTTPS stand-in for Jina / the LLM endpoints.
+
+    uv run python -m benchmarks.http_handshake --requests 500 --concurrency 20
+
+The stand-in answers immediately with a small JSON body, so the difference between the modes is
+the per-request client and connection setup. Each mode reports the connections the server saw.
+Needs the usual .env (the app settings are loaded on import).
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import ssl
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Set, Tuple
+
+import aiohttp
+import httpx
+from aiohttp import web
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.core.config import settings
+
+
+def self_signed_cert(directory: Path) -> Tuple[Path, Path]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+    ))
+    return cert_path, key_path
+
+
+async def start_server(cert_path: Path, key_path: Path, connections: Set[Tuple[str, int]]) -> Tuple[web.AppRunner, str]:
+    async def handle(request: web.Request) -> web.Response:
+        # one client (host, port) per TCP connection
+        connections.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"data": {"content": "ok"}})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    server_ssl = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_ssl.load_cert_chain(cert_path, key_path)
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=server_ssl)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"https://127.0.0.1:{port}/"
+
+
+async def run_mode(
+    request: Callable[[int], Awaitable[None]], total: int, concurrency: int
+) -> Tuple[float, float, float]:
+    """(requests/s, p50 ms, p95 ms) for `total` requests, `concurrency` at a time."""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await request(index)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return total / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = self_signed_cert(Path(directory))
+        connections: Set[Tuple[str, int]] = set()
+        runner, base_url = await start_server(cert_path, key_path, connections)
+        client_ssl = ssl.create_default_context(cafile=str(cert_path))
+
+        # same limits as app.core.http_clients
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        )
+        shared_httpx = httpx.AsyncClient(verify=client_ssl, limits=limits)
+        shared_aiohttp = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            limit=settings.http_max_connections,
+            limit_per_host=settings.http_max_connections_per_host,
+            keepalive_timeout=settings.http_keepalive_expiry_seconds,
+            ssl=client_ssl,
+        ))
+
+        async def httpx_per_request(index: int) -> None:
+            async with httpx.AsyncClient(verify=client_ssl) as client:
+                (await client.get(f"{base_url}{index}")).raise_for_status()
+
+        async def httpx_pooled(index: int) -> None:
+            (await shared_httpx.get(f"{base_url}{index}")).raise_for_status()
+
+        async def aiohttp_per_request(index: int) -> None:
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=client_ssl)) as session:
+                async with session.get(f"{base_url}{index}") as response:
+                    await response.read()
+
+        async def aiohttp_pooled(index: int) -> None:
+            async with shared_aiohttp.get(f"{base_url}{index}") as response:
+                await response.read()
+
+        modes = [
+            ("httpx, client per request", httpx_per_request),
+            ("httpx, shared pool", httpx_pooled),
+            ("aiohttp, session per request", aiohttp_per_request),
+            ("aiohttp, shared pool", aiohttp_pooled),
+        ]
+        print(f"{args.requests} GETs, {args.concurrency} concurrent, TLS to {base_url}\n")
+        print(f"{'mode':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'connections':>12}")
+        try:
+            for name, request in modes:
+                await request(-1)  # warm-up (imports, first pool connection)
+                connections.clear()
+                rate, p50, p95 = await run_mode(request, args.requests, args.concurrency)
+                print(f"{name:<30} {rate:8.0f} {p50:8.2f} {p95:8.2f} {len(connections):12d}")
+        finally:
+            await shared_httpx.aclose()
+            await shared_aiohttp.close()
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Hit rate and latency of vector-only, lexical-only and hybrid (RRF-fused) retrieval on a seeded local
+corpus of mixed English / Chinese chunks (no database or embedding API needed).
+
+    uv run python -m benchmarks.hybrid_search --docs 20000
+
+The corpus imitates the two query kinds hybrid search is for:
+- paraphrase queries: words of the chunk's topic that the chunks themselves never use (synonyms,
+  the other language) plus a filler word; any chunk of the topic is a hit
+- identifier queries: an exact identifier (package version, CVE id, username) that occurs in a
+  single chunk, phrased around a vague topic; only that chunk is a hit
+
+Chunk "embeddings" are topic centers plus noise (an identifier query only gets its topic's
+direction, with more noise). The vector side is the app's VectorIndex, the tokens come from the
+app's lexical_tokenizer, and fusion is VectorService._fuse. The lexical ranking is an in-process
+stand-in for match_documents_lexical (OR of the query lexemes, ranked like ts_rank normalization 1),
+so its latency here is not the database's. Needs the usual .env (the app settings are loaded on import).
+"""
+import argparse
+import math
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.lexical_tokenizer import lexical_tokenizer
+from app.services.vector_index import VectorIndex
+from app.services.vector_service import vector_service
+
+LETTERS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiou"
+
+
+def english_word(rng: np.random.Generator) -> str:
+    return "".join(rng.choice(list(LETTERS)) + rng.choice(list(VOWELS)) for _ in range(int(rng.integers(2, 4))))
+
+
+def chinese_word(rng: np.random.Generator) -> str:
+    return "".join(chr(int(code)) for code in rng.integers(0x4E00, 0x9FA5, size=2))
+
+
+def identifier(rng: np.random.Generator, index: int) -> str:
+    kind = index % 3
+    if kind == 0:
+        return f"lib{english_word(rng)}-{rng.integers(1, 9)}.{rng.integers(0, 20)}.{rng.integers(0, 20)}"
+    if kind == 1:
+        return f"CVE-20{rng.integers(15, 26)}-{index:05d}"
+    return f"@{english_word(rng)}_{index}"
+
+
+class Corpus:
+    def __init__(self, args: argparse.Namespace):
+        rng = np.random.default_rng(args.seed)
+        self.common = [english_word(rng) for _ in range(400)] + [chinese_word(rng) for _ in range(400)]
+        self.topic_words, self.synonyms = [
+            [[english_word(rng) for _ in range(20)] + [chinese_word(rng) for _ in range(20)] for _ in range(args.topics)]
+            for _ in range(2)
+        ]
+        self.centers = rng.standard_normal((args.topics, args.dims)).astype(np.float32)
+        self.doc_topics = rng.integers(args.topics, size=args.docs)
+        self.identifiers: Dict[int, str] = {}
+        self.texts: List[str] = []
+        for doc in range(args.docs):
+            words = list(rng.choice(self.topic_words[self.doc_topics[doc]], size=25))
+            words += list(rng.choice(self.common, size=35))
+            if rng.random() < args.identifier_share:
+                self.identifiers[doc] = identifier(rng, doc)
+                words.insert(int(rng.integers(len(words))), self.identifiers[doc])
+            self.texts.append(" ".join(words))
+        noise = args.noise * rng.standard_normal((args.docs, args.dims)).astype(np.float32)
+        self.vectors = self.centers[self.doc_topics] + noise
+        self.rng = rng
+
+    def query_vector(self, topic: int, noise: float, dims: int) -> np.ndarray:
+        return self.centers[topic] + noise * self.rng.standard_normal(dims).astype(np.float32)
+
+
+class LexicalStandIn:
+    """Inverted index over the chunk lexemes; OR-match ranked by matched lexemes / (1 + ln(lexeme count))."""
+    def __init__(self, texts: List[str]):
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.norms: List[float] = []
+        for doc, text in enumerate(texts):
+            lexemes = lexical_tokenizer.tokenize(text)
+            self.norms.append(1.0 + math.log(max(len(lexemes), 1)))
+            for lexeme in lexemes:
+                self.postings[lexeme].append(doc)
+
+    def search(self, lexemes: List[str], limit: int) -> List[Dict]:
+        matched: Dict[int, int] = defaultdict(int)
+        for lexeme in lexemes:
+            for doc in self.postings.get(lexeme, ()):
+                matched[doc] += 1
+        ranked = sorted(matched, key=lambda doc: matched[doc] / self.norms[doc], reverse=True)[:limit]
+        return [{"id": doc + 1, "content": "", "metadata": {}, "rank": matched[doc] / self.norms[doc]} for doc in ranked]
+
+
+def make_queries(corpus: Corpus, args: argparse.Namespace) -> List[Tuple[str, str, np.ndarray, Set[int]]]:
+    """(kind, text, vector, relevant chunk ids)."""
+    rng = np.random.default_rng(args.seed + 1)
+    queries = []
+    for _ in range(args.queries):
+        topic = int(rng.integers(args.topics))
+        words = " ".join([*rng.choice(corpus.synonyms[topic], size=3), rng.choice(corpus.common)])
+        relevant = {int(doc) + 1 for doc in np.flatnonzero(corpus.doc_topics == topic)}
+        queries.append(("paraphrase", words, corpus.query_vector(topic, args.noise, args.dims), relevant))
+    docs = list(corpus.identifiers)
+    for doc in rng.choice(docs, size=min(args.queries, len(docs)), replace=False):
+        topic = int(corpus.doc_topics[doc])
+        text = f"{corpus.identifiers[doc]} {rng.choice(corpus.common)} {rng.choice(corpus.common)}"
+        queries.append(("identifier", text, corpus.query_vector(topic, 3 * args.noise, args.dims), {int(doc) + 1}))
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--noise", type=float, default=0.1, help="per-dimension noise around the topic center")
+    parser.add_argument("--identifier-share", type=float, default=0.3, help="share of chunks with an identifier")
+    parser.add_argument("--queries", type=int, default=300, help="per query kind")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    corpus = Corpus(args)
+    index = VectorIndex()
+    index.add(list(range(1, args.docs + 1)), corpus.vectors, [""] * args.docs, [{}] * args.docs)
+    lexical = LexicalStandIn(corpus.texts)
+    queries = make_queries(corpus, args)
+    print(f"{args.docs} chunks, {args.topics} topics, {len(corpus.identifiers)} identifiers; "
+          f"built in {time.perf_counter() - started:.1f}s\n")
+
+    candidates = max(args.limit, settings.hybrid_candidates)
+
+    def vector_only(text: str, vector: np.ndarray) -> List[Dict]:
+        return index.search(vector, args.limit, settings.embedding_match_threshold)
+
+    def lexical_only(text: str, vector: np.ndarray) -> List[Dict]:
+        return lexical.search(lexical_tokenizer.tokenize(text), args.limit)
+
+    def hybrid(text: str, vector: np.ndarray) -> List[Dict]:
+        return vector_service._fuse([
+            index.search(vector, candidates, settings.hybrid_vector_threshold),
+            lexical.search(lexical_tokenizer.tokenize(text), candidates),
+        ], args.limit)
+
+    modes: List[Tuple[str, Callable[[str, np.ndarray], List[Dict]]]] = [
+        ("vector", vector_only), ("lexical", lexical_only), ("hybrid", hybrid),
+    ]
+    print(f"{'mode':<9} {'para hit@' + str(args.limit):>13} {'ident hit@' + str(args.limit):>13} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, search in modes:
+        hits: Dict[str, List[float]] = defaultdict(list)
+        latencies: List[float] = []
+        for kind, text, vector, relevant in queries:
+            started = time.perf_counter()
+            results = search(text, vector)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found = [row["id"] for row in results]
+            if kind == "paraphrase":
+                # share of the top results that are on topic
+                hits[kind].append(sum(chunk_id in relevant for chunk_id in found) / args.limit)
+            else:
+                hits[kind].append(float(bool(relevant & set(found))))
+        latencies.sort()
+        print(f"{name:<9} {np.mean(hits['paraphrase']):13.3f} {np.mean(hits['identifier']):13.3f} "
+              f"{latencies[len(latencies) // 2]:8.2f} {latencies[int(len(latencies) * 0.95)]:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Query latency and recall of the in-process VectorIndex against exact brute force, on a synthetic
+clustered corpus (no database or embedding API needed).
+
+    uv run python -m benchmarks.vector_index --size 1000000 --dims 512
+
+Vectors are regenerated block by block from the seed, so the float32 ground truth never has to be
+held in memory next to the index. Needs the usual .env (the app settings are loaded on import).
+"""
+import argparse
+import math
+import time
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from app.services.vector_index import BLOCK_ROWS, VectorIndex
+
+
+def corpus_blocks(size: int, dims: int, clusters: int, seed: int) -> Iterator[Tuple[int, np.ndarray]]:
+    # points scattered around `clusters` random topic centers, like chunks of related articles
+    centers = np.random.default_rng(seed).standard_normal((clusters, dims)).astype(np.float32)
+    for block, start in enumerate(range(0, size, BLOCK_ROWS)):
+        rng = np.random.default_rng(seed + 1 + block)
+        count = min(BLOCK_ROWS, size - start)
+        labels = rng.integers(clusters, size=count)
+        vectors = centers[labels] + 0.8 * rng.standard_normal((count, dims)).astype(np.float32)
+        yield start, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(count: int, dims: int, clusters: int, seed: int) -> np.ndarray:
+    centers = np.random.default_rng(seed).standard_normal((clusters, dims)).astype(np.float32)
+    rng = np.random.default_rng(seed - 1)
+    queries = centers[rng.integers(clusters, size=count)] + 0.8 * rng.standard_normal((count, dims)).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(args: argparse.Namespace, queries: np.ndarray) -> np.ndarray:
+    """Chunk ids (1-based row numbers) of the exact float32 top-k per query."""
+    best_scores = np.full((len(queries), args.limit), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), args.limit), dtype=np.int64)
+    for start, vectors in corpus_blocks(args.size, args.dims, args.clusters, args.seed):
+        scores = queries @ vectors.T
+        ids = np.broadcast_to(np.arange(start + 1, start + 1 + len(vectors)), scores.shape)
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_ids = np.concatenate([best_ids, ids], axis=1)
+        top = np.argpartition(-merged_scores, args.limit - 1, axis=1)[:, :args.limit]
+        best_scores = np.take_along_axis(merged_scores, top, axis=1)
+        best_ids = np.take_along_axis(merged_ids, top, axis=1)
+    return best_ids
+
+
+def measure(index: VectorIndex, queries: np.ndarray, truth: np.ndarray, limit: int) -> Tuple[float, float, float]:
+    """(p50 ms, p95 ms, recall@limit) over the queries."""
+    latencies: List[float] = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        results = index.search(query, limit, -1.0)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len({row["id"] for row in results} & set(expected.tolist()))
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)], hits / truth.size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--dims", type=int, default=512)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--flat-queries", type=int, default=20, help="queries for the (slow) exhaustive scan")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0, help="0: sqrt(size)")
+    parser.add_argument("--nprobe", default="8,16,32,64")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    index = VectorIndex(quantize=not args.no_quantize)
+    started = time.perf_counter()
+    no_metadata: dict = {}
+    for start, vectors in corpus_blocks(args.size, args.dims, args.clusters, args.seed):
+        ids = list(range(start + 1, start + 1 + len(vectors)))
+        index.add(ids, vectors, [""] * len(ids), [no_metadata] * len(ids))
+    print(f"loaded {len(index)} x {args.dims} vectors ({'float32' if args.no_quantize else 'int8'}, "
+          f"{index._vectors[:index.size].nbytes / 2**20:.0f} MiB) in {time.perf_counter() - started:.1f}s")
+
+    queries = make_queries(args.queries, args.dims, args.clusters, args.seed)
+    started = time.perf_counter()
+    truth = exact_top_k(args, queries)
+    print(f"exact float32 top-{args.limit} for {args.queries} queries in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"{'mode':<22} {'p50 ms':>8} {'p95 ms':>8} {'recall@' + str(args.limit):>10}")
+    p50, p95, recall = measure(index, queries[:args.flat_queries], truth[:args.flat_queries], args.limit)
+    print(f"{'exhaustive scan':<22} {p50:8.1f} {p95:8.1f} {recall:10.3f}")
+
+    nlist = args.nlist or int(math.sqrt(len(index)))
+    started = time.perf_counter()
+    index.build_ivf(nlist)
+    print(f"{'(IVF build, nlist=' + str(nlist) + ')':<22} {(time.perf_counter() - started) * 1000:8.0f}")
+    for nprobe in (int(value) for value in args.nprobe.split(",")):
+        index.nprobe = nprobe
+        p50, p95, recall = measure(index, queries, truth, args.limit)
+        print(f"{'IVF nprobe=' + str(nprobe):<22} {p50:8.1f} {p95:8.1f} {recall:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
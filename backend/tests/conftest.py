@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+# required settings for importing the app without a .env; tests never reach these services
+TEST_ENV = {
+    "LOG_LEVEL": "WARNING",
+    "SCHEDULER_NEWS_INGESTOR_INTERVAL_HOURS": "1",
+    "SCHEDULER_BACK_FILL_EMBEDDING_INTERVAL_MINUTES": "30",
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_API_KEY": "test",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "REDIS_CACHE_EXPIRE_SECONDS": "3600",
+    "HN_POLL_INTERVAL_SECONDS": "1800",
+    "HN_STORY_LIMIT": "3",
+    "HN_FETCH_CONCURRENT_LIMIT": "20",
+    "OPENAI_API_KEY": "test",
+    "OPENAI_EMBEDDING_CONCURRENT_LIMIT": "10",
+    "EMBEDDING_MATCH_THRESHOLD": "0.5",
+    "GEMINI_BASE_URL": "http://localhost:9/v1",
+    "GEMINI_API_KEY": "test",
+    "GEMINI_MODEL": "gemini-test",
+    "GEMINI_TEMPERATURE": "0.2",
+    "GEMINI_CONCURRENT_LIMIT": "10",
+    "DEEPSEEK_BASE_URL": "http://localhost:9/v1",
+    "DEEPSEEK_API_KEY": "test",
+    "DEEPSEEK_MODEL": "deepseek-test",
+    "DEEPSEEK_TEMPERATURE": "1.3",
+    "DEEPSEEK_CONCURRENT_LIMIT": "10",
+    "JINA_READER_BASE": "http://localhost:9/",
+    "JINA_API_KEY": "test",
+    "JINA_FETCH_CONCURRENT_LIMIT": "10",
+    "CACHE_DIR": os.path.join(tempfile.gettempdir(), "hn-chinese-test-cache"),
+}
+
+for key, value in TEST_ENV.items():
+    os.environ.setdefault(key, value)
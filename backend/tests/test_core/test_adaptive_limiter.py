@@ -0,0 +1,41 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core import adaptive_limiter as limiter_module
+from app.core.adaptive_limiter import AdaptiveLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake monotonic clock that sleeping advances."""
+    now = [0.0]
+
+    async def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(limiter_module, "time", SimpleNamespace(monotonic=lambda: now[0], time=lambda: now[0]))
+    monkeypatch.setattr(limiter_module.asyncio, "sleep", sleep)
+    # keep the test limiter out of the metrics registry
+    monkeypatch.setattr(limiter_module, "limiters", {})
+    return now
+
+
+@pytest.mark.parametrize("retry_budget, attempts", [(None, 4), (25.0, 3)])
+def test_retries_stop_when_the_budget_runs_out(clock, monkeypatch, retry_budget, attempts):
+    limiter = AdaptiveLimiter("test", 2, adaptive=True, retry_budget=retry_budget)
+    limiter.max_retries = 3
+    monkeypatch.setattr(limiter, "_backoff_delay", lambda attempt, retry_after: 1.0)
+    calls = []
+
+    async def timing_out():
+        calls.append(clock[0])
+        clock[0] += 10.0  # the per-attempt timeout
+        raise httpx.ReadTimeout("slow page")
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(limiter.call(timing_out))
+    # with the budget, attempts start at 0s, 11s and 22s; the next one would start at 33s
+    assert len(calls) == attempts
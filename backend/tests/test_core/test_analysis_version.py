@@ -0,0 +1,31 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services.translate_service import translate_service
+
+ANSWER = json.dumps({
+    "topic": "t", "title_cn": "t", "summary": "s", "key_points": ["a", "b", "c"],
+    "tech_stack": [], "takeaway": "t", "ai_score": 50,
+})
+
+
+def test_version_names_the_model_that_answered(monkeypatch):
+    answering = SimpleNamespace(name="backup", model="backup-model")
+
+    async def complete(messages, **kwargs):
+        return answering, SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ANSWER))])
+
+    monkeypatch.setattr(translate_service, "cache", None)
+    monkeypatch.setattr(translate_service.router, "complete", complete)
+
+    result, version = asyncio.run(translate_service.translate_and_summarize("title", "text"))
+    assert result.summary == "s"
+    assert version == f"{translate_service.prompt_version}:backup-model"
+
+
+def test_current_versions_cover_each_configured_model():
+    models = {provider.model for provider in translate_service.router.providers}
+    assert translate_service.analysis_versions == sorted(
+        f"{translate_service.prompt_version}:{model}" for model in models
+    )
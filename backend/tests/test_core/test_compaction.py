@@ -0,0 +1,80 @@
+from app.services.compaction_service import CompactionService
+
+CODE = """```python
+def login(user):
+    if user:
+        return 1
+    if user:
+        return 1
+    # subscribe the user
+    return 0
+```"""
+
+
+def test_prose_and_code_are_kept():
+    markdown = "\n".join([
+        "Title: Login flows",
+        "URL Source: https://example.com/post",
+        "",
+        "Some intro text about login flows.",
+        "Cookies are set after sign in, so the session survives a restart.",
+        "",
+        CODE,
+        "",
+        "- first level",
+        "  - nested item",
+        "",
+        "    indented_code()",
+        "    indented_code()",
+    ])
+    cleaned = CompactionService().strip_boilerplate(markdown)
+
+    assert cleaned == "\n".join([
+        "Some intro text about login flows.",
+        "Cookies are set after sign in, so the session survives a restart.",
+        "",
+        CODE,
+        "",
+        "- first level",
+        "  - nested item",
+        "",
+        "    indented_code()",
+        "    indented_code()",
+    ])
+
+
+def test_nav_and_footer_runs_are_dropped():
+    markdown = "\n".join([
+        "[Home](/) | [Blog](/blog)",
+        "Products",
+        "Pricing",
+        "Sign in",
+        "",
+        "# Article",
+        "",
+        "The article text, which mentions a newsletter in passing.",
+        "",
+        "Products",
+        "Pricing",
+        "Subscribe to our newsletter",
+        "© 2024 Example. All rights reserved",
+    ])
+    cleaned = CompactionService().strip_boilerplate(markdown)
+
+    # the footer menu repeats the header's, the phrases are page chrome
+    assert cleaned == "\n".join([
+        "Products",
+        "Pricing",
+        "",
+        "# Article",
+        "",
+        "The article text, which mentions a newsletter in passing.",
+    ])
+
+
+def test_comments_in_code_are_not_sections():
+    service = CompactionService()
+    text = "# Intro\n\nText.\n\n" + CODE
+
+    assert service._split_sections(text) == [("# Intro", "Text.\n\n" + CODE)]
+    assert service.split_chunks(text, 1000)[0].endswith(CODE)
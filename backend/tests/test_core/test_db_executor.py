@@ -0,0 +1,98 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+from app.core.config import settings
+from app.db import supabase as supabase_module
+from app.models.article import Article
+from app.repositories import article_repository as article_repository_module
+from app.repositories.article_repository import article_repository
+
+QUERY_SECONDS = 0.05
+
+
+class SlowQuery:
+    """A PostgREST builder whose execute() blocks like a real round-trip."""
+    def __init__(self, rows: List[Any]):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(QUERY_SECONDS)
+        return SimpleNamespace(data=self.rows, count=None)
+
+
+class SlowSupabase:
+    def table(self, name):
+        return SlowQuery([])
+
+
+def make_article(hn_id: int) -> Article:
+    return Article(
+        hn_id=hn_id, type="story", posted_at=datetime.now(timezone.utc),
+        original_title="title", original_url=None, original_text=None, score=1,
+        kids=None, parent=None, poll=None, parts=None, descendants=None, deleted=None, dead=None,
+        raw_content="content", image_urls=None, detailed_analysis=None, comment_analysis=None,
+    )
+
+
+@pytest.fixture(autouse=True)
+def slow_database(monkeypatch):
+    monkeypatch.setattr(article_repository_module, "get_supabase", lambda: SlowSupabase())
+    monkeypatch.setattr(settings, "db_bulk_batch_size", 10)
+    yield
+    supabase_module.close_db_executor()
+
+
+def test_event_loop_stays_responsive_during_a_bulk_ingest():
+    async def run():
+        lags: List[float] = []
+        ingest_done = False
+
+        async def probe():
+            # how late a 5 ms sleep wakes up = how long something blocked the loop
+            while not ingest_done:
+                started = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append(time.perf_counter() - started - 0.005)
+
+        async def ingest():
+            nonlocal ingest_done
+            # 20 sequential bulk batches of blocking upserts
+            await article_repository.add_articles([make_article(hn_id) for hn_id in range(200)])
+            ingest_done = True
+
+        async def request():
+            # an API read arriving mid-ingest
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            await article_repository.get_article_by_id(1)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        _, _, request_seconds = await asyncio.gather(probe(), ingest(), request())
+        return lags, time.perf_counter() - started, request_seconds
+
+    lags, elapsed, request_seconds = asyncio.run(run())
+    assert elapsed >= 20 * QUERY_SECONDS
+    assert len(lags) > 50
+    # not queued behind the ingest's remaining round-trips
+    assert request_seconds < 3 * QUERY_SECONDS
+    # each blocking query alone would stall the loop for QUERY_SECONDS
+    assert max(lags) < QUERY_SECONDS / 2
+
+
+def test_executor_is_recreated_after_shutdown():
+    async def query():
+        return await supabase_module.execute_query(SlowQuery([1]))
+
+    assert asyncio.run(query()).data == [1]
+    supabase_module.close_db_executor()
+    # a restarted lifespan gets a new pool instead of a shut-down one
+    assert asyncio.run(query()).data == [1]
@@ -0,0 +1,28 @@
+import asyncio
+
+from app.services.extraction_service import ExtractionService
+
+
+def test_batch_fetches_each_page_once_by_normalized_url(monkeypatch):
+    service = ExtractionService()
+    fetched = []
+
+    async def extract_url(url):
+        fetched.append(url)
+        return f"content of {url}"
+
+    monkeypatch.setattr(service, "extract_url", extract_url)
+    urls = [
+        "https://example.com/post?utm_source=hn",
+        "https://Example.com/post/",
+        "https://example.com/other",
+    ]
+    contents = asyncio.run(service.extract_batch(urls))
+
+    assert fetched == ["https://example.com/post?utm_source=hn", "https://example.com/other"]
+    # every requested URL is answered, reposts with the content of the first one
+    assert contents == {
+        urls[0]: "content of https://example.com/post?utm_source=hn",
+        urls[1]: "content of https://example.com/post?utm_source=hn",
+        urls[2]: "content of https://example.com/other",
+    }
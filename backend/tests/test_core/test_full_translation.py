@@ -0,0 +1,115 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import pytest
+
+from app.core.config import settings
+from app.models.article import AITranslatedResult, Article
+from app.services import full_translation_service as translation_module
+from app.services.full_translation_service import FullTranslationService
+
+
+class FakeRedis:
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+
+    async def incr(self, key):
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def expire(self, key, seconds):
+        return True
+
+
+def make_article(translation=None) -> Article:
+    return Article(
+        id=1, hn_id=1, type="story", posted_at=datetime.now(timezone.utc),
+        original_title="title", original_url=None, original_text=None, score=1,
+        kids=None, parent=None, poll=None, parts=None, descendants=None, deleted=None, dead=None,
+        raw_content="some content", image_urls=None, comment_analysis=None,
+        detailed_analysis=AITranslatedResult(
+            topic="t", title_cn="t", summary="s", key_points=["a", "b", "c"], takeaway="t", ai_score=50,
+            url_content_trans=translation,
+        ),
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A FullTranslationService whose generation is faked; `state` records generations and stores."""
+    state = {"redis": FakeRedis(), "stored": None, "generated": 0, "updates": []}
+
+    async def get_redis():
+        return state["redis"]
+
+    async def get_article_by_id(article_id):
+        return make_article(state["stored"])
+
+    async def update_translation(article_id, translation):
+        state["updates"].append(translation)
+        return True
+
+    async def translate_streaming(content, generation):
+        state["generated"] += 1
+        state["input"] = content
+        await generation.append("translated")
+
+    monkeypatch.setattr(translation_module, "get_redis", get_redis)
+    monkeypatch.setattr(translation_module, "single_flight", lambda name: lambda func: func)
+    monkeypatch.setattr(translation_module.article_repository, "get_article_by_id", get_article_by_id)
+    monkeypatch.setattr(translation_module.article_repository, "update_translation", update_translation)
+    monkeypatch.setattr(settings, "full_translation_sectioned_enabled", False)
+    monkeypatch.setattr(settings, "full_translation_starts_per_client_per_hour", 2)
+    monkeypatch.setattr(settings, "full_translation_starts_per_hour", 3)
+    service = FullTranslationService()
+    monkeypatch.setattr(service, "_translate_streaming", translate_streaming)
+    return service, state
+
+
+def read(service: FullTranslationService, article: Article, client: str) -> List[str]:
+    async def run():
+        return [event async for event in service.stream(article, client)]
+    return asyncio.run(run())
+
+
+def test_generates_and_stores_only_the_translation(service):
+    service, state = service
+    events = read(service, make_article(), "10.0.0.1")
+
+    assert events == ["data: translated\n\n", "event: stop\ndata: [DONE]\n\n"]
+    assert state["updates"] == ["translated"]
+
+
+def test_skips_generation_when_stored_inside_the_lock(service):
+    service, state = service
+    # stored by another process after this request read the article
+    state["stored"] = "already there"
+    events = read(service, make_article(), "10.0.0.1")
+
+    assert events[0] == "data: already there\n\n"
+    assert state["generated"] == 0 and state["updates"] == []
+
+
+def test_new_generations_are_rate_limited(service):
+    service, state = service
+    # per client first, then in total
+    assert [read(service, make_article(), "10.0.0.1")[0].startswith("data:") for _ in range(3)] == [True, True, False]
+    assert read(service, make_article(), "10.0.0.2")[0].startswith("data:")
+    assert read(service, make_article(), "10.0.0.3")[0].startswith("event: error")
+    assert state["generated"] == 3
+
+    # a stored translation is served without counting
+    assert read(service, make_article("stored"), "10.0.0.1")[0] == "data: stored\n\n"
+
+
+def test_the_full_text_is_translated_unchanged(service, monkeypatch):
+    service, state = service
+    code = "```python\ndef login(user):\n    if user:\n        return 1\n    if user:\n        return 1\n```"
+    raw = f"Some intro text about login flows.\n\n{code}\n\nSubscribe to our newsletter"
+    article = make_article()
+    article.raw_content = raw
+    monkeypatch.setattr(settings, "full_translation_max_input_tokens", 10_000)
+    read(service, article, "10.0.0.1")
+
+    assert state["input"] == raw
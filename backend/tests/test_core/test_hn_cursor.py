@@ -0,0 +1,131 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+import pytest
+
+from app.services import hn_service as hn_module
+from app.services.hn_service import hn_service
+
+
+class FakeRedis:
+    def __init__(self, store: Dict[str, str]):
+        self.store = store
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.store.get(key)
+
+
+@pytest.fixture
+def hn(monkeypatch):
+    """hn_service against a fake HN API and cursor store; `state` controls and records both."""
+    state = {
+        "store": {hn_service.cursor_key: "100"},
+        "max_item": 200,
+        "new_ids": [],
+        "best_ids": [],
+        "failing_items": set(),
+        "unchecked": set(),
+        "saved": [],
+    }
+
+    async def get_redis():
+        return FakeRedis(state["store"])
+
+    async def fenced_set(key, value):
+        state["saved"].append(value)
+        state["store"][key] = str(value)
+        return True
+
+    async def get_json(session, url):
+        if url == hn_service.max_item_url:
+            return state["max_item"]
+        if url == hn_service.new_url:
+            return state["new_ids"]
+        if url == hn_service.best_url:
+            return state["best_ids"]
+        if url == hn_service.updates_url:
+            return {"items": []}
+        item_id = int(url.rsplit("/", 1)[1].split(".")[0])
+        if item_id in state["failing_items"]:
+            raise ConnectionError("connection reset")
+        return {"id": item_id, "type": "story", "title": f"story {item_id}", "time": 1700000000}
+
+    async def get_existing_hn_ids(hn_ids):
+        hn_ids = set(hn_ids)
+        return set(), hn_ids & state["unchecked"]
+
+    monkeypatch.setattr(hn_module, "get_redis", get_redis)
+    monkeypatch.setattr(hn_module, "fenced_set", fenced_set)
+    monkeypatch.setattr(hn_service, "_get_json", get_json)
+    monkeypatch.setattr(hn_service, "incremental", True)
+    monkeypatch.setattr(hn_service, "incremental_max_items", 100)
+    monkeypatch.setattr(hn_module.article_repository, "get_existing_hn_ids", get_existing_hn_ids)
+    return state
+
+
+def fetched_ids(advance_cursor: bool = True) -> Set[int]:
+    return {story.hn_id for story in asyncio.run(hn_service.fetch_all_stories(advance_cursor))}
+
+
+def test_cursor_advances_to_max_item(hn):
+    hn["new_ids"] = [150, 120, 90]
+
+    assert fetched_ids() == {150, 120}
+    assert hn["saved"] == [200]
+
+
+def test_cursor_held_below_failed_item_fetch(hn):
+    hn["new_ids"] = [150, 120, 110]
+    hn["failing_items"] = {120}
+
+    assert fetched_ids() == {150, 110}
+    assert hn["saved"] == [119]
+
+    # the next run retries 120 (and the rest is filtered as stored by the existence check)
+    hn["failing_items"] = set()
+    assert 120 in fetched_ids()
+    assert hn["saved"][-1] == 200
+
+
+def test_cursor_held_below_unchecked_ids(hn):
+    hn["new_ids"] = [150, 130]
+    hn["unchecked"] = {130}
+
+    assert fetched_ids() == {150}
+    assert hn["saved"] == [129]
+
+
+def test_cursor_kept_when_new_list_fails(hn):
+    hn["new_ids"] = None
+
+    assert fetched_ids() == set()
+    assert hn["saved"] == []
+
+
+def test_gap_above_cap_is_paged_oldest_first(hn, monkeypatch):
+    monkeypatch.setattr(hn_service, "incremental_max_items", 2)
+    hn["new_ids"] = [190, 170, 150, 130]
+
+    assert fetched_ids() == {130, 150}
+    assert hn["saved"] == [150]
+
+    assert fetched_ids() == {170, 190}
+    assert hn["saved"][-1] == 200
+
+
+def test_demo_fetch_leaves_the_cursor(hn):
+    hn["new_ids"] = [150, 120]
+
+    assert fetched_ids(advance_cursor=False) == {150, 120}
+    assert hn["saved"] == []
+    assert fetched_ids() == {150, 120}
+
+
+def test_first_cursor_not_held_back_by_old_failed_ids(hn):
+    del hn["store"][hn_service.cursor_key]
+    hn["new_ids"] = [190, 180]
+    hn["best_ids"] = [5, 180]
+    hn["failing_items"] = {5}
+
+    assert fetched_ids() == {190, 180}
+    assert hn["saved"] == [200]
@@ -0,0 +1,159 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from app import worker
+from app.core import job_queue as job_queue_module
+from app.core import news_ingestor as ingestor_module
+from app.core.config import settings
+from app.core.job_queue import _LEASE_SCRIPT, story_job_queue
+from app.core.news_ingestor import news_ingestor
+from app.repositories import pipeline_state_repository as state_module
+from app.schemas.external.hn import HNRaw
+from app.services.contexts.story_contexts import StoryContext, StoryStage
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: Dict[str, str] = {}
+        self.hashes: Dict[str, Dict[str, str]] = {}
+        self.lists: Dict[str, List[str]] = {}
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.sets: Dict[str, set] = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+    async def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(member) for member in members)
+
+    async def srem(self, key, *members):
+        self.sets.setdefault(key, set()).difference_update(str(member) for member in members)
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def hsetnx(self, key, field, value):
+        fields = self.hashes.setdefault(key, {})
+        if field in fields:
+            return False
+        fields[field] = value
+        return True
+
+    async def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    async def zadd(self, key, mapping, xx=False):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, member):
+        return self.zsets.get(key, {}).pop(member, None) is not None
+
+    async def eval(self, script, numkeys, pending_key, leases_key, deadline):
+        assert script == _LEASE_SCRIPT
+        pending = self.lists.get(pending_key, [])
+        if not pending:
+            return None
+        job_id = pending.pop()
+        await self.zadd(leases_key, {job_id: deadline})
+        return job_id
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(job_queue_module, "get_redis", get_redis)
+    monkeypatch.setattr(state_module, "get_redis", get_redis)
+    monkeypatch.setattr(settings, "job_queue_max_attempts", 2)
+    return fake
+
+
+def test_dead_lettered_story_is_not_enqueued_again(redis, monkeypatch):
+    story = HNRaw(id=42, type="story", title="story 42", time=1700000000)
+
+    async def fetch_all_stories():
+        return [story]
+
+    monkeypatch.setattr(ingestor_module.hn_service, "fetch_all_stories", fetch_all_stories)
+
+    async def run():
+        assert await news_ingestor.enqueue_new_stories() == 1
+        for _ in range(settings.job_queue_max_attempts):
+            job_id, payload, attempt = await story_job_queue.lease()
+            await story_job_queue.nack(job_id, error="translation failed")
+
+        assert len(redis.lists[story_job_queue.dead_key]) == 1
+        assert await state_module.pipeline_state_repository.load(42) is None
+        # HN still lists the story, but it stays dropped
+        assert await news_ingestor.enqueue_new_stories() == 0
+
+    asyncio.run(run())
+
+
+def test_redis_errors_when_settling_a_job_leave_it_to_its_lease(redis, monkeypatch):
+    async def failing(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    async def process_story(ctx):
+        return True
+
+    monkeypatch.setattr(story_job_queue, "ack", failing)
+    monkeypatch.setattr(worker.news_ingestor, "process_story", process_story)
+
+    async def run():
+        story = HNRaw(id=7, type="story", title="story 7", time=1700000000)
+        await state_module.pipeline_state_repository.save(StoryContext(story=story))
+        # does not raise, so the consumer keeps going
+        await worker._handle_job("7", {"hn_id": 7}, 1)
+
+    asyncio.run(run())
+
+
+def test_story_whose_translation_keeps_failing_is_abandoned(redis, monkeypatch):
+    story = HNRaw(id=9, type="story", title="story 9", time=1700000000)
+
+    async def translate_and_summarize(**kwargs):
+        return None
+
+    async def fetch_all_stories():
+        return [story]
+
+    monkeypatch.setattr(ingestor_module.translate_service, "translate_and_summarize", translate_and_summarize)
+    monkeypatch.setattr(ingestor_module.hn_service, "fetch_all_stories", fetch_all_stories)
+    monkeypatch.setattr(settings, "pipeline_max_translation_attempts", 2)
+    repository = state_module.pipeline_state_repository
+
+    async def run():
+        await repository.save(StoryContext(story=story, stage=StoryStage.EXTRACTED))
+
+        assert not await news_ingestor.process_story(await repository.load(9))
+        assert (await repository.load(9)).translation_attempts == 1
+
+        assert not await news_ingestor.process_story(await repository.load(9))
+        assert await repository.load(9) is None
+        assert await news_ingestor.enqueue_new_stories() == 0
+
+    asyncio.run(run())
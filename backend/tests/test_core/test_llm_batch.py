@@ -0,0 +1,88 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.services import llm_batch as batch_module
+from app.services.llm_batch import LLMBatchClient
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+class FakeBatchAPI:
+    """Files + Batches endpoints of one provider; a batch completes on its second retrieve."""
+    def __init__(self):
+        self.created = 0
+        self.retrieves = 0
+        self.requests = b""
+
+    async def create_file(self, file, purpose):
+        if purpose == "batch":
+            self.requests = file[1]
+        return SimpleNamespace(id="file-in")
+
+    async def create(self, input_file_id, endpoint, completion_window):
+        self.created += 1
+        return SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None)
+
+    async def retrieve(self, batch_id):
+        self.retrieves += 1
+        if self.retrieves < 2:
+            return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None)
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-out")
+
+    async def content(self, file_id):
+        lines = [
+            json.dumps({
+                "custom_id": json.loads(line)["custom_id"],
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "answer"}}]}},
+            })
+            for line in self.requests.decode("utf-8").splitlines()
+        ]
+        return SimpleNamespace(text="\n".join(lines))
+
+
+def test_a_restarted_run_resumes_the_submitted_batch(monkeypatch):
+    api = FakeBatchAPI()
+    redis = FakeRedis()
+    client = SimpleNamespace(
+        files=SimpleNamespace(create=api.create_file, content=api.content),
+        batches=SimpleNamespace(create=api.create, retrieve=api.retrieve),
+    )
+    provider = SimpleNamespace(name="batchy", model="model-a", temperature=0.0, client=client)
+    lost = {"value": True}
+
+    async def get_redis():
+        return redis
+
+    async def sleep(seconds):
+        pass
+
+    monkeypatch.setattr(batch_module, "get_redis", get_redis)
+    monkeypatch.setattr(batch_module, "lease_lost", lambda: lost["value"])
+    monkeypatch.setattr(batch_module.asyncio, "sleep", sleep)
+    monkeypatch.setattr(settings, "llm_batch_provider", "batchy")
+    batch_client = LLMBatchClient(SimpleNamespace(providers=[provider]))
+    requests = {"1": [{"role": "user", "content": "a"}], "2": [{"role": "user", "content": "b"}]}
+
+    # the first run loses its lock while waiting: nothing is returned, the batch stays recorded
+    assert asyncio.run(batch_client.complete(requests)) == {}
+    assert len(redis.values) == 1
+
+    # the next run picks the same batch up instead of submitting it again
+    lost["value"] = False
+    assert asyncio.run(batch_client.complete(requests)) == {"1": ("model-a", "answer"), "2": ("model-a", "answer")}
+    assert api.created == 1
+    assert redis.values == {}
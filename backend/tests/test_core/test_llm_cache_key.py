@@ -0,0 +1,52 @@
+import asyncio
+
+from app.models.article import AITranslatedResult
+from app.services.translate_service import _prompt_version, translate_service
+
+RESULT = AITranslatedResult(
+    topic="t", title_cn="t", summary="s", key_points=["a", "b", "c"], takeaway="t", ai_score=50,
+)
+
+
+class FakeCache:
+    def __init__(self):
+        self.texts = {}
+
+    async def aget_text(self, key):
+        return self.texts.get(key)
+
+    async def aset_text(self, key, text):
+        self.texts[key] = text
+
+
+def test_key_depends_on_model_prompt_version_and_content():
+    key = translate_service._cache_key("model-a", "v1", "content")
+
+    assert key == translate_service._cache_key("model-a", "v1", "content")
+    assert key != translate_service._cache_key("model-b", "v1", "content")
+    assert key != translate_service._cache_key("model-a", "v2", "content")
+    assert key != translate_service._cache_key("model-a", "v1", "content ")
+    # the content is hashed, not embedded
+    assert "content" not in key
+
+
+def test_prompt_edits_change_the_version():
+    assert _prompt_version("Summarize.") == _prompt_version("Summarize.")
+    assert _prompt_version("Summarize.") != _prompt_version("Summarize!")
+
+
+def test_cached_result_is_reused_only_for_the_same_prompt(monkeypatch):
+    cache = FakeCache()
+    model = translate_service.router.providers[0].model
+    monkeypatch.setattr(translate_service, "cache", cache)
+
+    async def run():
+        await cache.aset_text(translate_service._cache_key(model, translate_service.prompt_version, "input"), RESULT.model_dump_json())
+        hit = await translate_service._get_cached_summary("input")
+        assert hit == (RESULT, translate_service.analysis_version(model))
+        assert await translate_service._get_cached_summary("other input") is None
+
+        monkeypatch.setattr(translate_service, "prompt_version", "edited")
+        assert await translate_service._get_cached_summary("input") is None
+
+    asyncio.run(run())
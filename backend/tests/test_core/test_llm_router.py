@@ -0,0 +1,170 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+import pytest
+from aiohttp import web
+
+from app.core.config import settings
+from app.core.http_clients import close_http_clients, init_http_clients
+from app.services.llm_router import HeldStream, LLMProvider, LLMRouter
+
+
+@asynccontextmanager
+async def stub_server(name: str, delay: float) -> AsyncIterator[Dict]:
+    """OpenAI-compatible chat endpoint that answers after `delay` seconds; yields its base_url and request log."""
+    state: Dict = {"requests": 0, "name": name}
+
+    async def completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        state["requests"] += 1
+        await asyncio.sleep(delay)
+        if not body.get("stream"):
+            return web.json_response({
+                "id": "cmpl", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": name}, "finish_reason": "stop"}],
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in ("first ", "second ", "third"):
+            chunk = {
+                "id": "cmpl", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await asyncio.sleep(delay)
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["base_url"] = f"http://127.0.0.1:{port}/v1"
+    try:
+        yield state
+    finally:
+        await runner.cleanup()
+
+
+def provider(name: str, server: Dict, limit: int = 4) -> LLMProvider:
+    return LLMProvider(name, server["base_url"], "test", f"{name}-model", 0.0, limit)
+
+
+MESSAGES: List[Dict[str, str]] = [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch):
+    # a client per provider (the shared pooled client would outlive each test's event loop)
+    monkeypatch.setattr(settings, "http_client_pooling_enabled", False)
+    monkeypatch.setattr(settings, "llm_router_min_samples", 3)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.05)
+
+
+def test_routes_to_the_faster_provider_once_measured():
+    async def run():
+        async with stub_server("fast", 0.01) as fast, stub_server("slow", 0.2) as slow:
+            router = LLMRouter([provider("fast", fast), provider("slow", slow)])
+            # explore until both have enough samples
+            while any(len(p.latencies) < settings.llm_router_min_samples for p in router.providers):
+                await router.complete(MESSAGES)
+            fast_before = fast["requests"]
+            answers = [(await router.complete(MESSAGES))[0].name for _ in range(10)]
+            return answers, fast["requests"] - fast_before
+
+    answers, fast_requests = asyncio.run(run())
+    assert answers == ["fast"] * 10
+    assert fast_requests == 10
+
+
+def test_hedge_takes_the_faster_answer_and_drops_the_cancelled_sample():
+    async def run():
+        async with stub_server("slow", 0.5) as slow, stub_server("fast", 0.01) as fast:
+            primary, backup = provider("slow", slow), provider("fast", fast)
+            # the primary looks fast from history, so its p95 deadline passes quickly
+            primary.latencies.extend([0.01] * settings.llm_router_min_samples)
+            router = LLMRouter([primary, backup], hedging=True)
+            chosen, response = await router._hedged(primary, backup, MESSAGES)
+            await asyncio.sleep(0.05)
+            return chosen, response, primary, backup
+
+    chosen, response, primary, backup = asyncio.run(run())
+    assert chosen.name == "fast"
+    assert response.choices[0].message.content == "fast"
+    # the cancelled slow call recorded neither a latency nor an error
+    assert list(primary.latencies) == [0.01] * settings.llm_router_min_samples
+    assert primary.error_rate == 0
+    assert primary.limiter._in_flight == 0
+    assert len(backup.latencies) == 1
+
+
+def test_stream_holds_the_limiter_slot_until_read():
+    async def run():
+        async with stub_server("fast", 0.02) as fast:
+            streaming = provider("fast", fast, limit=1)
+            router = LLMRouter([streaming])
+            _, stream = await router.complete(MESSAGES, stream=True)
+            assert isinstance(stream, HeldStream)
+            held = streaming.limiter._in_flight
+
+            # a second call has to wait for the stream's slot
+            second = asyncio.create_task(router.complete(MESSAGES))
+            await asyncio.sleep(0.1)
+            blocked = not second.done()
+
+            text = ""
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices:
+                        text += chunk.choices[0].delta.content or ""
+            await second
+            return held, blocked, text, streaming
+
+    held, blocked, text, streaming = asyncio.run(run())
+    assert held == 1
+    assert blocked
+    assert text == "first second third"
+    assert streaming.limiter._in_flight == 0
+    # only the non-streamed call is a latency sample
+    assert len(streaming.latencies) == 1
+
+
+def test_closing_a_stream_early_releases_the_slot():
+    async def run():
+        async with stub_server("fast", 0.02) as fast:
+            streaming = provider("fast", fast, limit=1)
+            _, stream = await LLMRouter([streaming]).complete(MESSAGES, stream=True)
+            async with stream:
+                async for _ in stream:
+                    break
+            return streaming.limiter._in_flight
+
+    assert asyncio.run(run()) == 0
+
+
+def test_pooled_client_is_rebuilt_after_the_pools_are_closed(monkeypatch):
+    monkeypatch.setattr(settings, "http_client_pooling_enabled", True)
+
+    async def run():
+        async with stub_server("fast", 0.01) as fast:
+            router = LLMRouter([provider("fast", fast)])
+            await router.complete(MESSAGES)
+            first_client = router.providers[0].client
+
+            # lifespan shutdown and restart
+            await close_http_clients()
+            init_http_clients()
+            _, response = await router.complete(MESSAGES)
+            second_client = router.providers[0].client
+            await close_http_clients()
+            return first_client, second_client, response
+
+    first_client, second_client, response = asyncio.run(run())
+    assert second_client is not first_client
+    assert response.choices[0].message.content == "fast"
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+
+from app.core import resummarizer as resummarizer_module
+from app.core.distributed_lock import LockLease, current_lease
+from app.core.resummarizer import resummarizer
+from app.models.article import AITranslatedResult, Article
+
+
+def make_analysis(summary: str) -> AITranslatedResult:
+    return AITranslatedResult(topic="t", title_cn="t", summary=summary, key_points=["a", "b", "c"], takeaway="t", ai_score=50)
+
+
+def make_article() -> Article:
+    return Article(
+        id=1, hn_id=1, type="story", posted_at=datetime.now(timezone.utc),
+        original_title="title", original_url=None, original_text=None, score=1,
+        kids=None, parent=None, poll=None, parts=None, descendants=None, deleted=None, dead=None,
+        raw_content="content", image_urls=None, comment_analysis=None, is_embedded=True,
+        detailed_analysis=make_analysis("old"),
+    )
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Records the store/embedding calls of `_store` in order; `outcomes` makes any of them fail."""
+    log: List[str] = []
+    outcomes = {"delete": True, "update": True, "embed": True}
+
+    async def delete_article_chunks(article_id):
+        log.append("delete")
+        return outcomes["delete"]
+
+    async def update_analysis_version(article_id, analysis, analysis_version):
+        log.append("update")
+        return outcomes["update"]
+
+    async def process_and_store_article(article):
+        log.append("embed")
+        return outcomes["embed"]
+
+    async def mark_article_not_embedded(article_id):
+        log.append("not_embedded")
+        return True
+
+    monkeypatch.setattr(resummarizer_module.vector_service, "delete_article_chunks", delete_article_chunks)
+    monkeypatch.setattr(resummarizer_module.vector_service, "process_and_store_article", process_and_store_article)
+    monkeypatch.setattr(resummarizer_module.article_repository, "update_analysis_version", update_analysis_version)
+    monkeypatch.setattr(resummarizer_module.article_repository, "mark_article_not_embedded", mark_article_not_embedded)
+    return log, outcomes
+
+
+def store(summary: str):
+    return asyncio.run(resummarizer._store(make_article(), make_analysis(summary), "v:model"))
+
+
+def test_deletes_chunks_before_storing_and_keeps_the_embedded_flag(calls):
+    log, _ = calls
+    assert store("new") is True
+    assert log == ["delete", "update", "embed"]
+
+
+def test_unchanged_embedding_text_is_not_reembedded(calls):
+    log, _ = calls
+    assert store("old") is False
+    assert log == ["update"]
+
+
+def test_failed_delete_leaves_the_article_for_the_next_run(calls):
+    log, outcomes = calls
+    outcomes["delete"] = False
+    assert store("new") is None
+    assert log == ["delete"]
+
+
+@pytest.mark.parametrize("failing", ["update", "embed"])
+def test_backfill_takes_over_after_the_chunks_are_gone(calls, failing):
+    log, outcomes = calls
+    outcomes[failing] = False
+    store("new")
+    assert log[-1] == "not_embedded"
+
+
+def test_stops_without_storing_when_the_lock_is_lost(calls, monkeypatch):
+    log, _ = calls
+    lease = LockLease(name="resummarize_task", token="t", fencing_token=1)
+    pages: List[int] = []
+
+    async def get_stale_analysis_articles(analysis_version, after_id, limit):
+        pages.append(after_id)
+        return [make_article()]
+
+    async def translate_and_summarize_batch(inputs):
+        # the lock expires while the page is being summarized
+        lease.lost = True
+        return {article_id: (make_analysis("new"), "v:model") for article_id in inputs}
+
+    async def load_cursor(analysis_version):
+        return 0
+
+    monkeypatch.setattr(resummarizer_module.article_repository, "get_stale_analysis_articles", get_stale_analysis_articles)
+    monkeypatch.setattr(resummarizer_module.translate_service, "translate_and_summarize_batch", translate_and_summarize_batch)
+    monkeypatch.setattr(resummarizer, "_load_cursor", load_cursor)
+
+    async def run():
+        current_lease.set(lease)
+        return await resummarizer.run()
+
+    assert asyncio.run(run()) == 0
+    assert pages == [0]
+    assert log == []
+
+
+def test_cursor_kept_when_the_page_query_fails(calls, monkeypatch):
+    deleted = []
+
+    async def get_stale_analysis_articles(analysis_version, after_id, limit):
+        return None
+
+    async def load_cursor(analysis_version):
+        return 500
+
+    class FakeRedis:
+        async def delete(self, key):
+            deleted.append(key)
+
+    async def get_redis():
+        return FakeRedis()
+
+    monkeypatch.setattr(resummarizer_module.article_repository, "get_stale_analysis_articles", get_stale_analysis_articles)
+    monkeypatch.setattr(resummarizer, "_load_cursor", load_cursor)
+    monkeypatch.setattr(resummarizer_module, "get_redis", get_redis)
+
+    assert asyncio.run(resummarizer.run()) == 0
+    assert deleted == []
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from app.models.article import AITranslatedResult
+from app.services.salvage_service import SalvageService
+
+VALID = {
+    "topic": "AI", "title_cn": "标题", "summary": "摘要", "key_points": ["a", "b", "c"],
+    "tech_stack": ["python"], "takeaway": "t", "ai_score": 50,
+}
+
+
+@pytest.fixture
+def salvage():
+    return SalvageService()
+
+
+@pytest.mark.parametrize("text", [
+    "```json\n" + json.dumps(VALID) + "\n```",
+    "```\n" + json.dumps(VALID) + "\n```",
+    "Here is the analysis:\n" + json.dumps(VALID) + "\nLet me know if you need more.",
+])
+def test_fences_and_chatter_around_the_object(salvage, text):
+    assert salvage.parse_lenient(text) == VALID
+
+
+def test_trailing_commas(salvage):
+    assert salvage.parse_lenient('{"key_points": ["a", "b",], "ai_score": 5,}') == {"key_points": ["a", "b"], "ai_score": 5}
+
+
+def test_truncated_objects_keep_the_complete_members(salvage):
+    # cut inside a string: the member being written is dropped
+    assert salvage.parse_lenient('{"topic": "AI", "summary": "a long summ') == {"topic": "AI"}
+    # cut right after a complete list item: the open containers are closed
+    assert salvage.parse_lenient('{"topic": "AI", "key_points": ["a", "b"') == {"topic": "AI", "key_points": ["a", "b"]}
+    # cut inside a number, which may be incomplete
+    assert salvage.parse_lenient('{"topic": "AI", "ai_score": 8') == {"topic": "AI"}
+    assert salvage.parse_lenient("no json here") is None
+
+
+@pytest.mark.parametrize("raw, clamped", [(150, 100), (-5, 0), ("87%", 87), (12.6, 13)])
+def test_out_of_range_scores_are_clamped(salvage, raw, clamped):
+    result, _, missing = salvage.validate_partial(AITranslatedResult, {**VALID, "ai_score": raw})
+    assert missing == [] and result.ai_score == clamped
+
+
+def test_lists_are_coerced_and_trimmed(salvage):
+    data = {**VALID, "key_points": "- one\n- two\n\n3. three", "tech_stack": [" rust ", None, ""]}
+    result, _, _ = salvage.validate_partial(AITranslatedResult, data)
+    assert result.key_points == ["one", "two", "three"]
+    assert result.tech_stack == ["rust"]
+
+    result, _, _ = salvage.validate_partial(AITranslatedResult, {**VALID, "key_points": [str(i) for i in range(15)]})
+    assert len(result.key_points) == 10
+
+
+def test_partial_results_are_rejected(salvage):
+    data = {key: value for key, value in VALID.items() if key != "takeaway"}
+    data["key_points"] = ["only one"]
+    result, valid, missing = salvage.validate_partial(AITranslatedResult, data)
+
+    assert result is None
+    assert sorted(missing) == ["key_points", "takeaway"]
+    assert valid["topic"] == "AI" and "key_points" not in valid
+
+
+def test_invalid_optional_fields_are_dropped(salvage):
+    result, _, missing = salvage.validate_partial(AITranslatedResult, {**VALID, "original_text_trans": {"not": "text"}})
+    assert missing == [] and result.original_text_trans is None
+
+
+def test_salvage_of_truncated_output_reports_the_lost_fields(salvage):
+    text = '```json\n{"topic": "AI", "title_cn": "标题", "summary": "摘要", "key_points": ["a", "b", "c"], "takeaway": "t'
+    result, valid, missing = salvage.salvage(AITranslatedResult, text)
+    assert result is None
+    assert sorted(missing) == ["ai_score", "takeaway"]
+    assert valid["key_points"] == ["a", "b", "c"]
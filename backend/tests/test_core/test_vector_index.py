@@ -0,0 +1,189 @@
+import asyncio
+from typing import Dict
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import vector_service as vector_service_module
+from app.services.vector_index import VectorIndex
+from app.services.vector_service import VectorService
+
+
+def make_index(size: int = 200, dims: int = 16, quantize: bool = True) -> VectorIndex:
+    rng = np.random.default_rng(0)
+    index = VectorIndex(quantize=quantize, nprobe=4)
+    index.add(
+        list(range(1, size + 1)),
+        rng.standard_normal((size, dims)).astype(np.float32),
+        [f"chunk {i}" for i in range(1, size + 1)],
+        [{"chunk_index": i} for i in range(1, size + 1)],
+    )
+    return index
+
+
+def test_remove_hides_chunks_and_compact_drops_them():
+    index = make_index()
+    query = index._dequantized(np.array([9]))[0]
+
+    assert index.search(query, 1, 0.0)[0]["id"] == 10
+    assert index.remove([10, 11, 999]) == 2
+    assert 10 not in [row["id"] for row in index.search(query, 5, -1.0)]
+    assert len(index) == 198
+    assert index.dead_fraction == pytest.approx(2 / 200)
+
+    assert index.compact() == 2
+    assert index.size == 198
+    assert index.dead_fraction == 0
+    assert len(index._contents) == 198
+    # rows moved: ids and texts still line up
+    results = index.search(index._dequantized(np.array([index._rows[12]]))[0], 1, 0.0)
+    assert results[0]["id"] == 12 and results[0]["content"] == "chunk 12"
+
+
+def test_compact_keeps_ivf_lists_consistent():
+    index = make_index(size=400)
+    index.build_ivf(nlist=8)
+    index.remove(range(1, 101))
+    index.compact()
+
+    listed = sorted(row for rows in index._lists for row in rows)
+    assert listed == list(range(300))
+    index.nprobe = 8
+    query = index._dequantized(np.array([index._rows[250]]))[0]
+    assert index.search(query, 1, 0.0)[0]["id"] == 250
+
+
+class FakeRedis:
+    def __init__(self):
+        self.zsets: Dict[str, Dict[str, float]] = {}
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if low <= score <= high]:
+            del zset[member]
+
+    async def zrangebyscore(self, key, low, high, withscores=False):
+        high = float("inf") if high == "+inf" else high
+        return sorted(
+            ((member, score) for member, score in self.zsets.get(key, {}).items() if low <= score <= high),
+            key=lambda entry: entry[1],
+        )
+
+
+def test_deletes_in_one_process_reach_the_index_of_another(monkeypatch):
+    redis = FakeRedis()
+
+    async def get_redis():
+        return redis
+
+    async def delete_chunks(article_id):
+        return [10, 11]
+
+    monkeypatch.setattr(vector_service_module, "get_redis", get_redis)
+    monkeypatch.setattr(vector_service_module.vector_repository, "delete_chunks", delete_chunks)
+    monkeypatch.setattr(settings, "vector_index_enabled", True)
+
+    # the worker deletes (it has no index), the API process serves from its own index
+    worker, api = VectorService(), VectorService()
+    worker.index = None
+    api.index = make_index()
+
+    assert asyncio.run(worker.delete_article_chunks(1))
+    assert len(api.index) == 200
+    assert asyncio.run(api._apply_tombstones()) == 2
+    assert 10 not in api.index._rows and 11 not in api.index._rows
+    # re-reading the lookback window is harmless
+    assert asyncio.run(api._apply_tombstones()) == 0
+
+
+@pytest.mark.parametrize("stored, fails", [(512, False), (None, False), (1536, True)])
+def test_startup_check_of_the_stored_embedding_width(monkeypatch, stored, fails):
+    async def get_stored_dimensions():
+        return stored
+
+    monkeypatch.setattr(vector_service_module.vector_repository, "get_stored_dimensions", get_stored_dimensions)
+    monkeypatch.setattr(settings, "embedding_dimensions", 512)
+
+    if fails:
+        with pytest.raises(RuntimeError, match="1536-dimensional"):
+            asyncio.run(VectorService().check_embedding_dimensions())
+    else:
+        asyncio.run(VectorService().check_embedding_dimensions())
+
+
+class _FakeSelect:
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def limit(self, count):
+        return self
+
+
+def test_startup_check_passes_when_the_width_cannot_be_read(monkeypatch):
+    async def execute_query(query):
+        raise ConnectionError("supabase unavailable")
+
+    monkeypatch.setattr("app.repositories.vector_repository.execute_query", execute_query)
+    monkeypatch.setattr(type(vector_service_module.vector_repository), "supabase", property(lambda self: _FakeSelect()))
+
+    assert asyncio.run(vector_service_module.vector_repository.get_stored_dimensions()) is None
+    asyncio.run(VectorService().check_embedding_dimensions())
+
+
+def test_fused_rows_have_one_shape():
+    vector_rows = [{"id": 1, "content": "a", "metadata": {}, "similarity": 0.9},
+                   {"id": 2, "content": "b", "metadata": {}, "similarity": 0.8}]
+    lexical_rows = [{"id": 2, "content": "b", "metadata": {}, "rank": 0.5},
+                    {"id": 3, "content": "c", "metadata": {}, "rank": 0.4}]
+    fused = VectorService()._fuse([vector_rows, lexical_rows], 3)
+
+    # found by both rankings first
+    assert [row["id"] for row in fused] == [2, 1, 3]
+    assert all(row.keys() == {"id", "content", "metadata", "similarity", "rank", "score"} for row in fused)
+    assert (fused[0]["similarity"], fused[0]["rank"]) == (0.8, 0.5)
+    assert fused[1]["rank"] is None and fused[2]["similarity"] is None
+
+
+def test_lexeme_updates_never_insert_rows(monkeypatch):
+    class FakeQuery:
+        def __init__(self, table):
+            self.table, self.record = table, None
+
+        def update(self, record):
+            self.record = record
+            return self
+
+        def eq(self, column, value):
+            self.id = value
+            return self
+
+    class FakeSupabase:
+        def table(self, name):
+            return FakeQuery(name)
+
+    class Response:
+        def __init__(self, data):
+            self.data = data
+
+    rows = {1: None, 2: None}  # chunk 3 was deleted after the page was read
+
+    async def execute_query(query):
+        assert isinstance(query, FakeQuery)
+        if query.id not in rows:
+            return Response([])
+        rows[query.id] = query.record["lexemes"]
+        return Response([{"id": query.id}])
+
+    repository = vector_service_module.vector_repository
+    monkeypatch.setattr(type(repository), "supabase", property(lambda self: FakeSupabase()))
+    monkeypatch.setattr("app.repositories.vector_repository.execute_query", execute_query)
+
+    assert asyncio.run(repository.update_lexemes({1: ["a"], 2: ["b"], 3: ["c"]})) == 2
+    assert rows == {1: ["a"], 2: ["b"]}
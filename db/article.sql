@@ -29,7 +29,9 @@ create table public.articles (
 
   favorites_count integer,
   
-  detailed_analysis jsonb,                -- Structured analysis (JSON)
+  detailed_analysis jsonb,                -- Structured analysis (JSON), null for stories triaged out
+  analysis_version text,                  -- Prompt/model version of detailed_analysis
+  triage jsonb,                           -- Cheap pre-screen result (topic, ai_score estimate)
   comment_analysis jsonb,                 -- Comment analysis (JSON)
   
   created_at timestamptz default now()
@@ -41,6 +43,10 @@ create index articles_posted_at_idx on public.articles (posted_at desc);
 create index articles_hn_id_idx on public.articles (hn_id);
 create index articles_is_embedded_idx on public.articles (is_embedded)
 
+-- Existing databases: add the newer columns
+-- alter table public.articles add column if not exists triage jsonb;
+-- alter table public.articles add column if not exists analysis_version text;
+
 -- Enable Row Level Security (RLS)
 alter table public.articles enable row level security;
 
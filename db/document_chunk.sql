@@ -11,4 +11,21 @@ create table if not exists public.document_chunks (
 );
 
 -- Create HNSW index on vector field for fast similarity search
-create index on public.document_chunks using hnsw (embedding vector_cosine_ops);
\ No newline at end of file
+create index on public.document_chunks using hnsw (embedding vector_cosine_ops);
+-- Compact storage: EMBEDDING_DIMENSIONS=512, EMBEDDING_STORAGE=halfvec (pgvector >= 0.7)
+-- Half-precision, shortened vectors shrink rows and the HNSW index ~6x. Stored chunks have a different
+-- width, so they are dropped and re-embedded by the backfill job. Then create functions/match_documents_halfvec.sql
+-- drop index if exists document_chunks_embedding_idx;
+-- truncate public.document_chunks;
+-- alter table public.document_chunks alter column embedding type halfvec(512);
+-- create index document_chunks_embedding_idx on public.document_chunks using hnsw (embedding halfvec_cosine_ops);
+-- update public.articles set is_embedded = false where is_embedded;
+-- (shortened float32 only: same steps with vector(512) / vector_cosine_ops)
+-- The app refuses to start while the stored width differs from EMBEDDING_DIMENSIONS
+
+-- Hybrid search: HYBRID_SEARCH_ENABLED=true, then create functions/match_documents_lexical.sql
+-- Lexemes are produced by the app (English words/identifiers, Chinese character bigrams) and stored verbatim;
+-- chunks stored before the migration are tokenized by the lexeme backfill job
+-- alter table public.document_chunks add column lexemes text[];
+-- alter table public.document_chunks add column lexeme_vector tsvector generated always as (array_to_tsvector(coalesce(lexemes, '{}'))) stored;
+-- create index document_chunks_lexeme_idx on public.document_chunks using gin (lexeme_vector);
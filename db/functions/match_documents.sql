@@ -1,6 +1,7 @@
 -- Create a function to search documents by vector similarity
+-- (query width unsized: it follows document_chunks.embedding, see EMBEDDING_DIMENSIONS)
 create or replace function match_documents (
-  query_embedding vector(1536),
+  query_embedding vector,
   match_threshold float,
   match_count int,
   filter jsonb default '{}'
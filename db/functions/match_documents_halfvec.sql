@@ -0,0 +1,31 @@
+-- match_documents for half-precision storage (EMBEDDING_STORAGE=halfvec, see document_chunk.sql)
+-- The query type is left unsized so the function fits any EMBEDDING_DIMENSIONS; the column width is
+-- fixed by the table, and the app checks it against EMBEDDING_DIMENSIONS at startup
+create or replace function match_documents_halfvec (
+  query_embedding halfvec,
+  match_threshold float,
+  match_count int,
+  filter jsonb default '{}'
+)
+returns table (
+  id bigint,
+  content text,
+  metadata jsonb,
+  similarity float
+)
+language plpgsql
+as $$
+begin
+  return query
+  select
+    document_chunks.id,
+    document_chunks.content,
+    document_chunks.metadata,
+    1 - (document_chunks.embedding <=> query_embedding) as similarity
+  from document_chunks
+  where 1 - (document_chunks.embedding <=> query_embedding) > match_threshold
+  and document_chunks.metadata @> filter
+  order by document_chunks.embedding <=> query_embedding
+  limit match_count;
+end;
+$$;
@@ -0,0 +1,31 @@
+-- Create a function to search documents by full-text match on their app-tokenized lexemes
+-- (English words/identifiers, Chinese character bigrams; see db/document_chunk.sql)
+create or replace function match_documents_lexical (
+  query_lexemes text[],
+  match_count int,
+  filter jsonb default '{}'
+)
+returns table (
+  id bigint,
+  content text,
+  metadata jsonb,
+  rank real
+)
+language sql stable
+as $$
+  -- OR of the query lexemes, quoted so each is taken verbatim (no parsing or stemming)
+  with query as (
+    select string_agg(quote_literal(lexeme), ' | ')::tsquery as q
+    from unnest(query_lexemes) as lexeme
+  )
+  select
+    document_chunks.id,
+    document_chunks.content,
+    document_chunks.metadata,
+    ts_rank(document_chunks.lexeme_vector, query.q, 1) as rank
+  from document_chunks, query
+  where document_chunks.lexeme_vector @@ query.q
+  and document_chunks.metadata @> filter
+  order by rank desc
+  limit match_count;
+$$;
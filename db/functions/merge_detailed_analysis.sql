@@ -0,0 +1,21 @@
+-- Merge keys into an article's detailed_analysis in one statement, so writers of different keys
+-- (the on-demand full-text translation, the re-summarizer) never overwrite each other's fields
+create or replace function merge_detailed_analysis (
+  article_id bigint,
+  patch jsonb,
+  new_analysis_version text default null
+)
+returns boolean
+language sql
+as $$
+  with updated as (
+    update articles
+    set
+      detailed_analysis = articles.detailed_analysis || patch,
+      analysis_version = coalesce(new_analysis_version, articles.analysis_version)
+    where articles.id = merge_detailed_analysis.article_id
+    and articles.detailed_analysis is not null
+    returning articles.id
+  )
+  select exists (select 1 from updated);
+$$;
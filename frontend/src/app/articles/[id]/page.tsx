@@ -12,6 +12,7 @@ import { useEffect, useState } from "react";
 import { useAuthStore } from "@/stores/auth";
 import { api } from "@/lib/api";
 import { ModeToggle } from "@/components/mode-toggle";
+import { useTranslationStream } from "@/hooks/use-translation-stream";
 
 export default function ArticleDetailPage() {
     const params = useParams();
@@ -22,6 +23,7 @@ export default function ArticleDetailPage() {
     const token = useAuthStore((state) => state.token);
 
     const [article, setArticle] = useState<ArticleSchema | null>(null);
+    const { translation, isTranslating, error: translationError } = useTranslationStream(article);
 
     // Initial state setup from article when available
     const [isFavorited, setIsFavorited] = useState(false);
@@ -263,8 +265,8 @@ export default function ArticleDetailPage() {
                             </div>
                         </section>
 
-                        {/* Full Translated Content */}
-                        {article.detailed_analysis.url_content_trans && (
+                        {/* Full Translated Content (streamed from the backend when not stored yet) */}
+                        {(article.detailed_analysis.url_content_trans || translation || isTranslating || translationError) && (
                             <section className="prose prose-invert prose-lg max-w-none pt-4">
                                 <hr className="border-border/40 mb-8" />
                                 <h3 className="text-xl font-semibold mb-6 text-primary flex items-center gap-2">
@@ -272,6 +274,12 @@ export default function ArticleDetailPage() {
                                     Full Translated Content
                                 </h3>
                                 <div className="bg-muted/10 p-6 md:p-8 rounded-3xl border border-border/30">
+                                    {isTranslating && !translation && (
+                                        <p className="text-muted-foreground animate-pulse">Translating...</p>
+                                    )}
+                                    {translationError && (
+                                        <p className="text-sm text-red-500 mb-4">{translationError}</p>
+                                    )}
                                     <ReactMarkdown
                                         components={{
                                             h1: ({ node, ...props }) => <h1 className="text-2xl font-bold mb-4 mt-6 text-foreground" {...props} />,
@@ -285,7 +293,7 @@ export default function ArticleDetailPage() {
                                             blockquote: ({ node, ...props }) => <blockquote className="border-l-4 border-primary/30 pl-4 italic text-muted-foreground my-4" {...props} />,
                                         }}
                                     >
-                                        {article.detailed_analysis.url_content_trans}
+                                        {article.detailed_analysis.url_content_trans || translation}
                                     </ReactMarkdown>
                                 </div>
                             </section>
@@ -0,0 +1,68 @@
+import { useEffect, useState } from 'react';
+import { ArticleSchema } from '@/types/api';
+import { api } from '@/lib/api';
+
+export function useTranslationStream(article: ArticleSchema | null) {
+    const [translation, setTranslation] = useState("");
+    const [isTranslating, setIsTranslating] = useState(false);
+    const [error, setError] = useState<string | null>(null);
+
+    const articleId = article?.id;
+    // only articles with an analysis and no stored translation yet have one to generate
+    const needsTranslation = !!article?.detailed_analysis
+        && !article.detailed_analysis.url_content_trans
+        && article.full_translation_status !== "unavailable";
+
+    useEffect(() => {
+        if (!articleId || !needsTranslation) return;
+
+        const controller = new AbortController();
+        setTranslation("");
+        setError(null);
+        setIsTranslating(true);
+
+        const run = async () => {
+            try {
+                const response = await api.streamTranslation(articleId, controller.signal);
+                if (!response.body) throw new Error("No response body");
+                if (!response.ok) throw new Error(`API Error: ${response.statusText}`);
+
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let content = "";
+                let buffer = "";
+
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split("\n\n");
+                    buffer = lines.pop() || ""; // Keep the last incomplete chunk
+
+                    for (const line of lines) {
+                        if (line.startsWith("data: ")) {
+                            // Backend replaces \n with \\n, we need to reverse it
+                            content += line.replace("data: ", "").replace(/\\n/g, "\n");
+                            setTranslation(content);
+                        } else if (line.startsWith("event: error")) {
+                            const dataLine = line.split("\n")[1];
+                            throw new Error(dataLine?.replace("data: ", "") || "Unknown error");
+                        }
+                    }
+                }
+            } catch (err) {
+                if (controller.signal.aborted) return;
+                console.error("Translation Error:", err);
+                setError(err instanceof Error ? err.message : "Failed to fetch translation.");
+            } finally {
+                if (!controller.signal.aborted) setIsTranslating(false);
+            }
+        };
+
+        run();
+        return () => controller.abort();
+    }, [articleId, needsTranslation]);
+
+    return { translation, isTranslating, error };
+}
@@ -30,6 +30,11 @@ export const api = {
         return fetchClient<ArticleListResponse>(`/articles/?${query.toString()}`);
     },
 
+    // Full-text translation as server-sent events (generated on the first request)
+    streamTranslation: async (articleId: number, signal?: AbortSignal): Promise<Response> => {
+        return fetch(`${API_BASE_URL}/articles/${articleId}/translation`, { signal });
+    },
+
     chatMessage: async (payload: ChatRequest, token: string): Promise<Response> => {
         return fetch(`${API_BASE_URL}/chat/message`, {
             method: "POST",
@@ -27,6 +27,7 @@ export interface ArticleSchema {
     is_read_later?: boolean;
     deleted?: boolean;
     dead?: boolean;
+    full_translation_status?: "ready" | "pending" | "unavailable";
 }
 
 export interface ArticleListResponse {